@@ -0,0 +1,217 @@
+import argparse
+import json
+import logging
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from src.movies.pipeline.graph import PipelineGraph
+from src.movies.schema.schema_registry import get_shared_registry
+from src.movies.storage.layers import artefact_path, get_layer_writer, source_path
+from src.movies.synthetic import generate, source_config
+
+SCALES = {'10k': 10_000, '1m': 1_000_000, '10m': 10_000_000}
+BASELINES = Path(__file__).parent / 'baselines.json'
+# Differences below these are noise, whatever the relative change
+MIN_SECONDS, MIN_PEAK_MB = 0.05, 1.0
+
+
+def measure(function, trace_memory=True):
+    """
+    Run a function and return its result, wall time in seconds and peak traced
+    memory in MB. Tracing slows allocations down, so memory is measured in a
+    second, traced run of the function.
+    """
+    started = time.perf_counter()
+    result = function()
+    seconds = time.perf_counter() - started
+    if not trace_memory:
+        return result, round(seconds, 4), None
+
+    del result
+    tracemalloc.start()
+    try:
+        result = function()
+        peak_mb = tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+    return result, round(seconds, 4), round(peak_mb, 2)
+
+
+def prepare_data(data_dir, rows, overlap, seed) -> dict:
+    """Generate the synthetic drops of a scale once, reusing them on later runs"""
+    directory = Path(data_dir) / f"rows{rows}-overlap{overlap}-seed{seed}"
+    marker = directory / 'sources.json'
+    if marker.exists():
+        return json.loads(marker.read_text())
+    paths = generate(directory / 'sources', rows, overlap=overlap, seed=seed)
+    marker.write_text(json.dumps(paths))
+    return paths
+
+
+def benchmark_scale(
+    rows, data_dir, overlap=0.8, seed=0, formats=None, trace_memory=True
+) -> dict:
+    """
+    Build and write every pipeline node on synthetic data, in topological order
+
+    :return: {'<node>' or '<node>:write': {'seconds', 'peak_mb', 'rows'}}
+    """
+    paths = prepare_data(data_dir, rows, overlap, seed)
+    output_dir = Path(data_dir) / f"rows{rows}-output"
+    config = {
+        'source': source_config(paths),
+        'output': {
+            layer: str(output_dir / layer) for layer in ('bronze', 'silver', 'gold')
+        },
+    }
+    config['output']['format'] = formats or {}
+    for layer in ('bronze', 'silver', 'gold'):
+        Path(config['output'][layer]).mkdir(parents=True, exist_ok=True)
+
+    registry = get_shared_registry()
+    graph = PipelineGraph.discover()
+    artefacts = {}
+    results = {}
+    for name in graph.order:
+        node = graph.nodes[name]
+        options = {}
+        if node.layer == 'bronze':
+            inputs = [source_path(config, key) for key in node.sources]
+            options = graph.pushdown(name)
+        else:
+            inputs = [artefacts[artefact] for artefact in node.inputs]
+
+        model, seconds, peak_mb = measure(
+            lambda: node.model.build(inputs, registry=registry, **options), trace_memory
+        )
+        frames = {
+            artefact: getattr(model, attribute) for artefact, attribute in node.outputs
+        }
+        artefacts.update(frames)
+        results[name] = {
+            'seconds': seconds,
+            'peak_mb': peak_mb,
+            'rows': sum(len(df) for df in frames.values()),
+        }
+
+        def write():
+            for artefact, df in frames.items():
+                get_layer_writer(config, node.layer).write(
+                    df, artefact_path(config, artefact)
+                )
+
+        _, seconds, peak_mb = measure(write, trace_memory)
+        results[f"{name}:write"] = {
+            'seconds': seconds,
+            'peak_mb': peak_mb,
+            'rows': results[name]['rows'],
+        }
+        logging.info(
+            f"{rows} rows  {name}: {results[name]['seconds']:.3f}s build, {seconds:.3f}s write"
+        )
+    return results
+
+
+def find_regressions(results, baselines, tolerance) -> list:
+    """Stages slower or hungrier than their baseline by more than the tolerance"""
+    regressions = []
+    for scale, stages in results.items():
+        for stage, current in stages.items():
+            baseline = baselines.get(scale, {}).get(stage)
+            if baseline is None:
+                continue
+            for metric, slack in (('seconds', MIN_SECONDS), ('peak_mb', MIN_PEAK_MB)):
+                if current.get(metric) is None or baseline.get(metric) is None:
+                    continue
+                limit = max(
+                    baseline[metric] * (1 + tolerance), baseline[metric] + slack
+                )
+                if current[metric] > limit:
+                    regressions.append(
+                        f"{scale} {stage} {metric}: {current[metric]:.3f} > {baseline[metric]:.3f} baseline"
+                    )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Benchmark every pipeline stage on synthetic data'
+    )
+    parser.add_argument(
+        '--scales',
+        nargs='+',
+        choices=list(SCALES),
+        default=['10k'],
+        help='Row counts to run',
+    )
+    parser.add_argument(
+        '--data-dir',
+        default='target/benchmarks',
+        help='Where synthetic data and outputs are written',
+    )
+    parser.add_argument(
+        '--overlap',
+        type=float,
+        default=0.8,
+        help='Fraction of titles shared by every provider',
+    )
+    parser.add_argument(
+        '--seed', type=int, default=0, help='Seed of the synthetic data'
+    )
+    parser.add_argument(
+        '--no-memory',
+        action='store_true',
+        help='Skip tracemalloc, which slows down large runs',
+    )
+    parser.add_argument(
+        '--tolerance',
+        type=float,
+        default=0.25,
+        help='Allowed relative slowdown before flagging',
+    )
+    parser.add_argument(
+        '--update-baseline',
+        action='store_true',
+        help='Store these results as the new baselines',
+    )
+    parser.add_argument('--output', help='Also write the results to this JSON file')
+    args = parser.parse_args(argv)
+
+    results = {
+        scale: benchmark_scale(
+            SCALES[scale],
+            args.data_dir,
+            args.overlap,
+            args.seed,
+            trace_memory=not args.no_memory,
+        )
+        for scale in args.scales
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+    baselines = json.loads(BASELINES.read_text()) if BASELINES.exists() else {}
+    if args.update_baseline:
+        baselines.update(results)
+        baselines['machine'] = {
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+        }
+        BASELINES.write_text(json.dumps(baselines, indent=2) + '\n')
+        logging.info(f"✓ Baselines updated: {BASELINES}")
+        return 0
+
+    regressions = find_regressions(results, baselines, args.tolerance)
+    for regression in regressions:
+        logging.warning(f"Regression: {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    sys.exit(main())
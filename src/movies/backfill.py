@@ -0,0 +1,199 @@
+import argparse
+import logging
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, List
+
+import pandas as pd
+
+from src.movies.main import create_target_directories, load_config
+from src.movies.metrics import MetricsRecorder, StageMetrics, export_metrics, recording
+from src.movies.pipeline.graph import PipelineGraph
+from src.movies.pipeline.incremental import (
+    check_config,
+    partition_sources,
+    run_partition,
+    update_current_state,
+    update_gold_layer,
+)
+from src.movies.schema.schema_registry import get_shared_registry
+
+# Registry and graph of a worker process, loaded once by the pool initializer
+_worker_state = {}
+
+
+@dataclass
+class PartitionSummary:
+    """Outcome of the backfill of one date"""
+
+    partition: str
+    # Bronze nodes with a complete drop for the date
+    nodes: List[str] = field(default_factory=list)
+    rows: Dict[str, int] = field(default_factory=dict)  # artefact -> rows written
+    seconds: float = 0.0
+    changed: Dict[str, List[pd.DataFrame]] = field(default_factory=dict, repr=False)
+    # Silver artefact -> column dtypes
+    dtypes: Dict[str, Dict[str, str]] = field(default_factory=dict, repr=False)
+    metrics: List[StageMetrics] = field(default_factory=list, repr=False)
+    error: str = None
+
+
+def init_worker(schema_dir=None):
+    """Load the schema registry and the pipeline graph once per worker process"""
+    _worker_state['registry'] = get_shared_registry(schema_dir)
+    _worker_state['graph'] = PipelineGraph.discover()
+
+
+def run_date(config, partition) -> PartitionSummary:
+    """
+    Ingest the drops of one date through bronze and silver, for every node that has one
+    """
+    if not _worker_state:
+        init_worker()
+    registry, graph = _worker_state['registry'], _worker_state['graph']
+
+    started = time.perf_counter()
+    summary = PartitionSummary(partition)
+    with recording() as recorder:
+        for name in graph.order:
+            node = graph.nodes[name]
+            if node.layer != 'bronze':
+                continue
+            paths = partition_sources(node, config, partition)
+            if paths is None:
+                continue
+            result = run_partition(graph, node, partition, paths, config, registry)
+            summary.nodes.append(name)
+            summary.rows.update(result.rows)
+            summary.changed.update(result.changed)
+            summary.dtypes.update(result.dtypes)
+    summary.metrics = recorder.stages
+    summary.seconds = time.perf_counter() - started
+    return summary
+
+
+def date_range(start, end) -> List[str]:
+    """
+    Partitions between two dates, both included
+
+    :param start: First date, as YYYY-MM-DD or YYYYMMDD
+    :param end: Last date, as YYYY-MM-DD or YYYYMMDD
+    """
+    first, last = date.fromisoformat(str(start)), date.fromisoformat(str(end))
+    if last < first:
+        raise ValueError(f"Backfill range ends before it starts: {start} > {end}")
+    return [
+        (first + timedelta(days=offset)).strftime('%Y%m%d')
+        for offset in range((last - first).days + 1)
+    ]
+
+
+def format_summary(summaries: List[PartitionSummary]) -> List[str]:
+    """One line per partition with its status, timing and row counts"""
+    lines = []
+    for summary in summaries:
+        if summary.error is not None:
+            lines.append(f"{summary.partition}  failed  {summary.error}")
+        elif not summary.nodes:
+            lines.append(f"{summary.partition}  no drops")
+        else:
+            rows = ', '.join(
+                f"{artefact}={count}" for artefact, count in summary.rows.items()
+            )
+            lines.append(f"{summary.partition}  ok  {summary.seconds:.2f}s  {rows}")
+    return lines
+
+
+def backfill(config_path, start, end, workers=None) -> List[PartitionSummary]:
+    """
+    Reprocess the dated drops of a date range on a process pool
+
+    Every date runs as its own task, writing the bronze and silver partitions of
+    that date. The gold tables are then updated once for every key the backfill
+    touched. Watermarks of incremental runs are left unchanged.
+
+    :param config_path: Path to the YAML configuration file
+    :param start: First date of the range
+    :param end: Last date of the range
+    :param workers: Maximum number of dates processed at once (execution.workers by
+                    default)
+    :return: Summary per date, in date order
+    """
+    config = load_config(config_path)
+    check_config(config)
+    create_target_directories(config)
+
+    registry = get_shared_registry()
+    graph = PipelineGraph.discover()
+    partitions = date_range(start, end)
+    workers = workers or (config.get('execution') or {}).get('workers')
+
+    summaries = {}
+    errors = []
+    recorder = MetricsRecorder()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_worker,
+        initargs=(str(registry.schema_dir),),
+    ) as executor:
+        futures = {
+            executor.submit(run_date, config, partition): partition
+            for partition in partitions
+        }
+        for future in as_completed(futures):
+            partition = futures[future]
+            error = future.exception()
+            if error is not None:
+                error.add_note(f"backfill partition: {partition}")
+                errors.append(error)
+                summaries[partition] = PartitionSummary(partition, error=repr(error))
+            else:
+                summaries[partition] = future.result()
+
+    summaries = [summaries[partition] for partition in partitions]
+    changed, written, dtypes = defaultdict(list), defaultdict(list), {}
+    for summary in summaries:
+        recorder.extend(summary.metrics)
+        for artefact, frames in summary.changed.items():
+            changed[artefact].extend(frames)
+        for artefact in summary.dtypes:
+            written[artefact].append(summary.partition)
+        dtypes.update(summary.dtypes)
+    with recording(recorder):
+        current = update_current_state(graph, config, written, dtypes)
+        update_gold_layer(graph, config, registry, changed, current)
+    export_metrics(recorder, config)
+
+    logging.info("Backfill summary:")
+    for line in format_summary(summaries):
+        logging.info(f"  {line}")
+
+    if errors:
+        raise ExceptionGroup(
+            f"Backfill failed for {len(errors)} of {len(partitions)} partitions", errors
+        )
+    return summaries
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description='Backfill the Movies Data Pipeline over a date range'
+    )
+    parser.add_argument(
+        'config_path', type=str, help='Path to the YAML configuration file'
+    )
+    parser.add_argument(
+        '--start',
+        required=True,
+        help='First date to reprocess (YYYY-MM-DD or YYYYMMDD)',
+    )
+    parser.add_argument('--end', required=True, help='Last date to reprocess, included')
+    parser.add_argument(
+        '--workers', type=int, help='Maximum number of dates processed at once'
+    )
+    args = parser.parse_args()
+
+    backfill(args.config_path, args.start, args.end, workers=args.workers)
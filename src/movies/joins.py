@@ -0,0 +1,139 @@
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_SUFFIXES = ('_x', '_y')
+
+
+def chained_outer_merge(
+    frames: Sequence[pd.DataFrame],
+    on: str,
+    suffixes: Optional[Sequence[Tuple[str, str]]] = None,
+) -> pd.DataFrame:
+    """
+    Reference implementation: outer-merge the frames one after the other, then sort
+    by key
+
+    :param suffixes: Suffix pair of each merge step, pandas' ('_x', '_y') by default
+    """
+    suffixes = list(suffixes or [])
+    result = frames[0]
+    for step, frame in enumerate(frames[1:]):
+        pair = suffixes[step] if step < len(suffixes) else DEFAULT_SUFFIXES
+        result = pd.merge(result, frame, on=on, how='outer', suffixes=pair)
+    return result.sort_values(on).reset_index(drop=True)
+
+
+def semi_join(frames: Sequence[pd.DataFrame], on: str) -> List[pd.DataFrame]:
+    """
+    Keep the rows whose key is present in every frame, in their original order.
+    Inner joins of the result match inner joins of the frames, on fewer rows.
+    """
+    # Null keys are kept when every frame has one, since pd.merge matches them too
+    keys = pd.Index(frames[0][on].unique())
+    for frame in frames[1:]:
+        keys = keys.intersection(frame[on].unique())
+    # Index lookups rather than Series.isin, which is a Python loop
+    # on Arrow-backed strings
+    return [frame[keys.get_indexer(frame[on]) != -1] for frame in frames]
+
+
+def _can_encode(frames, on) -> bool:
+    """
+    Keys must be unique, non-null strings of one dtype for a row to map
+    to a single key code
+    """
+    dtypes = {frame[on].dtype for frame in frames}
+    if len(dtypes) != 1 or not pd.api.types.is_string_dtype(dtypes.pop()):
+        return False
+    for frame in frames:
+        keys = frame[on]
+        if (
+            keys.isna().any()
+            or not keys.is_unique
+            or pd.api.types.infer_dtype(keys, skipna=False) != 'string'
+        ):
+            return False
+    return True
+
+
+def _output_columns(frames, on, suffixes) -> List[List[Tuple[str, str]]]:
+    """
+    Output name of every column of every frame, following the pd.merge naming rules
+    of the equivalent chain of merges
+
+    :return: (input column, output column) pairs per frame, in output order
+    """
+    names = [[(column, column) for column in frames[0].columns]]
+    for step, frame in enumerate(frames[1:]):
+        left_suffix, right_suffix = (
+            suffixes[step] if step < len(suffixes) else DEFAULT_SUFFIXES
+        )
+        left_names = {output for pairs in names for _, output in pairs}
+        right_columns = [column for column in frame.columns if column != on]
+        overlap = (left_names - {on}) & set(right_columns)
+        names = [
+            [
+                (column, output + left_suffix if output in overlap else output)
+                for column, output in pairs
+            ]
+            for pairs in names
+        ]
+        names.append(
+            [
+                (column, column + right_suffix if column in overlap else column)
+                for column in right_columns
+            ]
+        )
+    return names
+
+
+def multiway_outer_join(
+    frames: Sequence[pd.DataFrame],
+    on: str,
+    suffixes: Optional[Sequence[Tuple[str, str]]] = None,
+) -> pd.DataFrame:
+    """
+    Outer join of several frames on one key column, sorted by key.
+
+    Keys are encoded once into a sorted integer dictionary shared by every frame,
+    and each frame's columns are gathered into the output by key code, so there is
+    no pairwise string hashing and no sort of the joined rows. The result has the
+    same columns, names, dtypes and order as chained_outer_merge. Frames with null,
+    duplicate or non-string keys fall back to chained_outer_merge.
+
+    :param suffixes: Suffix pair of each merge step of the equivalent chain
+    """
+    suffixes = list(suffixes or [])
+    if len(frames) < 2 or not _can_encode(frames, on):
+        return chained_outer_merge(frames, on, suffixes)
+
+    codes, keys = pd.factorize(
+        np.concatenate([frame[on].to_numpy() for frame in frames]), sort=True
+    )
+    key_dtype = frames[0][on].dtype
+    if key_dtype != object:
+        # Arrow-backed or nullable string keys keep their dtype, as pd.merge does
+        keys = pd.array(keys, dtype=key_dtype)
+
+    data = {}
+    offset = 0
+    for frame, pairs in zip(frames, _output_columns(frames, on, suffixes)):
+        # Row of this frame holding each key code, -1 where the frame lacks the key
+        indexer = np.full(len(keys), -1, dtype=np.intp)
+        indexer[codes[offset : offset + len(frame)]] = np.arange(len(frame))
+        offset += len(frame)
+        for column, output in pairs:
+            if column == on:
+                data.setdefault(on, keys)
+            else:
+                # Missing rows are filled like pd.merge does: NaN (widening integers),
+                # or NA for nullable dtypes
+                data[output] = pd.api.extensions.take(
+                    frame[column].values, indexer, allow_fill=True
+                )
+
+    # The key is inserted with the first frame's columns, at its position
+    # there, as pd.merge does
+    return pd.DataFrame(data)
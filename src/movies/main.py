@@ -2,16 +2,10 @@ from pathlib import Path
 import yaml
 import argparse
 import logging
+import tracemalloc
 
-from src.movies.models.bronze.audience_pulse import AudiencePulse as BronzeAudiencePulse
-from src.movies.models.bronze.critic_agg import CriticAgg as BronzeCriticAgg
-from src.movies.models.bronze.box_office_metrics import BoxOfficeMetrics as BronzeBoxOfficeMetrics
-
-from src.movies.models.silver.audience_pulse import AudiencePulse as SilverAudiencePulse
-from src.movies.models.silver.critic_agg import CriticAgg as SilverCriticAgg
-from src.movies.models.silver.box_office_metrics import BoxOfficeMetrics as SilverBoxOfficeMetrics
-
-from src.movies.models.gold.movies_unified import MoviesUnified
+from src.movies.metrics import MetricsRecorder, export_metrics, recording
+from src.movies.pipeline.graph import PipelineGraph
 
 # Configure logging
 logging.basicConfig(
@@ -38,74 +32,87 @@ def create_target_directories(config):
         Path(directory).mkdir(parents=True, exist_ok=True)
 
 
-def save_dataframe_to_csv(df, output_path):
-    """Save a DataFrame to CSV file"""
-    df.to_csv(output_path, index=False)
-    logging.info(f"✓ Saved file: {output_path} ({len(df)} rows)")
-
-
-def process_bronze_layer(config):
-    """Process bronze layer - load raw data from source files"""
-    bronze_audience_pulse = BronzeAudiencePulse(config['source']['audience_pulse'])
-    save_dataframe_to_csv(bronze_audience_pulse.df, f"{config['output']['bronze']}/audience_pulse.csv")
-
-    bronze_critic_agg = BronzeCriticAgg(config['source']['critic_agg'])
-    save_dataframe_to_csv(bronze_critic_agg.df, f"{config['output']['bronze']}/critic_agg.csv")
-
-    bronze_box_office = BronzeBoxOfficeMetrics(
-        config['source']['box_office']['domestic'],
-        config['source']['box_office']['financials'],
-        config['source']['box_office']['international']
-    )
-    save_dataframe_to_csv(bronze_box_office.domestic_df, f"{config['output']['bronze']}/box_office_domestic.csv")
-    save_dataframe_to_csv(bronze_box_office.financials_df, f"{config['output']['bronze']}/box_office_financials.csv")
-    save_dataframe_to_csv(bronze_box_office.international_df, f"{config['output']['bronze']}/box_office_international.csv")
-
-    return bronze_audience_pulse, bronze_critic_agg, bronze_box_office
-
-
-def process_silver_layer(config, bronze_audience_pulse, bronze_critic_agg, bronze_box_office):
-    """Process silver layer - transform and standardize data"""
-    silver_audience_pulse = SilverAudiencePulse(bronze_audience_pulse.df)
-    save_dataframe_to_csv(silver_audience_pulse.df, f"{config['output']['silver']}/audience_pulse.csv")
-
-    silver_critic_agg = SilverCriticAgg(bronze_critic_agg.df)
-    save_dataframe_to_csv(silver_critic_agg.df, f"{config['output']['silver']}/critic_agg.csv")
+def main(config_path, only=None, start=None, resume=False, watch=False):
+    """
+    Main execution function
+
+    The pipeline graph is built from the inputs and outputs declared by the models
+    and run by the scheduler. Inputs of the selected nodes that this run does not
+    produce are read back from their persisted layers. When incremental processing
+    is enabled, only the source partitions newer than the stored watermarks are run.
+
+    :param config_path: Path to the YAML configuration file
+    :param only: Node or layer names to run on their own
+    :param start: Node or layer names to run together with everything downstream
+    :param resume: Reuse the outputs of the stages the previous run completed, as
+                   recorded in its run manifest, and run the remaining ones
+    :param watch: Keep running, and run the stages affected by every new source drop
+    """
+    # Imported here so the command line answers --help and argument errors without loading pandas
+    from src.movies.pipeline.incremental import IncrementalRunner
+    from src.movies.pipeline.scheduler import Scheduler
+    from src.movies.pipeline.watch import WatchDaemon
+    from src.movies.schema.schema_registry import get_shared_registry
 
-    silver_box_office = SilverBoxOfficeMetrics(
-        bronze_box_office.domestic_df,
-        bronze_box_office.financials_df,
-        bronze_box_office.international_df
-    )
-    save_dataframe_to_csv(silver_box_office.df, f"{config['output']['silver']}/box_office_metrics.csv")
+    config = load_config(config_path)
 
-    return silver_audience_pulse, silver_critic_agg, silver_box_office
+    create_target_directories(config)
 
+    # One registry for the whole run, shared by every model
+    registry = get_shared_registry()
 
-def process_gold_layer(config, silver_audience_pulse, silver_critic_agg, silver_box_office):
-    """Process gold layer - merge all data into unified dataset"""
-    movies_unified = MoviesUnified(silver_audience_pulse, silver_critic_agg, silver_box_office)
-    save_dataframe_to_csv(movies_unified.df, f"{config['output']['gold']}/movies_unified.csv")
+    graph = PipelineGraph.discover()
 
-    return movies_unified
+    if watch:
+        if only or start or resume:
+            raise ValueError("Node selection and resuming are not supported in watch mode")
+        return WatchDaemon(graph, config).run_forever()
 
+    if (config.get('metrics') or {}).get('trace_memory') and not tracemalloc.is_tracing():
+        tracemalloc.start()
 
-def main(config_path):
-    """Main execution function"""
-    config = load_config(config_path)
+    # Metrics are exported even when the run fails, to see how far it got
+    recorder = MetricsRecorder()
+    try:
+        with recording(recorder):
+            if (config.get('incremental') or {}).get('enabled'):
+                if only or start or resume:
+                    raise ValueError("Node selection and resuming are not supported in incremental mode")
+                return IncrementalRunner(graph, config, registry).run()
 
-    create_target_directories(config)
-
-    bronze_audience, bronze_critic, bronze_box_office = process_bronze_layer(config)
-    silver_audience, silver_critic, silver_box_office = process_silver_layer(
-        config, bronze_audience, bronze_critic, bronze_box_office
-    )
-    process_gold_layer(config, silver_audience, silver_critic, silver_box_office)
+            selected = graph.select(only=only, start=start)
+            return Scheduler(graph, config, registry, resume=resume).run(selected)
+    finally:
+        export_metrics(recorder, config)
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Movies Data Pipeline')
     parser.add_argument('config_path', type=str, help='Path to the YAML configuration file')
+    selection = parser.add_mutually_exclusive_group()
+    selection.add_argument(
+        '--only',
+        nargs='+',
+        metavar='TARGET',
+        help='Run only these nodes or layers (e.g. silver/critic_agg gold)'
+    )
+    selection.add_argument(
+        '--from',
+        dest='start',
+        nargs='+',
+        metavar='TARGET',
+        help='Run these nodes or layers and everything downstream of them'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Restart the previous run from its first incomplete stage, reusing the outputs of completed stages'
+    )
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='Keep running: watch the source directories and run the stages affected by every new drop'
+    )
     args = parser.parse_args()
 
-    main(args.config_path)
+    main(args.config_path, only=args.only, start=args.start, resume=args.resume, watch=args.watch)
@@ -0,0 +1,217 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+TOTAL = 'total'  # step recording a whole node
+
+_recorder: ContextVar[Optional['MetricsRecorder']] = ContextVar(
+    'metrics_recorder', default=None
+)
+_node: ContextVar[Optional[str]] = ContextVar('metrics_node', default=None)
+
+
+@dataclass
+class StageMetrics:
+    """
+    Measurements of one step of a pipeline node, such as its read, transform or write
+    """
+
+    node: str
+    step: str
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0  # CPU time of the running thread
+    # Process peak resident memory when the step ended
+    peak_rss_mb: Optional[float] = None
+    traced_delta_mb: Optional[float] = None  # net tracemalloc allocation, when tracing
+    rows_in: Optional[int] = None
+    rows_out: Optional[int] = None
+    memory_in_mb: Optional[float] = None  # table size before a compact step
+    memory_out_mb: Optional[float] = None  # table size after a compact step
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return round(peak / 2**20 if sys.platform == 'darwin' else peak / 2**10, 2)
+
+
+class MetricsRecorder:
+    """Collects the stage metrics of a run. Safe to share between threads."""
+
+    def __init__(self):
+        self.stages: List[StageMetrics] = []
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def record(self, metrics: StageMetrics):
+        with self._lock:
+            self.stages.append(metrics)
+
+    def extend(self, stages: Iterable[StageMetrics]):
+        """Add the metrics recorded by a task in another thread or process"""
+        with self._lock:
+            self.stages.extend(stages)
+
+    def report(self) -> dict:
+        """JSON-serialisable run report"""
+        return {
+            'started_at': self.started_at,
+            'wall_seconds': round(time.perf_counter() - self._started, 6),
+            'peak_rss_mb': _peak_rss_mb(),
+            'stages': [asdict(metrics) for metrics in self.stages],
+        }
+
+    def write_json(self, path):
+        """Write the run report as JSON"""
+        _write_atomic(path, json.dumps(self.report(), indent=2))
+
+    def write_prometheus(self, path, prefix='movies_pipeline'):
+        """
+        Write the metrics in the Prometheus textfile format, for the node exporter
+        textfile collector. Repeated steps of a node are summed, peak memory is maxed.
+        """
+        totals = {}
+        for metrics in self.stages:
+            total = totals.setdefault((metrics.node, metrics.step), {})
+            for field_name in (
+                'wall_seconds',
+                'cpu_seconds',
+                'rows_in',
+                'rows_out',
+                'traced_delta_mb',
+                'memory_in_mb',
+                'memory_out_mb',
+            ):
+                value = getattr(metrics, field_name)
+                if value is not None:
+                    total[field_name] = total.get(field_name, 0) + value
+            if metrics.peak_rss_mb is not None:
+                total['peak_rss_mb'] = max(
+                    total.get('peak_rss_mb', 0), metrics.peak_rss_mb
+                )
+
+        report = self.report()
+        lines = [
+            f"# HELP {prefix}_run_wall_seconds Wall time of the pipeline run",
+            f"# TYPE {prefix}_run_wall_seconds gauge",
+            f"{prefix}_run_wall_seconds {report['wall_seconds']}",
+            f"# HELP {prefix}_run_timestamp_seconds Start time of the pipeline run",
+            f"# TYPE {prefix}_run_timestamp_seconds gauge",
+            f"{prefix}_run_timestamp_seconds {report['started_at']}",
+        ]
+        for field_name, help_text in (
+            ('wall_seconds', 'Wall time of a pipeline step'),
+            ('cpu_seconds', 'CPU time of a pipeline step'),
+            ('rows_in', 'Rows read by a pipeline step'),
+            ('rows_out', 'Rows produced by a pipeline step'),
+            (
+                'peak_rss_mb',
+                'Peak resident memory of the process at the end of a pipeline step',
+            ),
+            (
+                'traced_delta_mb',
+                'Net memory allocated by a pipeline step, as traced by tracemalloc',
+            ),
+            ('memory_in_mb', 'In-memory size of a table before a compact step'),
+            ('memory_out_mb', 'In-memory size of a table after a compact step'),
+        ):
+            samples = [
+                f'{prefix}_stage_{field_name}{{node="{node}",step="{step}"}} {values[field_name]}'
+                for (node, step), values in totals.items()
+                if field_name in values
+            ]
+            if samples:
+                lines += [
+                    f"# HELP {prefix}_stage_{field_name} {help_text}",
+                    f"# TYPE {prefix}_stage_{field_name} gauge",
+                ]
+                lines += samples
+        _write_atomic(path, '\n'.join(lines) + '\n')
+
+
+def _write_atomic(path, content):
+    """Write through a temporary file so readers never see a partial file"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    with os.fdopen(fd, 'w') as file:
+        file.write(content)
+    os.replace(tmp_path, path)
+
+
+def current_recorder() -> Optional[MetricsRecorder]:
+    return _recorder.get()
+
+
+@contextmanager
+def recording(recorder: Optional[MetricsRecorder] = None):
+    """Collect the stages run in this context, in this thread, into a recorder"""
+    recorder = recorder if recorder is not None else MetricsRecorder()
+    token = _recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorder.reset(token)
+
+
+@contextmanager
+def stage(step: str, rows_in: Optional[int] = None, node: Optional[str] = None):
+    """
+    Measure one step of a pipeline node. Does nothing outside a recording context.
+    The yielded StageMetrics can be updated with the row counts before the step ends.
+
+    :param step: Step name, e.g. 'read', 'validate', 'transform', 'merge', 'write'
+    :param node: Node the step belongs to, by default the node of the enclosing stage
+    """
+    metrics = StageMetrics(
+        node=node or _node.get() or 'unknown', step=step, rows_in=rows_in
+    )
+    recorder = _recorder.get()
+    if recorder is None:
+        yield metrics
+        return
+
+    token = _node.set(metrics.node)
+    tracing = tracemalloc.is_tracing()
+    traced_before = tracemalloc.get_traced_memory()[0] if tracing else None
+    wall_start, cpu_start = time.perf_counter(), time.thread_time()
+    try:
+        yield metrics
+    finally:
+        metrics.wall_seconds = round(time.perf_counter() - wall_start, 6)
+        metrics.cpu_seconds = round(time.thread_time() - cpu_start, 6)
+        metrics.peak_rss_mb = _peak_rss_mb()
+        if tracing and tracemalloc.is_tracing():
+            metrics.traced_delta_mb = round(
+                (tracemalloc.get_traced_memory()[0] - traced_before) / 2**20, 3
+            )
+        _node.reset(token)
+        recorder.record(metrics)
+
+
+def export_metrics(recorder: MetricsRecorder, config):
+    """
+    Write the run report and the Prometheus textfile configured in the metrics section
+    """
+    settings = config.get('metrics') or {}
+    if settings.get('report'):
+        recorder.write_json(settings['report'])
+    if settings.get('prometheus'):
+        recorder.write_prometheus(settings['prometheus'])
@@ -1,19 +1,21 @@
-import pandas as pd
-
 from src.movies.models.bronze.data_provider import DataProvider
+from src.movies.storage.readers import iter_table_chunks, read_table
 
 
 class AudiencePulse(DataProvider):
-    def __init__(self, file_path, version=None):
-        super().__init__(file_path)
-        self.df = pd.read_json(self.filePath)
-
-        provider_name = 'bronze/audience_pulse'
-        if version is None:
-            version = self.registry.detect_version(provider_name, self.df)
+    provider_name = 'bronze/audience_pulse'
+    sources = ('audience_pulse',)
+    outputs = {'audience_pulse': 'df'}
+    build_options = ('chunksize',)
 
-        is_valid, errors = self.registry.validate_schema(provider_name, version, self.df)
-        if not is_valid:
-            raise ValueError(f"Schema validation failed for {provider_name} {version}: {errors}")
+    def __init__(self, file_path, version=None, registry=None, chunksize=None):
+        super().__init__(file_path, registry)
+        if chunksize:
+            self.df = None
+            chunks = iter_table_chunks(self.filePath, chunksize, self.declared_types())
+            self.version = self.open_stream(chunks, version)
+            return
 
-        self.version = version
+        self.df = read_table(self.filePath, dtypes=self.declared_types())
+        self.version = self.validate(self.df, version)
+        self.df = self.compact(self.df)
@@ -1,19 +1,63 @@
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
 
+from src.movies.joins import semi_join
+from src.movies.metrics import stage
 from src.movies.models.bronze.data_provider import DataProvider
+from src.movies.storage.readers import read_table
 
 
 class BoxOfficeMetrics(DataProvider):
+    provider_name = 'bronze/box_office'
+    sources = ('box_office.domestic', 'box_office.financials', 'box_office.international')
+    outputs = {
+        'box_office_domestic': 'domestic_df',
+        'box_office_financials': 'financials_df',
+        'box_office_international': 'international_df',
+    }
+    build_options = ('max_workers', 'columns', 'semi_join_key')
+
     def __init__(
-        self, domestic_file_path, financials_file_path, international_file_path, version=None
+        self,
+        domestic_file_path,
+        financials_file_path,
+        international_file_path,
+        version=None,
+        registry=None,
+        max_workers=1,
+        columns=None,
+        semi_join_key=None,
     ):
-        super().__init__(domestic_file_path)
-        self.domestic_df = pd.read_csv(domestic_file_path)
-        self.financials_df = pd.read_csv(financials_file_path)
-        self.international_df = pd.read_csv(international_file_path)
+        """
+        :param columns: Columns to read per output name, all columns by default
+        :param semi_join_key: Keep only the rows whose key is in all three files
+        """
+        super().__init__(domestic_file_path, registry)
+        file_paths = (domestic_file_path, financials_file_path, international_file_path)
+        file_columns = [(columns or {}).get(output) for output in self.outputs]
+        if max_workers > 1:
+            # The three files are independent; read them concurrently, each in a
+            # copy of this context so the reads are recorded with the running stage
+            contexts = [copy_context() for _ in file_paths]
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(file_paths))) as executor:
+                frames = list(executor.map(
+                    lambda context, path, names: context.run(read_table, path, names), contexts, file_paths, file_columns
+                ))
+        else:
+            frames = [read_table(file_path, names) for file_path, names in zip(file_paths, file_columns)]
+        if semi_join_key is not None:
+            frames = [frame.reset_index(drop=True) for frame in semi_join(frames, semi_join_key)]
+        self.domestic_df, self.financials_df, self.international_df = frames
 
-        provider_name = 'bronze/box_office'
         if version is None:
-            version = self.registry.detect_version(provider_name, self.domestic_df)
+            version = self.registry.detect_version(self.provider_name, self.domestic_df)
 
+        if version != 'unknown':
+            # Each file is checked on the schema columns it carries
+            for frame in frames:
+                with stage('validate', rows_in=len(frame)):
+                    self.check_values(frame, version)
         self.version = version
+        self.domestic_df, self.financials_df, self.international_df = (
+            self.compact(frame, f"bronze/{output}") for output, frame in zip(self.outputs, frames)
+        )
@@ -1,8 +1,115 @@
+import itertools
 from abc import ABC
-from src.movies.schema.schema_registry import SchemaRegistry
+from src.movies.metrics import stage
+from src.movies.schema.validation import current_policy
+from src.movies.schema.schema_registry import get_shared_registry
 
 
 class DataProvider(ABC):
-    def __init__(self, file_path):
+    provider_name = None
+
+    # Pipeline declarations: config source keys read by the model, artefacts it
+    # produces (artefact name -> attribute) and the keyword options build() forwards
+    sources = ()
+    outputs = {}
+    build_options = ()
+
+    def __init__(self, file_path, registry=None):
         self.filePath = file_path
-        self.registry = SchemaRegistry()
+        self.registry = registry if registry is not None else get_shared_registry()
+        self._chunks = None
+
+    def __getstate__(self):
+        # Registries hold compiled plans that cannot be pickled; models sent across
+        # processes reattach to the receiving process's shared registry instead
+        state = self.__dict__.copy()
+        state['registry'] = self.registry.schema_dir
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.registry = get_shared_registry(state['registry'])
+
+    @classmethod
+    def build(cls, inputs, registry=None, **options):
+        """Construct the model from its source paths, keeping only supported options"""
+        supported = {key: value for key, value in options.items() if key in cls.build_options}
+        return cls(*inputs, registry=registry, **supported)
+
+    @property
+    def is_streaming(self):
+        """True when the model was opened in chunked mode and has no in-memory df"""
+        return self._chunks is not None
+
+    def declared_types(self):
+        """Column types declared by the latest schema version, the dtype hints of the readers"""
+        version = self.registry.get_latest_version(self.provider_name)
+        schema = self.registry.get_schema(self.provider_name, version) if version else None
+        return schema.schema if schema else None
+
+    def validate(self, df, version=None):
+        """
+        Detect the schema version of a DataFrame when not given and validate it
+
+        :return: The validated schema version
+        """
+        with stage('validate', rows_in=len(df)):
+            if version is None:
+                version = self.registry.detect_version(self.provider_name, df)
+
+            is_valid, errors = self.registry.validate_schema(self.provider_name, version, df)
+            if is_valid:
+                self.check_values(df, version)
+        if not is_valid:
+            raise ValueError(f"Schema validation failed for {self.provider_name} {version}: {errors}")
+
+        return version
+
+    def check_values(self, df, version):
+        """Check values against the schema constraints, as the current validation policy asks"""
+        policy = current_policy()
+        if policy.mode == 'off':
+            return
+        report = self.registry.validate_values(
+            self.provider_name, version, df, sample_rows=policy.sample_rows, sample_size=policy.sample_size
+        )
+        policy.enforce(report)
+
+    def compact(self, df, table=None):
+        """Give a validated DataFrame compact dtypes, when the current dtype policy asks for it"""
+        return self.registry.compact_dataframe(self.provider_name, self.version, df, table)
+
+    def open_stream(self, chunks, version=None):
+        """
+        Start chunked ingestion: validate the schema on the first chunk and keep the
+        remaining chunks for iter_chunks()
+
+        :return: The validated schema version
+        """
+        chunks = iter(chunks)
+        first_chunk = next(chunks, None)
+        if first_chunk is None:
+            raise ValueError(f"No data found for {self.provider_name} in {self.filePath}")
+
+        version = self.validate(first_chunk, version)
+        self._version = version
+        self._columns = list(first_chunk.columns)
+        self._chunks = itertools.chain([first_chunk], chunks)
+        return version
+
+    def iter_chunks(self):
+        """
+        Yield the validated chunks of a streaming model. The stream can be consumed once.
+        """
+        if self._chunks is None:
+            raise ValueError(f"{type(self).__name__} was not opened in chunked mode")
+
+        for index, chunk in enumerate(self._chunks):
+            if list(chunk.columns) != self._columns:
+                # JSON records may omit keys; align them with the validated first chunk
+                chunk = chunk.reindex(columns=self._columns)
+            if index:
+                # The first chunk was checked by validate(); uniqueness is checked per chunk
+                with stage('validate', rows_in=len(chunk)):
+                    self.check_values(chunk, self._version)
+            yield chunk
@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
+from typing import Dict
+import numpy as np
 import pandas as pd
-from src.movies.schema.schema_registry import SchemaRegistry
+from src.movies.schema.schema_registry import get_shared_registry
 
 
 class AnalyticsReport(ABC):
@@ -9,8 +11,18 @@ class AnalyticsReport(ABC):
     All gold layer reports must implement the build_report method.
     """
 
-    def __init__(self):
-        self.registry = SchemaRegistry()
+    # Pipeline declarations: artefacts consumed, in constructor order, and
+    # artefacts produced (artefact name -> attribute)
+    inputs = ()
+    outputs = {}
+
+    def __init__(self, registry=None):
+        self.registry = registry if registry is not None else get_shared_registry()
+
+    @classmethod
+    def build(cls, inputs, registry=None, **options):
+        """Construct the report from its input DataFrames"""
+        return cls(*inputs, registry=registry)
 
     @abstractmethod
     def build_report(self) -> pd.DataFrame:
@@ -20,3 +32,93 @@ class AnalyticsReport(ABC):
         :return: DataFrame containing the analytics report
         """
 
+
+
+class AggregateReport(AnalyticsReport):
+    """
+    Aggregate reports over one input table, built from a shared base frame with
+    one row per key and from per-group statistics that can be summed (counts, sums,
+    sums of squares and products). One groupby pass computes the statistics of
+    every report, and each report is derived from the statistics or the base.
+
+    The base frame and the statistics are outputs too. When only some keys changed,
+    refresh() replaces their base rows and recomputes the statistics of the groups
+    they belonged to or now belong to, instead of rebuilding everything.
+    """
+
+    # Key of the input rows, and column of the base frame the statistics are grouped by
+    refresh_key = None
+    group_key = None
+
+    def __init__(self, base: pd.DataFrame, statistics: pd.DataFrame, registry=None):
+        super().__init__(registry)
+        self.base = base
+        self.statistics = statistics
+        for attribute, df in self.build_report().items():
+            setattr(self, attribute, df)
+
+    @classmethod
+    def build(cls, inputs, registry=None, **options):
+        """Construct the reports from the whole input table"""
+        df, = inputs
+        base = cls.base_frame(df).sort_values(cls.refresh_key).reset_index(drop=True)
+        return cls(base, cls.group_statistics(base), registry=registry)
+
+    @classmethod
+    def refresh(cls, base: pd.DataFrame, statistics: pd.DataFrame, changed: pd.DataFrame, registry=None,
+                changed_keys=None):
+        """
+        Update previously built reports with the new input rows of some keys
+
+        :param base: Base frame of the previous build
+        :param statistics: Group statistics of the previous build
+        :param changed: Input rows of the changed keys that still exist
+        :param changed_keys: Every changed key, deleted ones included; the keys of changed by default
+        """
+        key, group = cls.refresh_key, cls.group_key
+        changed_base = cls.base_frame(changed)
+        # Deleted keys have no input row left: their base rows are dropped, not replaced
+        replaced = base[key].isin(changed[key] if changed_keys is None else changed_keys)
+        groups = pd.concat([base.loc[replaced, group], changed_base[group]]).unique()
+
+        base = _insert_sorted(base[~replaced], changed_base, key)
+        # Statistics of the affected groups are recomputed from their rows, never patched
+        recomputed = cls.group_statistics(base[base[group].isin(groups)])
+        statistics = pd.concat([statistics[~statistics[group].isin(groups)], recomputed], ignore_index=True)
+        statistics = statistics.sort_values(group).reset_index(drop=True)
+        return cls(base, statistics, registry=registry)
+
+    @classmethod
+    def group_statistics(cls, base: pd.DataFrame) -> pd.DataFrame:
+        """Sum of the statistic columns per group, rows without a group included"""
+        columns = cls.statistic_columns(base)
+        return columns.groupby(base[cls.group_key], dropna=False, sort=True).sum().reset_index()
+
+    @classmethod
+    @abstractmethod
+    def base_frame(cls, df: pd.DataFrame) -> pd.DataFrame:
+        """Derived metrics of every input row, with the refresh and group keys"""
+
+    @classmethod
+    @abstractmethod
+    def statistic_columns(cls, base: pd.DataFrame) -> pd.DataFrame:
+        """Per-row values whose per-group sums the reports are computed from"""
+
+    @abstractmethod
+    def build_report(self) -> Dict[str, pd.DataFrame]:
+        """
+        Build the reports from self.base and self.statistics
+
+        :return: DataFrame of every report, by output attribute
+        """
+
+
+def _insert_sorted(sorted_df: pd.DataFrame, rows: pd.DataFrame, key: str) -> pd.DataFrame:
+    """Insert rows into a frame sorted by a unique key, without sorting the whole frame again"""
+    rows = rows.sort_values(key)
+    combined = pd.concat([sorted_df, rows], ignore_index=True)
+    if combined[key].isna().any():
+        return combined.sort_values(key).reset_index(drop=True)
+    positions = sorted_df[key].searchsorted(rows[key].to_numpy())
+    order = np.insert(np.arange(len(sorted_df)), positions, np.arange(len(sorted_df), len(combined)))
+    return combined.take(order).reset_index(drop=True)
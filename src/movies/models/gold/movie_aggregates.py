@@ -0,0 +1,158 @@
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from src.movies.metrics import stage
+from src.movies.models.gold.analytics_reports import AggregateReport
+
+SCORES = {'critic': 'critic_score_percentage', 'audience': 'audience_score_percentage'}
+GROSS = 'total_box_office_gross_usd'
+BUDGET = 'production_budget_usd'
+MARKETING = 'marketing_spend_usd'
+
+
+class MovieAggregates(AggregateReport):
+    """
+    Aggregates of the unified movies table: return on investment by release year,
+    correlation of the critic and audience scores with the box office gross, and
+    the films with the highest gross per dollar of production budget.
+    """
+
+    inputs = ('gold/movies_unified',)
+    outputs = {
+        'movie_metrics': 'base',
+        'yearly_statistics': 'statistics',
+        'roi_by_year': 'roi_by_year',
+        'score_gross_correlation': 'score_gross_correlation',
+        'top_budget_efficiency': 'top_budget_efficiency',
+    }
+    refresh_key = 'movie_title'  # maintained from the changed rows of this key
+    group_key = 'release_year'
+    top_n = 10
+
+    @classmethod
+    def base_frame(cls, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        One row per film: release year (box office, else critic, else audience),
+        costs, ROI = (gross - cost) / cost with cost = budget + marketing, and budget
+        efficiency = gross / budget. Ratios are missing without a positive cost.
+        """
+        with stage('transform', rows_in=len(df)) as metrics:
+            year = df['release_year']
+            for column in ('critic_release_year', 'audience_release_year'):
+                year = year.fillna(df[column])
+            gross = pd.to_numeric(df[GROSS]).astype('float64')
+            budget = pd.to_numeric(df[BUDGET]).astype('float64')
+            cost = budget + pd.to_numeric(df[MARKETING]).astype('float64').fillna(0)
+            base = pd.DataFrame(
+                {
+                    'movie_title': df['movie_title'],
+                    'release_year': pd.to_numeric(year).astype('float64'),
+                    GROSS: gross,
+                    BUDGET: budget,
+                    'total_cost_usd': cost,
+                    'roi': ((gross - cost) / cost).where(cost > 0),
+                    'budget_efficiency': (gross / budget).where(budget > 0),
+                    **{
+                        column: pd.to_numeric(df[column]).astype('float64')
+                        for column in SCORES.values()
+                    },
+                }
+            )
+            metrics.rows_out = len(base)
+        return base
+
+    @classmethod
+    def statistic_columns(cls, base: pd.DataFrame) -> pd.DataFrame:
+        """
+        Films with a ROI and their gross, cost and ROI; and for every score, the films
+        with both a score x and a gross y with their x, y, x², y² and xy
+        """
+        financed = base['roi'].notna()
+        columns = {
+            'films': financed.astype('int64'),
+            'gross_usd': base[GROSS].where(financed, 0.0),
+            'cost_usd': base['total_cost_usd'].where(financed, 0.0),
+            'roi_sum': base['roi'].where(financed, 0.0),
+        }
+        for prefix, column in SCORES.items():
+            paired = base[column].notna() & base[GROSS].notna()
+            x, y = base[column].where(paired, 0.0), base[GROSS].where(paired, 0.0)
+            columns.update(
+                {
+                    f'{prefix}_n': paired.astype('int64'),
+                    f'{prefix}_x': x,
+                    f'{prefix}_y': y,
+                    f'{prefix}_xx': x * x,
+                    f'{prefix}_yy': y * y,
+                    f'{prefix}_xy': x * y,
+                }
+            )
+        return pd.DataFrame(columns, index=base.index)
+
+    def build_report(self) -> Dict[str, pd.DataFrame]:
+        with stage('aggregate', rows_in=len(self.base)) as metrics:
+            reports = {
+                'roi_by_year': self.roi_by_year_report(),
+                'score_gross_correlation': self.correlation_report(),
+                'top_budget_efficiency': self.top_efficiency_report(),
+            }
+            metrics.rows_out = sum(len(df) for df in reports.values())
+        return reports
+
+    def roi_by_year_report(self) -> pd.DataFrame:
+        """
+        Overall ROI (total gross over total cost) and mean film ROI per release year
+        """
+        stats = self.statistics[
+            self.statistics['release_year'].notna() & (self.statistics['films'] > 0)
+        ]
+        return pd.DataFrame(
+            {
+                'release_year': stats['release_year'].astype('int64'),
+                'films': stats['films'],
+                'total_gross_usd': stats['gross_usd'],
+                'total_cost_usd': stats['cost_usd'],
+                'roi': (stats['gross_usd'] - stats['cost_usd']) / stats['cost_usd'],
+                'mean_roi': stats['roi_sum'] / stats['films'],
+            }
+        ).reset_index(drop=True)
+
+    def correlation_report(self) -> pd.DataFrame:
+        """
+        Pearson correlation of each score with the gross, from the
+        statistics of every year
+        """
+        totals = self.statistics.drop(columns='release_year').sum()
+        rows = []
+        for prefix, column in SCORES.items():
+            n, x, y = (
+                totals[f'{prefix}_n'],
+                totals[f'{prefix}_x'],
+                totals[f'{prefix}_y'],
+            )
+            covariance = n * totals[f'{prefix}_xy'] - x * y
+            variance = (n * totals[f'{prefix}_xx'] - x * x) * (
+                n * totals[f'{prefix}_yy'] - y * y
+            )
+            pearson = (
+                covariance / np.sqrt(variance) if n > 1 and variance > 0 else np.nan
+            )
+            rows.append({'score': column, 'films': int(n), 'pearson_r': pearson})
+        return pd.DataFrame(rows, columns=['score', 'films', 'pearson_r'])
+
+    def top_efficiency_report(self) -> pd.DataFrame:
+        """
+        Films with the highest budget efficiency, ties broken by title; films
+        without one are left out
+        """
+        columns = ['movie_title', 'release_year', GROSS, BUDGET, 'budget_efficiency']
+        # keep='all' would fill a short report up with the films whose
+        # efficiency is missing
+        valued = self.base[self.base['budget_efficiency'].notna()]
+        top = valued.nlargest(self.top_n, 'budget_efficiency', keep='all')[columns]
+        top = top.sort_values(
+            ['budget_efficiency', 'movie_title'], ascending=[False, True]
+        ).head(self.top_n)
+        return top.reset_index(drop=True)
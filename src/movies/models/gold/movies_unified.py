@@ -1,43 +1,62 @@
 import pandas as pd
 
+from src.movies.joins import multiway_outer_join
+from src.movies.metrics import stage
 from src.movies.models.gold.analytics_reports import AnalyticsReport
+from src.movies.models.silver.audience_pulse import AudiencePulse
+from src.movies.models.silver.box_office_metrics import BoxOfficeMetrics
+from src.movies.models.silver.critic_agg import CriticAgg
 
 
 class MoviesUnified(AnalyticsReport):
-    def __init__(self, audience_pulse, critic_agg, box_office_metrics, version='v1'):
-        super().__init__()
+    provider_name = 'gold/movies_unified'
+    inputs = ('silver/audience_pulse', 'silver/critic_agg', 'silver/box_office_metrics')
+    outputs = {'movies_unified': 'df'}
+    upsert_key = 'movie_title'  # rows depend only on the inputs sharing their key
+    join_key = 'movie_title'  # inputs can be joined bucket by bucket on this key
+
+    def __init__(self, audience_pulse, critic_agg, box_office_metrics, version='v1', registry=None):
+        super().__init__(registry)
         self.audience_pulse = audience_pulse
         self.critic_agg = critic_agg
         self.box_office_metrics = box_office_metrics
         self.version = version
         self.df = self.build_report()
 
+    @classmethod
+    def build(cls, inputs, registry=None, **options):
+        """Construct the report from the three silver DataFrames"""
+        audience_df, critic_df, box_office_df = inputs
+        return cls(
+            AudiencePulse.restore(audience_df, registry=registry),
+            CriticAgg.restore(critic_df, registry=registry),
+            BoxOfficeMetrics.restore(box_office_df, registry=registry),
+            registry=registry
+        )
+
     def build_report(self) -> pd.DataFrame:
         """
         Merge all silver layer data into a unified DataFrame
 
         :return: Unified DataFrame with all movie data
         """
-        unified_df = self.audience_pulse.df.copy()
-
-        unified_df = pd.merge(
-            unified_df,
-            self.critic_agg.df,
-            on='movie_title',
-            how='outer',
-            suffixes=('_audience', '_critic')
-        )
-
-        unified_df = pd.merge(
-            unified_df,
-            self.box_office_metrics.df,
-            on='movie_title',
-            how='outer'
-        )
-
-        # Use Schema Registry to apply gold layer column mapping
-        schema = self.registry.get_schema('gold/movies_unified', self.version)
-        if schema:
-            unified_df = schema.apply_mapping(unified_df)
-
-        return unified_df.sort_values('movie_title').reset_index(drop=True)
\ No newline at end of file
+        rows_in = len(self.audience_pulse.df) + len(self.critic_agg.df) + len(self.box_office_metrics.df)
+        with stage('merge', rows_in=rows_in) as metrics:
+            # One outer join over the three inputs, already in movie_title order
+            unified_df = multiway_outer_join(
+                [self.audience_pulse.df, self.critic_agg.df, self.box_office_metrics.df],
+                on='movie_title',
+                suffixes=[('_audience', '_critic')]
+            )
+            metrics.rows_out = len(unified_df)
+
+        with stage('transform', rows_in=len(unified_df)) as metrics:
+            # Use Schema Registry to apply gold layer casts and column mapping: integer
+            # columns the outer join widened to float64 become nullable integers again
+            schema = self.registry.get_schema(self.provider_name, self.version)
+            if schema:
+                unified_df = schema.plan.execute(unified_df, project=False)
+            metrics.rows_out = len(unified_df)
+
+        # Inputs read back from the silver layer have default dtypes; compact the joined table too
+        return self.registry.compact_dataframe(self.provider_name, self.version, unified_df)
\ No newline at end of file
@@ -3,8 +3,12 @@ from src.movies.models.silver.data_provider import DataProvider
 
 
 class AudiencePulse(DataProvider):
-    def __init__(self, df, version='v1'):
-        super().__init__(df)
+    provider_name = 'silver/audience_pulse'
+    inputs = ('bronze/audience_pulse',)
+    outputs = {'audience_pulse': 'df'}
+
+    def __init__(self, df, version='v1', registry=None):
+        super().__init__(df, registry)
         self.version = version
         self.df = self.parse_schema()
 
@@ -14,4 +18,4 @@ class AudiencePulse(DataProvider):
 
         :return: Transformed DataFrame
         """
-        return self.registry.transform_dataframe('silver/audience_pulse', self.version, self.df)
+        return self.registry.transform_dataframe(self.provider_name, self.version, self.df)
@@ -1,11 +1,30 @@
 import pandas as pd
 
+from src.movies.joins import semi_join
+from src.movies.metrics import stage
 from src.movies.models.silver.data_provider import DataProvider
 
 
 class BoxOfficeMetrics(DataProvider):
-    def __init__(self, domestic_df, financials_df, international_df, version='v1'):
-        super().__init__(domestic_df)
+    provider_name = 'silver/box_office'
+    inputs = (
+        'bronze/box_office_domestic',
+        'bronze/box_office_financials',
+        'bronze/box_office_international',
+    )
+    outputs = {'box_office_metrics': 'df'}
+    join_key = 'film_name'  # inputs can be joined bucket by bucket on this key
+    # Columns read from each input and the key every input is inner-joined on,
+    # pushed down to the bronze reads
+    input_columns = {
+        'bronze/box_office_domestic': ('film_name', 'year_of_release', 'box_office_gross_usd'),
+        'bronze/box_office_financials': ('film_name', 'production_budget_usd', 'marketing_spend_usd'),
+        'bronze/box_office_international': ('film_name', 'box_office_gross_usd'),
+    }
+    semi_join_key = 'film_name'
+
+    def __init__(self, domestic_df, financials_df, international_df, version='v1', registry=None):
+        super().__init__(domestic_df, registry)
         self.domestic_df = domestic_df
         self.financials_df = financials_df
         self.international_df = international_df
@@ -18,34 +37,44 @@ class BoxOfficeMetrics(DataProvider):
 
         :return: Merged and transformed DataFrame
         """
-        # Merge domestic and international on film_name only
-        merged_df = pd.merge(
-            self.domestic_df,
-            self.international_df,
-            on='film_name',
-            how='inner',
-            suffixes=('_domestic', '_international')
-        )
-
-        # Calculate total box office gross (domestic + international)
-        merged_df['total_box_office_gross_usd'] = (
-            merged_df['box_office_gross_usd_domestic'] + merged_df['box_office_gross_usd_international']
-        )
-
-        # Merge with financials
-        merged_df = pd.merge(
-            merged_df,
-            self.financials_df,
-            on='film_name',
-            how='inner'
-        )
-
-        merged_df = merged_df[[
-            'film_name',
-            'year_of_release_domestic',
-            'total_box_office_gross_usd',
-            'production_budget_usd',
-            'marketing_spend_usd'
-        ]]
-
-        return self.registry.transform_dataframe('silver/box_office', self.version, merged_df)
+        rows_in = len(self.domestic_df) + len(self.international_df) + len(self.financials_df)
+        with stage('merge', rows_in=rows_in) as metrics:
+            # Only the used columns, and only titles present in all three files, reach the merges
+            domestic_df, international_df, financials_df = semi_join([
+                self.domestic_df[list(self.input_columns['bronze/box_office_domestic'])],
+                self.international_df[list(self.input_columns['bronze/box_office_international'])],
+                self.financials_df[list(self.input_columns['bronze/box_office_financials'])],
+            ], self.semi_join_key)
+
+            # Merge domestic and international on film_name only
+            merged_df = pd.merge(
+                domestic_df.rename(columns={'year_of_release': 'year_of_release_domestic'}),
+                international_df,
+                on='film_name',
+                how='inner',
+                suffixes=('_domestic', '_international')
+            )
+
+            # Calculate total box office gross (domestic + international)
+            merged_df['total_box_office_gross_usd'] = (
+                merged_df['box_office_gross_usd_domestic'] + merged_df['box_office_gross_usd_international']
+            )
+
+            # Merge with financials
+            merged_df = pd.merge(
+                merged_df,
+                financials_df,
+                on='film_name',
+                how='inner'
+            )
+
+            merged_df = merged_df[[
+                'film_name',
+                'year_of_release_domestic',
+                'total_box_office_gross_usd',
+                'production_budget_usd',
+                'marketing_spend_usd'
+            ]]
+            metrics.rows_out = len(merged_df)
+
+        return self.registry.transform_dataframe(self.provider_name, self.version, merged_df)
\ No newline at end of file
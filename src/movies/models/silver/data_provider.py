@@ -1,11 +1,32 @@
 from abc import abstractmethod, ABC
-from src.movies.schema.schema_registry import SchemaRegistry
+from src.movies.schema.schema_registry import get_shared_registry
 
 
 class DataProvider(ABC):
-    def __init__(self, df):
+    # Pipeline declarations: artefacts consumed, in constructor order, and
+    # artefacts produced (artefact name -> attribute)
+    inputs = ()
+    outputs = {}
+
+    def __init__(self, df, registry=None):
         self.df = df
-        self.registry = SchemaRegistry()
+        self.registry = registry if registry is not None else get_shared_registry()
+
+    @classmethod
+    def build(cls, inputs, registry=None, **options):
+        """Construct the model from its input DataFrames"""
+        return cls(*inputs, registry=registry)
+
+    @classmethod
+    def restore(cls, df, version='v1', registry=None):
+        """
+        Wrap an already transformed silver DataFrame, e.g. one read back from disk,
+        without parsing it again
+        """
+        model = cls.__new__(cls)
+        DataProvider.__init__(model, df, registry)
+        model.version = version
+        return model
 
     @abstractmethod
     def parse_schema(self):
@@ -0,0 +1,230 @@
+import ast
+import hashlib
+import importlib.util
+import json
+import os
+import shutil
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+PACKAGE_PREFIX = 'src.movies.'
+# Modules whose code shapes every artefact, on top of the model classes and the
+# modules they import
+SHARED_CODE_MODULES = (
+    'src.movies.schema.schema_registry',
+    'src.movies.storage.readers',
+    'src.movies.pipeline.spill',
+)
+FILE_HASHES = 'file_hashes.json'
+MANIFEST = 'manifest.json'
+
+
+def hash_parts(*parts) -> str:
+    """Stable sha256 of a sequence of JSON-serialisable parts"""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+
+def hash_file(path, block_size=1 << 20) -> str:
+    """sha256 of a file's content, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source_path(module_name: str) -> Optional[Path]:
+    """Source file of a module of the package, None when it is not one"""
+    try:
+        spec = importlib.util.find_spec(module_name)
+    except ModuleNotFoundError:
+        return None
+    return Path(spec.origin) if spec is not None and spec.origin else None
+
+
+def module_source(module_name: str) -> bytes:
+    """Source code of a module of the package"""
+    return _source_path(module_name).read_bytes()
+
+
+def _imported_modules(module_name: str) -> List[str]:
+    """Modules of the package imported anywhere in a module's source"""
+    source = module_source(module_name)
+    imported = []
+    for statement in ast.walk(ast.parse(source)):
+        if isinstance(statement, ast.Import):
+            imported.extend(alias.name for alias in statement.names)
+        elif isinstance(statement, ast.ImportFrom) and statement.module:
+            imported.append(statement.module)
+            # 'from package import module' imports a module, not a name
+            imported.extend(
+                f"{statement.module}.{alias.name}"
+                for alias in statement.names
+                if _source_path(f"{statement.module}.{alias.name}") is not None
+            )
+    return [
+        name
+        for name in imported
+        if name.startswith(PACKAGE_PREFIX) and _source_path(name) is not None
+    ]
+
+
+def code_modules(model: type) -> List[str]:
+    """
+    Modules whose code shapes a model's artefacts: those defining the model and its
+    base classes, the shared modules, and every module of the package they import,
+    directly or not
+    """
+    pending = [
+        cls.__module__
+        for cls in model.__mro__
+        if cls.__module__.startswith(PACKAGE_PREFIX)
+    ]
+    pending.extend(SHARED_CODE_MODULES)
+    modules = set()
+    while pending:
+        module_name = pending.pop()
+        if module_name not in modules:
+            modules.add(module_name)
+            pending.extend(_imported_modules(module_name))
+    return sorted(modules)
+
+
+@lru_cache(maxsize=None)
+def code_version(model: type) -> str:
+    """
+    Hash of the source files defining a model, its base classes, the shared
+    transformation code and everything they import from the package, so editing
+    any of them invalidates the cache
+    """
+    digest = hashlib.sha256()
+    for module_name in code_modules(model):
+        digest.update(module_name.encode())
+        digest.update(module_source(module_name))
+    return digest.hexdigest()
+
+
+class StageCache:
+    """
+    Persistent cache of materialised stage outputs, keyed by a content hash.
+
+    Each entry is a directory named after the key, holding a copy of every
+    file the stage saved and a manifest mapping artefacts to those copies.
+    File content hashes are remembered per (mtime_ns, size) stamp so unchanged
+    inputs are not read again to be hashed.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._file_hashes_path = self.cache_dir / FILE_HASHES
+        self._file_hashes: Dict[str, dict] = (
+            self._read_json(self._file_hashes_path) or {}
+        )
+        self._file_hashes_dirty = False
+
+    @classmethod
+    def from_config(cls, config) -> Optional['StageCache']:
+        """
+        Create the cache described by the cache section of the config,
+        or None when disabled
+        """
+        settings = config.get('cache') or {}
+        if not settings.get('enabled', bool(settings)):
+            return None
+        return cls(settings.get('dir', 'target/.cache'))
+
+    def file_hash(self, path) -> str:
+        """
+        Content hash of a file, reusing the remembered hash while its stamp is unchanged
+        """
+        resolved = str(Path(path).resolve())
+        stat = os.stat(resolved)
+        stamp = [stat.st_mtime_ns, stat.st_size]
+        known = self._file_hashes.get(resolved)
+        if known is not None and known['stamp'] == stamp:
+            return known['sha256']
+        content_hash = hash_file(resolved)
+        self._file_hashes[resolved] = {'stamp': stamp, 'sha256': content_hash}
+        self._file_hashes_dirty = True
+        return content_hash
+
+    def lookup(self, key: str) -> Optional[List[Tuple[str, Path, int]]]:
+        """Cached (artefact, file, rows) of an entry, or None on a miss"""
+        manifest = self._read_json(self.cache_dir / key / MANIFEST)
+        if manifest is None:
+            return None
+        entries = [
+            (artefact, self.cache_dir / key / name, rows)
+            for artefact, name, rows in manifest['artefacts']
+        ]
+        if not all(cached_file.exists() for _, cached_file, _ in entries):
+            return None
+        return entries
+
+    def restore(
+        self, key: str, targets: Dict[str, str]
+    ) -> Optional[List[Tuple[str, str, int]]]:
+        """
+        Copy the files of a cached entry to their output paths
+
+        :param targets: Output path per artefact
+        :return: (artefact, path, rows) for every restored file, or None on a miss
+        """
+        entries = self.lookup(key)
+        if entries is None or {artefact for artefact, _, _ in entries} != set(targets):
+            return None
+        restored = []
+        for artefact, cached_file, rows in entries:
+            Path(targets[artefact]).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(cached_file, targets[artefact])
+            restored.append((artefact, targets[artefact], rows))
+        return restored
+
+    def store(self, key: str, saved: List[Tuple[str, str, int]]):
+        """
+        Copy the files a stage saved into a new entry. The entry is built in a
+        temporary directory and renamed into place, so readers never see a partial
+        entry.
+
+        :param saved: (artefact, path, rows) for every file of the stage
+        """
+        entry_dir = self.cache_dir / key
+        if entry_dir.exists():
+            return
+        staging = Path(tempfile.mkdtemp(prefix=f".{key[:12]}-", dir=self.cache_dir))
+        try:
+            manifest = []
+            for artefact, path, rows in saved:
+                name = artefact.replace('/', '__') + Path(path).suffix
+                shutil.copyfile(path, staging / name)
+                manifest.append([artefact, name, rows])
+            (staging / MANIFEST).write_text(json.dumps({'artefacts': manifest}))
+            os.rename(staging, entry_dir)
+        except OSError:
+            # Another run stored the same entry first
+            shutil.rmtree(staging, ignore_errors=True)
+            if not entry_dir.exists():
+                raise
+
+    def flush(self):
+        """Persist the remembered file hashes"""
+        if not self._file_hashes_dirty:
+            return
+        self._write_json(self._file_hashes_path, self._file_hashes)
+        self._file_hashes_dirty = False
+
+    def _write_json(self, path, data):
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w') as file:
+            json.dump(data, file)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _read_json(path):
+        try:
+            return json.loads(Path(path).read_text())
+        except (FileNotFoundError, ValueError):
+            return None
@@ -0,0 +1,224 @@
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.movies.metrics import stage
+from src.movies.storage.layers import artefact_path, get_layer_writer
+from src.movies.storage.readers import read_table
+from src.movies.storage.writers import ArrowIpcWriter
+
+INSERT, UPDATE, DELETE = 'insert', 'update', 'delete'
+OP_COLUMN = 'op'
+HASH_COLUMN = 'row_hash'
+
+
+@dataclass(frozen=True)
+class ChangesetSettings:
+    """Change data capture of the gold tables keyed by an upsert key"""
+
+    enabled: bool = False
+    # Also rewrite the full table; False writes only the changesets
+    snapshot: bool = True
+    dir: Optional[str] = None  # '<gold dir>/_changes' by default
+
+    @classmethod
+    def from_config(cls, config) -> 'ChangesetSettings':
+        """
+        Settings from the changeset section of a config, disabled when
+        the section is missing
+        """
+        section = (config or {}).get('changeset') or {}
+        if not section:
+            return cls()
+        return cls(
+            enabled=section.get('enabled', True),
+            snapshot=section.get('snapshot', True),
+            dir=section.get('dir'),
+        )
+
+    def directory(self, config) -> Path:
+        return (
+            Path(self.dir) if self.dir else Path(config['output']['gold']) / '_changes'
+        )
+
+
+def writes_changeset(node) -> bool:
+    """Gold nodes declaring an upsert key have their changes captured"""
+    return node.layer == 'gold' and node.declared('upsert_key') is not None
+
+
+def _canonical(series: pd.Series) -> pd.Series:
+    """
+    Values in a form that does not depend on the dtype of the column, so a row hashes
+    the same whether it was built in memory or read back from any layer format:
+    numbers as float64, everything else as text, missing values as NaN or ''
+    """
+    if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+        return pd.Series(
+            series.to_numpy(dtype='float64', na_value=np.nan), index=series.index
+        )
+    return series.astype(object).where(series.notna(), '').astype(str)
+
+
+def row_hashes(df: pd.DataFrame, key: str) -> pd.Series:
+    """
+    64-bit hash of every row over all its columns, indexed by key
+
+    :raises ValueError: When the key is not unique
+    """
+    if not df[key].is_unique:
+        raise ValueError(f"Changes are captured by {key}, which is not unique")
+    canonical = pd.DataFrame({column: _canonical(df[column]) for column in df.columns})
+    hashes = pd.util.hash_pandas_object(canonical, index=False).to_numpy()
+    return pd.Series(
+        hashes, index=pd.Index(df[key].to_numpy(), name=key), name=HASH_COLUMN
+    )
+
+
+@dataclass
+class Changeset:
+    """
+    Rows inserted, updated and deleted since the previous materialisation of a table
+    """
+
+    artefact: str
+    key: str
+    changes: pd.DataFrame  # OP_COLUMN, then the table columns; deletes carry their key
+    hashes: pd.Series  # row hashes of the new table, the state of the next comparison
+
+    def count(self, op: str) -> int:
+        return int((self.changes[OP_COLUMN] == op).sum())
+
+    def __str__(self):
+        return (
+            f"Changes of {self.artefact}: {self.count(INSERT)} inserts, "
+            f"{self.count(UPDATE)} updates, {self.count(DELETE)} deletes"
+        )
+
+
+def _state_path(settings: ChangesetSettings, config, artefact) -> Path:
+    return settings.directory(config) / f"{artefact.split('/', 1)[1]}.row_hashes.arrow"
+
+
+def previous_hashes(settings: ChangesetSettings, config, artefact, key) -> pd.Series:
+    """
+    Row hashes of the previous materialisation: the stored ones, else those of the
+    snapshot on disk, else none (every row is an insert)
+    """
+    state = _state_path(settings, config, artefact)
+    if state.exists():
+        stored = read_table(str(state))
+        return pd.Series(
+            stored[HASH_COLUMN].to_numpy(),
+            index=pd.Index(stored[key].to_numpy(), name=key),
+        )
+    snapshot = artefact_path(config, artefact)
+    if Path(snapshot).exists():
+        return row_hashes(read_table(snapshot), key)
+    return pd.Series([], index=pd.Index([], name=key), dtype='uint64')
+
+
+def _nullable_dtypes(df: pd.DataFrame) -> dict:
+    """
+    Dtypes of a table with numpy integers and booleans swapped for
+    their nullable equivalents
+    """
+    dtypes = {}
+    for column, dtype in df.dtypes.items():
+        if dtype.kind in 'iu':
+            dtypes[column] = (
+                f"{'UInt' if dtype.kind == 'u' else 'Int'}{dtype.itemsize * 8}"
+            )
+        elif dtype.kind == 'b':
+            dtypes[column] = 'boolean'
+        else:
+            dtypes[column] = dtype
+    return dtypes
+
+
+def compute_changeset(
+    config,
+    artefact,
+    df: pd.DataFrame,
+    key: str,
+    settings: Optional[ChangesetSettings] = None,
+) -> Changeset:
+    """
+    Compare a new table with its previous materialisation, row by row on their hashes
+    """
+    settings = settings or ChangesetSettings.from_config(config)
+    with stage('changeset', rows_in=len(df)) as metrics:
+        previous = previous_hashes(settings, config, artefact, key)
+        hashes = row_hashes(df, key)
+
+        # Position of every new key among the previous ones, -1 for new keys
+        positions = previous.index.get_indexer(hashes.index)
+        inserted = positions == -1
+        updated = ~inserted
+        updated[updated] = (
+            previous.to_numpy()[positions[updated]] != hashes.to_numpy()[updated]
+        )
+        deleted = previous.index[hashes.index.get_indexer(previous.index) == -1]
+
+        ops = np.where(inserted, INSERT, UPDATE)
+        columns = [OP_COLUMN, *df.columns]
+        changes = df[inserted | updated].assign(**{OP_COLUMN: ops[inserted | updated]})[
+            columns
+        ]
+        if len(deleted):
+            # Deleted rows only carry their key: the other columns must hold missing
+            # values without turning integers into floats
+            dtypes = _nullable_dtypes(changes)
+            deletes = pd.DataFrame(
+                {key: deleted.to_numpy(), OP_COLUMN: DELETE}
+            ).reindex(columns=columns)
+            changes = pd.concat(
+                [changes.astype(dtypes), deletes.astype(dtypes)], ignore_index=True
+            )
+        else:
+            changes = changes.reset_index(drop=True)
+        metrics.rows_out = len(changes)
+    return Changeset(artefact, key, changes, hashes)
+
+
+def write_changeset(
+    config, changeset: Changeset, settings: Optional[ChangesetSettings] = None
+) -> Optional[str]:
+    """
+    Write a changeset as '<changes dir>/<table>/<UTC time>.<ext>' in the gold format,
+    then store the new row hashes. Nothing is written when no row changed.
+
+    :return: Path of the changeset file, None when empty
+    """
+    settings = settings or ChangesetSettings.from_config(config)
+    directory = settings.directory(config)
+    path = None
+    if len(changeset.changes):
+        writer = get_layer_writer(config, 'gold')
+        table_dir = directory / changeset.artefact.split('/', 1)[1]
+        table_dir.mkdir(parents=True, exist_ok=True)
+        # Timestamped names sort in the order the changesets must be applied
+        path = str(
+            table_dir
+            / f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S%fZ}{writer.extension}"
+        )
+        with stage('write', rows_in=len(changeset.changes)):
+            writer.write(changeset.changes, path)
+        logging.info(f"✓ Saved changeset: {path} ({changeset})")
+    else:
+        logging.info(f"No changes to {changeset.artefact}")
+
+    # The state moves on only once the changeset is written, so a
+    # failed run emits it again
+    state = _state_path(settings, config, changeset.artefact)
+    state.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = state.with_name(f"{state.name}.tmp")
+    ArrowIpcWriter().write(changeset.hashes.reset_index(), tmp_path)
+    os.replace(tmp_path, state)
+    return path
@@ -0,0 +1,334 @@
+import ast
+import importlib
+import importlib.util
+import inspect
+import pkgutil
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.movies.storage.layers import LAYERS
+
+MODELS_PACKAGE = 'src.movies.models'
+# Class attributes the pipeline reads from models, besides inputs, outputs and sources
+DECLARATIONS = (
+    'provider_name',
+    'build_options',
+    'upsert_key',
+    'refresh_key',
+    'join_key',
+    'input_columns',
+    'semi_join_key',
+)
+
+
+@lru_cache(maxsize=None)
+def load_model(model_path: str) -> type:
+    """Import a model class from its '<module>:<class>' path"""
+    module_name, class_name = model_path.split(':')
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+@dataclass(frozen=True)
+class Node:
+    """A model in the pipeline graph, with the artefacts it consumes and produces"""
+
+    name: str  # '<layer>/<module>', e.g. 'silver/box_office_metrics'
+    layer: str
+    model_path: str  # '<module>:<class>'; the class is imported on first use of model
+    inputs: Tuple[str, ...] = ()  # artefacts consumed, in constructor order
+    outputs: Tuple[Tuple[str, str], ...] = ()  # (artefact, model attribute)
+    sources: Tuple[str, ...] = ()  # config source keys read by bronze models
+    declarations: Dict[str, object] = field(
+        default_factory=dict, compare=False, repr=False
+    )
+    model_class: Optional[type] = field(default=None, compare=False, repr=False)
+
+    @classmethod
+    def from_model(cls, name, layer, model):
+        """Build a node from the pipeline declarations of a model class"""
+        return cls(
+            name=name,
+            layer=layer,
+            model_path=f"{model.__module__}:{model.__qualname__}",
+            inputs=tuple(getattr(model, 'inputs', ())),
+            outputs=tuple(
+                (f"{layer}/{artefact}", attribute)
+                for artefact, attribute in model.outputs.items()
+            ),
+            sources=tuple(getattr(model, 'sources', ())),
+            declarations={
+                name: getattr(model, name)
+                for name in DECLARATIONS
+                if hasattr(model, name)
+            },
+            model_class=model,
+        )
+
+    @property
+    def model(self) -> type:
+        """The model class, imported when first needed"""
+        return (
+            self.model_class
+            if self.model_class is not None
+            else load_model(self.model_path)
+        )
+
+    def declared(self, attribute, default=None):
+        """A pipeline declaration of the model, read without importing it"""
+        return self.declarations.get(attribute, default)
+
+    @property
+    def artefacts(self) -> Tuple[str, ...]:
+        """Names of the artefacts produced by the node"""
+        return tuple(artefact for artefact, _ in self.outputs)
+
+
+def _class_declarations(class_def: ast.ClassDef) -> Optional[Dict[str, object]]:
+    """
+    Literal class attributes of a class definition, or None when a pipeline
+    declaration is not a literal and the class must be imported to read it
+    """
+    declarations = {}
+    for statement in class_def.body:
+        if isinstance(statement, ast.Assign) and len(statement.targets) == 1:
+            target, value = statement.targets[0], statement.value
+        elif isinstance(statement, ast.AnnAssign) and statement.value is not None:
+            target, value = statement.target, statement.value
+        else:
+            continue
+        if not isinstance(target, ast.Name):
+            continue
+        try:
+            declarations[target.id] = ast.literal_eval(value)
+        except ValueError:
+            if target.id in ('inputs', 'outputs', 'sources', *DECLARATIONS):
+                return None
+    return declarations
+
+
+def _is_abstract(class_def: ast.ClassDef) -> bool:
+    """True when the class body declares abstract methods"""
+    for statement in class_def.body:
+        if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            for decorator in statement.decorator_list:
+                name = (
+                    decorator.attr
+                    if isinstance(decorator, ast.Attribute)
+                    else getattr(decorator, 'id', None)
+                )
+                if name == 'abstractmethod':
+                    return True
+    return False
+
+
+def discover_nodes(package: str = MODELS_PACKAGE) -> List[Node]:
+    """
+    Find the model classes of the bronze, silver and gold packages and return a
+    node for each class declaring outputs in its body.
+
+    Model modules are parsed, not imported: pipeline declarations are read from
+    the literal class attributes, and a model is only imported when its stage
+    runs. Classes whose declarations are not literals are imported right away.
+    """
+    package_dir = Path(importlib.util.find_spec(package).origin).parent
+    nodes = []
+    for layer in LAYERS:
+        for module_info in pkgutil.iter_modules([str(package_dir / layer)]):
+            module_name = f"{package}.{layer}.{module_info.name}"
+            name = f"{layer}/{module_info.name}"
+            tree = ast.parse(
+                (package_dir / layer / f"{module_info.name}.py").read_text()
+            )
+            for class_def in tree.body:
+                if not isinstance(class_def, ast.ClassDef) or _is_abstract(class_def):
+                    continue
+                declarations = _class_declarations(class_def)
+                if declarations is None:
+                    model = getattr(
+                        importlib.import_module(module_name), class_def.name
+                    )
+                    concrete = not inspect.isabstract(model)
+                    if getattr(model, 'outputs', None) and concrete:
+                        nodes.append(Node.from_model(name, layer, model))
+                elif declarations.get('outputs'):
+                    nodes.append(
+                        Node(
+                            name=name,
+                            layer=layer,
+                            model_path=f"{module_name}:{class_def.name}",
+                            inputs=tuple(declarations.get('inputs', ())),
+                            outputs=tuple(
+                                (f"{layer}/{artefact}", attribute)
+                                for artefact, attribute in declarations[
+                                    'outputs'
+                                ].items()
+                            ),
+                            sources=tuple(declarations.get('sources', ())),
+                            declarations={
+                                key: declarations[key]
+                                for key in DECLARATIONS
+                                if key in declarations
+                            },
+                        )
+                    )
+    return nodes
+
+
+class PipelineGraph:
+    """
+    Dependency graph between pipeline nodes, built from the artefacts each
+    model declares as inputs and outputs.
+    """
+
+    def __init__(self, nodes: Iterable[Node]):
+        self.nodes: Dict[str, Node] = {}
+        self.producers: Dict[str, str] = {}  # artefact -> node name
+        for node in nodes:
+            if node.name in self.nodes:
+                raise ValueError(f"Duplicate pipeline node: {node.name}")
+            self.nodes[node.name] = node
+            for artefact in node.artefacts:
+                if artefact in self.producers:
+                    raise ValueError(
+                        f"Artefact {artefact} is produced by both {self.producers[artefact]} and {node.name}"
+                    )
+                self.producers[artefact] = node.name
+
+        for node in self.nodes.values():
+            missing = [
+                artefact for artefact in node.inputs if artefact not in self.producers
+            ]
+            if missing:
+                raise ValueError(f"No node produces {missing}, required by {node.name}")
+
+        self.order = self._topological_order()
+
+    @classmethod
+    def discover(cls, package: str = MODELS_PACKAGE) -> 'PipelineGraph':
+        """Build the graph from the models found in a models package"""
+        return cls(discover_nodes(package))
+
+    def upstream(self, name: str) -> List[str]:
+        """Nodes producing the inputs of a node"""
+        return sorted(
+            {self.producers[artefact] for artefact in self.nodes[name].inputs},
+            key=self._sort_key,
+        )
+
+    def downstream(self, name: str) -> List[str]:
+        """Nodes consuming any artefact of a node"""
+        artefacts = set(self.nodes[name].artefacts)
+        return [
+            other
+            for other in self.order
+            if artefacts.intersection(self.nodes[other].inputs)
+        ]
+
+    def pushdown(self, name: str) -> Dict[str, object]:
+        """
+        Read options a bronze node can apply on behalf of the nodes consuming it
+
+        :return: 'columns': columns read from each output (by output name), for the
+                 outputs every consumer declares input_columns for, and 'semi_join_key':
+                 a key the only consumer inner-joins all the outputs on
+        """
+        node = self.nodes[name]
+        consumers = [self.nodes[other] for other in self.downstream(name)]
+        options = {}
+
+        columns = {}
+        for artefact, _ in node.outputs:
+            readers = [
+                consumer for consumer in consumers if artefact in consumer.inputs
+            ]
+            declared = [
+                consumer.declared('input_columns', {}).get(artefact)
+                for consumer in readers
+            ]
+            if readers and None not in declared:
+                columns[artefact.split('/', 1)[1]] = list(
+                    dict.fromkeys(column for names in declared for column in names)
+                )
+        if columns:
+            options['columns'] = columns
+
+        if len(consumers) == 1 and set(node.artefacts) <= set(consumers[0].inputs):
+            key = consumers[0].declared('semi_join_key')
+            if key is not None:
+                options['semi_join_key'] = key
+        return options
+
+    def descendants(self, names: Iterable[str]) -> List[str]:
+        """The given nodes and every node that depends on them, in topological order"""
+        selected = set(names)
+        for name in self.order:
+            if any(parent in selected for parent in self.upstream(name)):
+                selected.add(name)
+        return [name for name in self.order if name in selected]
+
+    def resolve(self, targets: Iterable[str]) -> List[str]:
+        """
+        Resolve target names to nodes: a node name selects that node and a
+        layer name selects every node of the layer
+        """
+        selected = set()
+        for target in targets:
+            if target in self.nodes:
+                selected.add(target)
+            elif target in LAYERS:
+                selected.update(
+                    name for name, node in self.nodes.items() if node.layer == target
+                )
+            else:
+                raise ValueError(
+                    f"Unknown pipeline target: {target}. Available nodes: {self.order}"
+                )
+        return [name for name in self.order if name in selected]
+
+    def select(
+        self,
+        only: Optional[Iterable[str]] = None,
+        start: Optional[Iterable[str]] = None,
+    ) -> List[str]:
+        """
+        Select the nodes to run, in topological order
+
+        :param only: Run exactly these targets
+        :param start: Run these targets and everything downstream of them
+        :return: All nodes when neither is given
+        """
+        if only and start:
+            raise ValueError("Select nodes with either only or start, not both")
+        if only:
+            return self.resolve(only)
+        if start:
+            return self.descendants(self.resolve(start))
+        return list(self.order)
+
+    def _sort_key(self, name):
+        return LAYERS.index(self.nodes[name].layer), name
+
+    def _topological_order(self) -> List[str]:
+        """
+        Kahn's algorithm, breaking ties by layer then name so the order is deterministic
+        """
+        remaining = {
+            name: set(self.producers[artefact] for artefact in node.inputs)
+            for name, node in self.nodes.items()
+        }
+        order = []
+        while remaining:
+            ready = sorted(
+                (name for name, parents in remaining.items() if not parents),
+                key=self._sort_key,
+            )
+            if not ready:
+                raise ValueError(f"Cycle between pipeline nodes: {sorted(remaining)}")
+            for name in ready:
+                del remaining[name]
+                order.append(name)
+            for parents in remaining.values():
+                parents.difference_update(ready)
+        return order
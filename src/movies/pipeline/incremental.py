@@ -0,0 +1,581 @@
+import json
+import logging
+import os
+import tempfile
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from src.movies.metrics import TOTAL, stage
+from src.movies.pipeline.changeset import (
+    ChangesetSettings,
+    compute_changeset,
+    write_changeset,
+)
+from src.movies.pipeline.graph import Node, PipelineGraph
+from src.movies.schema.dtypes import DtypePolicy
+from src.movies.schema.schema_registry import get_shared_registry
+from src.movies.schema.validation import ValidationPolicy, validation_policy
+from src.movies.storage.layers import (
+    artefact_path,
+    get_layer_writer,
+    partition_path,
+    source_pattern,
+)
+from src.movies.storage.partitions import list_partitions
+from src.movies.storage.readers import read_table
+from src.movies.storage.writers import ArrowIpcWriter
+
+CURRENT_DIR = '_current'
+PARTITION_COLUMN = '_partition'
+
+
+class WatermarkStore:
+    """Last processed partition per bronze node, persisted as JSON"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        try:
+            self.watermarks: Dict[str, str] = json.loads(self.path.read_text())
+        except FileNotFoundError:
+            self.watermarks = {}
+
+    def get(self, name: str) -> Optional[str]:
+        return self.watermarks.get(name)
+
+    def set(self, name: str, partition: str):
+        self.watermarks[name] = partition
+
+    def save(self):
+        """Write the watermarks atomically"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix='.tmp')
+        with os.fdopen(fd, 'w') as file:
+            json.dump(self.watermarks, file, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+def pending_partitions(
+    node: Node, config, watermark: Optional[str] = None
+) -> List[Tuple[str, List[str]]]:
+    """
+    Partitions of a bronze node newer than its watermark, with one file per source.
+    Only partitions with a file for every source are returned, and the run stops
+    at the first incomplete one so the watermark never skips a partition.
+
+    :return: (partition, source files) in ascending partition order
+    """
+    sources = [list_partitions(source_pattern(config, key)) for key in node.sources]
+    partitions = sorted(set().union(*sources))
+    pending = []
+    for partition in partitions:
+        if watermark is not None and partition <= watermark:
+            continue
+        if not all(partition in files for files in sources):
+            logging.warning(
+                f"Waiting for the missing files of partition {partition} of {node.name}"
+            )
+            break
+        pending.append((partition, [files[partition] for files in sources]))
+    return pending
+
+
+def partition_sources(node: Node, config, partition: str) -> Optional[List[str]]:
+    """Files of one partition of a bronze node, or None unless every source has one"""
+    paths = []
+    for key in node.sources:
+        files = list_partitions(source_pattern(config, key))
+        if partition not in files:
+            return None
+        paths.append(files[partition])
+    return paths
+
+
+def upsert_keys(graph: PipelineGraph, artefact: str) -> List[str]:
+    """Key columns of the gold nodes reading an artefact"""
+    return sorted(
+        {
+            graph.nodes[name].declared('upsert_key')
+            for name in graph.order
+            if graph.nodes[name].layer == 'gold'
+            and artefact in graph.nodes[name].inputs
+        }
+    )
+
+
+@dataclass
+class PartitionResult:
+    rows: Dict[str, int] = field(default_factory=dict)  # artefact -> rows written
+    # Silver artefact -> changed key columns
+    changed: Dict[str, List[pd.DataFrame]] = field(default_factory=dict)
+    # Silver artefact -> column dtypes written
+    dtypes: Dict[str, Dict[str, str]] = field(default_factory=dict)
+
+
+def write_partition(
+    config, frames: Dict[str, pd.DataFrame], partition: str, result: PartitionResult
+):
+    """Write one partition file per artefact, replacing any previous version"""
+    for artefact, df in frames.items():
+        path = partition_path(config, artefact, partition)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with stage('write', rows_in=len(df)):
+            get_layer_writer(config, artefact.split('/', 1)[0]).write(df, path)
+        result.rows[artefact] = len(df)
+        logging.info(f"✓ Saved partition: {path} ({len(df)} rows)")
+
+
+def run_partition(
+    graph: PipelineGraph, node: Node, partition, paths, config, registry, options=None
+) -> PartitionResult:
+    """
+    Ingest one partition of a bronze node and of the silver nodes reading it.
+    Module level so that process pools can run partitions in parallel.
+
+    :return: Rows written per artefact, and the key columns of the silver rows
+             written or replaced, for the gold update
+    """
+    result = PartitionResult()
+    with (
+        validation_policy(ValidationPolicy.from_config(config)),
+        stage(TOTAL, node=node.name) as metrics,
+    ):
+        model = node.model.build(
+            paths, registry=registry, **{**(options or {}), **graph.pushdown(node.name)}
+        )
+        frames = {
+            artefact: getattr(model, attribute) for artefact, attribute in node.outputs
+        }
+        write_partition(config, frames, partition, result)
+        metrics.rows_out = sum(len(df) for df in frames.values())
+
+    for consumer_name in graph.downstream(node.name):
+        consumer = graph.nodes[consumer_name]
+        if consumer.layer != 'silver' or not set(consumer.inputs) <= set(frames):
+            raise ValueError(
+                f"{consumer_name} must read only from {node.name} to run incrementally"
+            )
+        inputs = [frames[artefact] for artefact in consumer.inputs]
+        with stage(
+            TOTAL, rows_in=sum(len(df) for df in inputs), node=consumer_name
+        ) as metrics:
+            silver_model = consumer.model.build(inputs, registry=registry)
+            silver_frames = {
+                artefact: getattr(silver_model, attribute)
+                for artefact, attribute in consumer.outputs
+            }
+            for artefact, df in silver_frames.items():
+                result.dtypes[artefact] = df.dtypes.astype(str).to_dict()
+                keys = upsert_keys(graph, artefact)
+                changed = result.changed.setdefault(artefact, [])
+                previous = partition_path(config, artefact, partition)
+                if Path(previous).exists():
+                    changed.append(read_table(previous)[keys])
+                changed.append(df[keys])
+            write_partition(config, silver_frames, partition, result)
+            metrics.rows_out = sum(len(df) for df in silver_frames.values())
+    return result
+
+
+def align_dtypes(df: pd.DataFrame, dtypes: Optional[Dict[str, str]]) -> pd.DataFrame:
+    """
+    Cast the columns of a table read back from disk to the dtypes it was built with.
+    A column whose values the dtype cannot hold, such as missing values for a
+    dtype inferred from rows that had none, is left as read.
+    """
+    casts = {}
+    for column, dtype in (dtypes or {}).items():
+        if column not in df.columns or str(df[column].dtype) == dtype:
+            continue
+        try:
+            casts[column] = df[column].astype(dtype)
+        except (TypeError, ValueError):
+            continue
+    return df.assign(**casts) if casts else df
+
+
+def current_state_path(config, artefact) -> Path:
+    """Current rows of a partitioned artefact: '<layer dir>/_current/<table>.arrow'"""
+    layer, name = artefact.split('/', 1)
+    return Path(config['output'][layer]) / CURRENT_DIR / f"{name}.arrow"
+
+
+def _partition_files(config, artefact) -> Dict[str, str]:
+    layer, name = artefact.split('/', 1)
+    extension = get_layer_writer(config, layer).extension
+    directory = Path(config['output'][layer]) / name
+    return {
+        path.name[: -len(extension)]: str(path)
+        for path in sorted(directory.glob(f"*{extension}"))
+    }
+
+
+def _read_partitions(
+    files: Dict[str, str], dtypes, key=None, keys=None
+) -> List[pd.DataFrame]:
+    frames = []
+    for partition, path in files.items():
+        df = align_dtypes(read_table(path), dtypes)
+        if keys is not None:
+            df = df[df[key].isin(keys)]
+        frames.append(df.assign(**{PARTITION_COLUMN: partition}))
+    return frames
+
+
+def load_current_state(
+    config, artefact, key, partitions=(), dtypes: Optional[Dict[str, str]] = None
+) -> pd.DataFrame:
+    """
+    Latest row of every key of a partitioned artefact, kept as a compacted snapshot
+    next to its partitions, with the partition each row comes from. The given
+    partitions, just written, are upserted into the snapshot, so a run reads the
+    snapshot and its new partitions instead of the whole history. Without a
+    snapshot, every partition on disk is compacted into a new one.
+
+    :param partitions: Partitions written since the snapshot was saved
+    :param dtypes: Column dtypes of the artefact, restored on the partitions read back
+    """
+    path = current_state_path(config, artefact)
+    files = _partition_files(config, artefact)
+    if path.exists():
+        state = read_table(str(path))
+        if not partitions:
+            return state
+        rewritten = state[PARTITION_COLUMN].isin(partitions)
+        frames = [state[~rewritten]]
+        frames += _read_partitions(
+            {partition: files[partition] for partition in partitions}, dtypes
+        )
+        # A rewritten partition may have dropped keys it held the latest row of: their
+        # previous rows, if any, are looked up in the other partitions
+        lost = set(state.loc[rewritten, key]).difference(
+            *(df[key] for df in frames[1:])
+        )
+        if lost:
+            others = {
+                partition: file
+                for partition, file in files.items()
+                if partition not in partitions
+            }
+            frames += _read_partitions(others, dtypes, key, lost)
+    else:
+        if not files:
+            raise FileNotFoundError(
+                f"No partition of {artefact} in {Path(config['output'][artefact.split('/')[0]])}"
+            )
+        frames = _read_partitions(files, dtypes)
+
+    with stage('compact', rows_in=sum(len(df) for df in frames)) as metrics:
+        state = pd.concat(frames, ignore_index=True)
+        # The latest partition of each key wins, whatever order
+        # partitions were written in
+        state = state.sort_values(PARTITION_COLUMN, kind='stable').drop_duplicates(
+            subset=key, keep='last'
+        )
+        state = state.reset_index(drop=True)
+        metrics.rows_out = len(state)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    with stage('write', rows_in=len(state)):
+        # Arrow keeps the dtypes whatever the layer format
+        ArrowIpcWriter().write(state, tmp_path)
+        os.replace(tmp_path, path)
+    logging.info(f"✓ Compacted current rows: {path} ({len(state)} rows)")
+    return state
+
+
+def update_current_state(
+    graph: PipelineGraph,
+    config,
+    written: Dict[str, List[str]],
+    dtypes: Dict[str, Dict[str, str]],
+) -> Dict[str, pd.DataFrame]:
+    """
+    Upsert the silver partitions written by a run into the snapshots of the artefacts
+    read by gold upsert nodes
+
+    :param written: Partitions written per silver artefact
+    :param dtypes: Column dtypes per silver artefact
+    :return: Current rows per artefact
+    """
+    current = {}
+    for artefact, partitions in written.items():
+        keys = upsert_keys(graph, artefact)
+        if not keys:
+            continue
+        if len(keys) > 1:
+            raise ValueError(f"Gold nodes read {artefact} by different keys: {keys}")
+        current[artefact] = load_current_state(
+            config, artefact, keys[0], sorted(set(partitions)), dtypes.get(artefact)
+        )
+    return current
+
+
+def update_gold(
+    graph: PipelineGraph,
+    node: Node,
+    config,
+    registry,
+    changed: Dict[str, List[pd.DataFrame]],
+    current: Optional[Dict[str, pd.DataFrame]] = None,
+    changed_keys: Optional[Dict[str, Set]] = None,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Recompute the rows of a gold node for the changed keys and merge them into its
+    tables
+
+    :param changed: Changed key columns per silver artefact; the recomputed rows
+                    of the node's tables are added to it
+    :param current: Current rows per silver artefact, loaded from their snapshots
+                    when missing
+    :param changed_keys: Changed keys per gold artefact, added to for the node's
+                         tables; unlike the recomputed rows, they include the keys
+                         no longer in a table
+    :return: Updated tables, empty when no key changed
+    """
+    key = node.declared('upsert_key')
+    keys: Set = set()
+    for artefact in node.inputs:
+        for df in changed.get(artefact, ()):
+            keys.update(df[key].dropna())
+    if not keys:
+        logging.info(f"No changed keys for {node.name}")
+        return {}
+
+    updated = {}
+    with stage(TOTAL, node=node.name) as metrics:
+        current = {} if current is None else current
+        inputs = [
+            current_rows(config, artefact, key, keys, current)
+            for artefact in node.inputs
+        ]
+        metrics.rows_in = sum(len(df) for df in inputs)
+        model = node.model.build(inputs, registry=registry)
+
+        for artefact, attribute in node.outputs:
+            path = artefact_path(config, artefact)
+            df = getattr(model, attribute)
+            # The recomputed rows are the changes seen by the gold
+            # nodes reading this table
+            changed.setdefault(artefact, []).append(df)
+            if changed_keys is not None:
+                changed_keys.setdefault(artefact, set()).update(keys)
+            if Path(path).exists():
+                # Read back with the dtypes of the recomputed rows,
+                # which CSV does not keep
+                existing = align_dtypes(
+                    read_table(path), df.dtypes.astype(str).to_dict()
+                )
+                df = pd.concat(
+                    [existing[~existing[key].isin(keys)], df], ignore_index=True
+                )
+            df = df.sort_values(key).reset_index(drop=True)
+            changes = ChangesetSettings.from_config(config)
+            changeset = (
+                compute_changeset(config, artefact, df, key, changes)
+                if changes.enabled
+                else None
+            )
+            with stage('write', rows_in=len(df)):
+                get_layer_writer(config, node.layer).write(df, path)
+            logging.info(f"✓ Updated {len(keys)} keys of {path} ({len(df)} rows)")
+            if changeset is not None:
+                write_changeset(config, changeset, changes)
+            updated[artefact] = df
+        metrics.rows_out = sum(len(df) for df in updated.values())
+    return updated
+
+
+def refresh_gold(
+    node: Node,
+    config,
+    registry,
+    changed: Dict[str, List[pd.DataFrame]],
+    changed_keys: Optional[Dict[str, Set]] = None,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Maintain the outputs of an aggregate gold node from the changed rows of the gold
+    table it reads, or build them from the whole table when they were never written
+
+    :param changed: Changed rows per gold artefact
+    :param changed_keys: Changed keys per gold artefact, deleted ones included;
+                         the keys of the changed rows when missing
+    :return: Updated tables, empty when no row changed
+    """
+    (artefact,) = node.inputs
+    key = node.declared('refresh_key')
+    if not changed.get(artefact):
+        logging.info(f"No changed rows for {node.name}")
+        return {}
+
+    with stage(TOTAL, node=node.name) as metrics:
+        rows = pd.concat(changed[artefact], ignore_index=True).drop_duplicates(
+            subset=key, keep='last'
+        )
+        paths = {
+            attribute: artefact_path(config, output)
+            for output, attribute in node.outputs
+        }
+        if all(Path(path).exists() for path in paths.values()):
+            base, statistics = read_table(paths['base']), read_table(
+                paths['statistics']
+            )
+            model = node.model.refresh(
+                base,
+                statistics,
+                rows,
+                registry=registry,
+                changed_keys=(changed_keys or {}).get(artefact),
+            )
+            logging.info(f"Refreshing {node.name} for {len(rows)} changed keys")
+        else:
+            model = node.model.build(
+                [read_table(artefact_path(config, artefact))], registry=registry
+            )
+        metrics.rows_in = len(rows)
+
+        updated = {}
+        for output, attribute in node.outputs:
+            df = getattr(model, attribute)
+            with stage('write', rows_in=len(df)):
+                get_layer_writer(config, node.layer).write(df, paths[attribute])
+            logging.info(f"✓ Updated {paths[attribute]} ({len(df)} rows)")
+            updated[output] = df
+        metrics.rows_out = sum(len(df) for df in updated.values())
+    return updated
+
+
+def update_gold_layer(
+    graph: PipelineGraph,
+    config,
+    registry,
+    changed: Dict[str, List[pd.DataFrame]],
+    current: Optional[Dict[str, pd.DataFrame]] = None,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Update every gold node in topological order: upsert nodes for the changed keys
+    of their silver inputs, then aggregate nodes from the rows those updates recomputed
+
+    :param current: Current rows per silver artefact, see update_current_state
+    :return: Updated gold tables
+    """
+    gold = {}
+    current = {} if current is None else current
+    changed_keys: Dict[str, Set] = {}
+    for name in graph.order:
+        node = graph.nodes[name]
+        if node.layer == 'gold' and node.declared('refresh_key') is not None:
+            gold.update(refresh_gold(node, config, registry, changed, changed_keys))
+        elif node.layer == 'gold':
+            gold.update(
+                update_gold(
+                    graph, node, config, registry, changed, current, changed_keys
+                )
+            )
+    return gold
+
+
+def current_rows(
+    config, artefact, key, keys, current: Dict[str, pd.DataFrame]
+) -> pd.DataFrame:
+    """
+    Rows of the given keys from the latest partition of an artefact holding each key
+
+    :param current: Current rows per artefact; the snapshot of a missing artefact
+                    is loaded into it
+    """
+    if artefact not in current:
+        current[artefact] = load_current_state(config, artefact, key)
+    state = current[artefact]
+    rows = state[state[key].isin(keys)].drop(columns=PARTITION_COLUMN)
+    return rows.sort_values(key).reset_index(drop=True)
+
+
+def check_config(config):
+    """Reject the settings partition by partition updates cannot honour"""
+    changes = ChangesetSettings.from_config(config)
+    if changes.enabled and not changes.snapshot:
+        raise ValueError(
+            "Incremental mode updates the gold snapshots in place: changeset.snapshot must be true"
+        )
+    if DtypePolicy.from_config(config).compact:
+        # Downcasts depend on the values of each partition, and partitions are
+        # merged with the tables already written
+        raise ValueError(
+            "Compact dtypes are not supported in incremental mode: remove the dtypes section"
+        )
+
+
+class IncrementalRunner:
+    """
+    Runs the pipeline over new dated partitions only.
+
+    Sources are glob patterns whose files are partitioned by the date in their
+    name. Each new partition of a bronze node is read, transformed by the silver
+    nodes consuming it, and written as one partition file per artefact, replacing
+    any previous version of that partition. The new silver partitions are upserted
+    into a snapshot of the latest row of each key, so gold reads that snapshot
+    rather than every partition. Gold tables are updated in place for the keys
+    found in the new silver partitions, and aggregate gold nodes are refreshed
+    from the updated rows. Watermarks are saved once gold is up to date, so an
+    interrupted run processes the same partitions again.
+    """
+
+    def __init__(self, graph: PipelineGraph, config, registry=None):
+        self.graph = graph
+        self.config = config
+        self.registry = registry if registry is not None else get_shared_registry()
+        check_config(config)
+        self.state = WatermarkStore(
+            config['incremental'].get('state', 'target/state/watermarks.json')
+        )
+        self.options = {
+            'max_workers': (config.get('execution') or {}).get('workers') or 1
+        }
+
+    def run(self) -> Dict[str, pd.DataFrame]:
+        """
+        Process every pending partition and update the gold tables
+
+        :return: Updated gold tables
+        """
+        changed: Dict[str, List[pd.DataFrame]] = defaultdict(list)
+        written: Dict[str, List[str]] = defaultdict(list)
+        dtypes: Dict[str, Dict[str, str]] = {}
+        watermarks = {}
+
+        for name in self.graph.order:
+            node = self.graph.nodes[name]
+            if node.layer != 'bronze':
+                continue
+            for partition, paths in pending_partitions(
+                node, self.config, self.state.get(name)
+            ):
+                result = run_partition(
+                    self.graph,
+                    node,
+                    partition,
+                    paths,
+                    self.config,
+                    self.registry,
+                    self.options,
+                )
+                for artefact, frames in result.changed.items():
+                    changed[artefact].extend(frames)
+                for artefact in result.dtypes:
+                    written[artefact].append(partition)
+                dtypes.update(result.dtypes)
+                watermarks[name] = partition
+
+        current = update_current_state(self.graph, self.config, written, dtypes)
+        gold = update_gold_layer(
+            self.graph, self.config, self.registry, changed, current
+        )
+
+        for name, partition in watermarks.items():
+            self.state.set(name, partition)
+        self.state.save()
+        return gold
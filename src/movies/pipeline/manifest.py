@@ -0,0 +1,159 @@
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from src.movies.pipeline.cache import hash_file, hash_parts
+
+RUNNING, SUCCEEDED, FAILED = 'running', 'succeeded', 'failed'
+
+
+def run_fingerprint(config, task_names: List[str]) -> str:
+    """
+    Hash of the configuration and the planned tasks: a run can only resume a
+    run with the same one
+    """
+    return hash_parts(json.dumps(config, sort_keys=True, default=str), task_names)
+
+
+class RunManifest:
+    """
+    Record of a pipeline run: every completed task with the key of its inputs and
+    the files it saved, their row counts and sha256 checksums. It is rewritten
+    after every task, so it survives a run that fails, and a resumed run can reuse
+    the files of the tasks that completed instead of running them again.
+    """
+
+    def __init__(
+        self,
+        path,
+        fingerprint: str,
+        tasks: Optional[Dict[str, dict]] = None,
+        started_at=None,
+    ):
+        self.path = Path(path)
+        self.fingerprint = fingerprint
+        self.tasks: Dict[str, dict] = tasks or {}
+        self.started_at = started_at or time.time()
+        self.status = RUNNING
+
+    @staticmethod
+    def path_from_config(config) -> Path:
+        """
+        Manifest path from the manifest section, next to the output layers by default
+        """
+        path = (config.get('manifest') or {}).get('path')
+        return (
+            Path(path)
+            if path
+            else Path(config['output']['gold']).parent / '.manifest.json'
+        )
+
+    @classmethod
+    def open(cls, config, fingerprint: str, resume=False) -> 'RunManifest':
+        """
+        Start the manifest of a run. When resuming, the completed tasks of the
+        previous run are kept if it planned the same tasks with the same config.
+        """
+        path = cls.path_from_config(config)
+        if resume:
+            previous = cls.load(path)
+            if previous is None:
+                logging.warning(f"No run manifest at {path}: running every stage")
+            elif previous.fingerprint != fingerprint:
+                logging.warning(
+                    f"Run manifest {path} is for another config or selection: running every stage"
+                )
+            else:
+                previous.status = RUNNING
+                return previous
+        manifest = cls(path, fingerprint)
+        manifest.save()
+        return manifest
+
+    @classmethod
+    def load(cls, path) -> Optional['RunManifest']:
+        try:
+            data = json.loads(Path(path).read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+        manifest = cls(path, data['fingerprint'], data['tasks'], data['started_at'])
+        manifest.status = data['status']
+        return manifest
+
+    def completed(
+        self, task_name: str, key: Optional[str] = None
+    ) -> Optional[List[Tuple[str, str, int]]]:
+        """
+        Files saved by a completed task, or None when the task did not complete, its
+        inputs changed since, or one of its files is missing or changed since
+
+        :param key: Key of the task's inputs in this run, as recorded when it completed
+        :return: (artefact, path, rows) for every file of the task
+        """
+        entry = self.tasks.get(task_name)
+        if entry is None:
+            return None
+        if entry.get('key') != key:
+            logging.warning(
+                f"Inputs of {task_name} changed since it completed: running it again"
+            )
+            return None
+        for file in entry['files']:
+            if (
+                not Path(file['path']).exists()
+                or hash_file(file['path']) != file['sha256']
+            ):
+                logging.warning(
+                    f"{file['path']} changed since {task_name} completed: running it again"
+                )
+                return None
+        return [
+            (file['artefact'], file['path'], file['rows']) for file in entry['files']
+        ]
+
+    def record(
+        self,
+        task_name: str,
+        saved: List[Tuple[str, str, int]],
+        key: Optional[str] = None,
+    ):
+        """
+        Record a completed task, the key of its inputs and its saved files, and
+        persist the manifest
+        """
+        self.tasks[task_name] = {
+            'finished_at': time.time(),
+            'key': key,
+            'files': [
+                {
+                    'artefact': artefact,
+                    'path': path,
+                    'rows': rows,
+                    'sha256': hash_file(path),
+                }
+                for artefact, path, rows in saved
+            ],
+        }
+        self.save()
+
+    def finish(self, status: str):
+        self.status = status
+        self.save()
+
+    def save(self):
+        """Write through a temporary file so a crash never leaves a partial manifest"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            'fingerprint': self.fingerprint,
+            'started_at': self.started_at,
+            'status': self.status,
+            'tasks': self.tasks,
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix='.tmp')
+        with os.fdopen(fd, 'w') as file:
+            json.dump(data, file, indent=2)
+        os.replace(tmp_path, self.path)
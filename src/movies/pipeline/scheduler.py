@@ -0,0 +1,783 @@
+import logging
+import os
+import shutil
+import tempfile
+from collections import Counter
+from contextlib import contextmanager
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from src.movies.metrics import TOTAL, StageMetrics, current_recorder, recording, stage
+from src.movies.pipeline.cache import StageCache, code_version, hash_file, hash_parts
+from src.movies.pipeline.changeset import (
+    ChangesetSettings,
+    compute_changeset,
+    write_changeset,
+    writes_changeset,
+)
+from src.movies.pipeline.graph import Node, PipelineGraph
+from src.movies.pipeline.manifest import FAILED, SUCCEEDED, RunManifest, run_fingerprint
+from src.movies.pipeline.spill import SpillSettings, build_partitioned, supports_spill
+from src.movies.schema.schema_registry import get_shared_registry
+from src.movies.schema.dtypes import DtypePolicy, dtype_policy
+from src.movies.schema.validation import ValidationPolicy, validation_policy
+from src.movies.storage.layers import artefact_path, get_layer_writer, source_path
+from src.movies.storage.readers import read_mapped, read_table
+from src.movies.storage.writers import ArrowIpcWriter, NullSink
+
+HANDOFFS = ('memory', 'arrow')
+
+
+@dataclass(frozen=True)
+class PersistedArtefact:
+    """Reference to an artefact on disk, read by the task that consumes it"""
+
+    path: str
+    # Uncompressed Arrow file handed off by its producer, opened memory-mapped
+    mapped: bool = False
+
+    def load(self) -> pd.DataFrame:
+        return read_mapped(self.path) if self.mapped else read_table(self.path)
+
+
+@dataclass
+class Task:
+    """
+    Unit of scheduling: one node, or a bronze node streamed into its silver consumer
+    """
+
+    nodes: Tuple[Node, ...]
+    needs: Tuple[str, ...]  # artefacts produced by other tasks of the run
+    streaming: bool = False
+    # Streaming only: read the source file, not the persisted bronze
+    read_sources: bool = True
+
+    @property
+    def name(self):
+        return ' + '.join(node.name for node in self.nodes)
+
+
+@dataclass
+class TaskResult:
+    # DataFrame or PersistedArtefact
+    artefacts: Dict[str, object] = field(default_factory=dict)
+    # (artefact, path, rows)
+    saved: List[Tuple[str, str, int]] = field(default_factory=list)
+    cached: Optional[bool] = None  # cache hit or miss, None when the cache is disabled
+    resumed: bool = False  # files reused from the run being resumed
+    metrics: List[StageMetrics] = field(default_factory=list)  # recorded in the worker
+
+
+def create_executor(config):
+    """Create the worker pool described by the execution section of the config"""
+    execution = config.get('execution') or {}
+    pool = execution.get('pool', 'thread')
+    workers = execution.get('workers')
+    if pool == 'thread':
+        return ThreadPoolExecutor(max_workers=workers)
+    if pool == 'process':
+        return ProcessPoolExecutor(max_workers=workers)
+    raise ValueError(
+        f"Unknown pool type: {pool}. Available pools: ['thread', 'process']"
+    )
+
+
+def get_chunksize(config):
+    """
+    Return the streaming chunk size from the config, or None for in-memory ingestion
+    """
+    return (config.get('streaming') or {}).get('chunksize')
+
+
+def get_handoff_dir(config) -> Optional[str]:
+    """
+    Directory where nodes hand their outputs to the next stages as memory-mapped
+    Arrow files, or None when the outputs are passed as DataFrames
+    """
+    execution = config.get('execution') or {}
+    handoff = execution.get('handoff', 'memory')
+    if handoff not in HANDOFFS:
+        raise ValueError(
+            f"Unknown handoff: {handoff}. Available handoffs: {list(HANDOFFS)}"
+        )
+    if handoff != 'arrow':
+        return None
+    if not execution.get('handoff_dir'):
+        raise ValueError(
+            "The Arrow handoff needs a handoff_dir; the Scheduler creates one for each run"
+        )
+    return execution['handoff_dir']
+
+
+@contextmanager
+def run_handoff(config):
+    """
+    Config of one run. With the Arrow handoff and no handoff_dir configured, the
+    run hands off through a temporary directory of its own, removed when it ends,
+    so concurrent runs never replace each other's files
+    """
+    execution = config.get('execution') or {}
+    if execution.get('handoff') != 'arrow' or execution.get('handoff_dir'):
+        yield config
+        return
+    directory = tempfile.mkdtemp(prefix='movies-handoff-')
+    try:
+        yield {**config, 'execution': {**execution, 'handoff_dir': directory}}
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def _load(value):
+    return value.load() if isinstance(value, PersistedArtefact) else value
+
+
+def _in_memory(value) -> bool:
+    """True for DataFrames, and for handed-off artefacts that load without a copy"""
+    return isinstance(value, pd.DataFrame) or (
+        isinstance(value, PersistedArtefact) and value.mapped
+    )
+
+
+def _hand_off(config, artefact, df):
+    """
+    What consumers of an artefact receive: the DataFrame, or its
+    memory-mapped Arrow file
+    """
+    directory = get_handoff_dir(config)
+    if directory is None:
+        return df
+    path = Path(directory) / f"{artefact}.arrow"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    with stage('handoff', rows_in=len(df)):
+        # Uncompressed, so readers map the buffers instead of decoding them. Replacing
+        # the file leaves readers of the previous run with the pages they mapped
+        ArrowIpcWriter(compression=None).write(df, tmp_path)
+        os.replace(tmp_path, path)
+    return PersistedArtefact(str(path), mapped=True)
+
+
+def _save(config, artefact, df, result):
+    path = artefact_path(config, artefact)
+    with stage('write', rows_in=len(df)):
+        get_layer_writer(config, artefact.split('/', 1)[0]).write(df, path)
+    result.saved.append((artefact, path, len(df)))
+
+
+def run_node(node, inputs, config, schema_dir=None, options=None) -> TaskResult:
+    """
+    Build one model from its inputs and persist its artefacts.
+    Module level so that process pools can pickle it.
+
+    :param inputs: Source paths for bronze nodes, otherwise DataFrames or
+                   PersistedArtefacts
+    """
+    registry = get_shared_registry(schema_dir)
+    spill = SpillSettings.from_config(config) if supports_spill(node.model) else None
+    changes = ChangesetSettings.from_config(config)
+    result = TaskResult()
+    validation = ValidationPolicy.from_config(config)
+    dtypes = DtypePolicy.from_config(config)
+    with (
+        recording() as recorder,
+        validation_policy(validation),
+        dtype_policy(dtypes),
+        stage(TOTAL, node=node.name) as metrics,
+    ):
+        if spill is not None:
+            # Persisted inputs are partitioned chunk by chunk, never read whole
+            values = [
+                value.path if isinstance(value, PersistedArtefact) else value
+                for value in inputs
+            ]
+            outputs = build_partitioned(
+                node.model, values, spill, registry=registry, **(options or {})
+            )
+        else:
+            frames = [_load(value) for value in inputs]
+            if node.layer != 'bronze':
+                metrics.rows_in = sum(len(df) for df in frames)
+            model = node.model.build(frames, registry=registry, **(options or {}))
+            outputs = {
+                attribute: getattr(model, attribute) for _, attribute in node.outputs
+            }
+
+        for artefact, attribute in node.outputs:
+            df = outputs[attribute]
+            changeset = None
+            if changes.enabled and writes_changeset(node):
+                # Compared before the snapshot is replaced, which may
+                # be the previous state
+                changeset = compute_changeset(
+                    config, artefact, df, node.declared('upsert_key'), changes
+                )
+            if changeset is None or changes.snapshot:
+                _save(config, artefact, df, result)
+            if changeset is not None:
+                write_changeset(config, changeset, changes)
+            result.artefacts[artefact] = _hand_off(config, artefact, df)
+        metrics.rows_out = sum(rows for _, _, rows in result.saved)
+    result.metrics = recorder.stages
+    return result
+
+
+def run_streaming_nodes(
+    bronze_node, silver_node, input_path, config, schema_dir=None
+) -> TaskResult:
+    """
+    Stream a single-file bronze model chunk by chunk through its silver model,
+    writing both outputs incrementally so only one chunk is held in memory.
+    Module level so that process pools can pickle it.
+
+    :param bronze_node: Bronze node whose model reads the file
+    :param silver_node: Consuming silver node, or None to only persist the bronze chunks
+    :param input_path: Source file, or the persisted bronze output when restarting
+    """
+    name = ' + '.join(node.name for node in (bronze_node, silver_node) if node)
+    with (
+        recording() as recorder,
+        validation_policy(ValidationPolicy.from_config(config)),
+    ):
+        with stage(TOTAL, node=name) as metrics:
+            result = _stream_nodes(
+                bronze_node, silver_node, input_path, config, schema_dir
+            )
+            metrics.rows_out = result.saved[-1][2]
+    result.metrics = recorder.stages
+    return result
+
+
+def _stream_nodes(bronze_node, silver_node, input_path, config, schema_dir):
+    registry = get_shared_registry(schema_dir)
+    bronze_model = bronze_node.model.build(
+        [input_path], registry=registry, chunksize=get_chunksize(config)
+    )
+    ((bronze_artefact, _),) = bronze_node.outputs
+    bronze_path = artefact_path(config, bronze_artefact)
+    # When restarting from the bronze layer the stream reads the bronze output itself
+    write_bronze = Path(input_path).resolve() != Path(bronze_path).resolve()
+
+    bronze_sink = (
+        get_layer_writer(config, 'bronze').open(bronze_path)
+        if write_bronze
+        else NullSink(bronze_path)
+    )
+    silver_sinks = {
+        artefact: get_layer_writer(config, 'silver').open(
+            artefact_path(config, artefact)
+        )
+        for artefact, _ in (silver_node.outputs if silver_node else ())
+    }
+    try:
+        for chunk in bronze_model.iter_chunks():
+            bronze_sink.write(chunk)
+            if silver_node:
+                silver_model = silver_node.model.build([chunk], registry=registry)
+                for artefact, attribute in silver_node.outputs:
+                    silver_sinks[artefact].write(getattr(silver_model, attribute))
+    finally:
+        bronze_sink.close()
+        for sink in silver_sinks.values():
+            sink.close()
+
+    result = TaskResult()
+    sinks = ([(bronze_artefact, bronze_sink)] if write_bronze else []) + list(
+        silver_sinks.items()
+    )
+    for artefact, sink in sinks:
+        result.saved.append((artefact, sink.path, sink.rows))
+        result.artefacts[artefact] = PersistedArtefact(sink.path)
+    return result
+
+
+class Scheduler:
+    """
+    Runs pipeline nodes on a worker pool as soon as their inputs are ready.
+
+    Inputs of selected nodes that are produced by unselected nodes are read back
+    from the persisted layers. Saved files are logged in topological order,
+    whatever order the tasks finish in. When a node fails, nodes depending on it
+    are skipped, independent nodes still run, and all failures are raised
+    together as an ExceptionGroup.
+
+    With a stage cache, a task whose key (input file hashes or upstream keys,
+    schema hashes, model code versions, and the dtype, validation and spill
+    settings) is cached is restored from the cache instead of being run.
+
+    With spilling enabled, join models read their inputs from the persisted
+    layers and join them bucket by bucket within the memory budget, and
+    in-memory artefacts are released as soon as no pending task consumes them.
+
+    With the Arrow handoff, nodes persist their outputs as uncompressed Arrow
+    files that consumers open memory-mapped: workers exchange paths instead of
+    pickled DataFrames, and processes reading an artefact share its pages.
+    Unless a handoff directory is configured, each run uses a temporary one.
+
+    Every completed task is recorded in the run manifest with the key of its
+    inputs and the checksums of its files. When resuming, tasks the previous run
+    completed, whose inputs and files are unchanged and whose upstream tasks were
+    resumed too, are not run again.
+
+    With change data capture, gold nodes declaring an upsert key also write the
+    rows inserted, updated and deleted since their previous output. They always
+    run, since their changeset depends on that previous output.
+    """
+
+    def __init__(self, graph: PipelineGraph, config, registry=None, resume=False):
+        self.graph = graph
+        self.config = config
+        self.resume = resume
+        self.registry = registry if registry is not None else get_shared_registry()
+        self.cache = StageCache.from_config(config)
+        self.spill = SpillSettings.from_config(config)
+        self.changes = ChangesetSettings.from_config(config)
+        if (
+            get_chunksize(config) is not None
+            and DtypePolicy.from_config(config).compact
+        ):
+            # Downcasts depend on the values of each chunk, which the sinks cannot mix
+            raise ValueError(
+                "Compact dtypes are not supported in streaming mode: remove the dtypes section"
+            )
+
+    def plan(self, selected: Optional[List[str]] = None) -> List[Task]:
+        """Group the selected nodes into tasks, in topological order"""
+        selected = [
+            name for name in self.graph.order if selected is None or name in selected
+        ]
+        streaming = get_chunksize(self.config) is not None
+
+        # In streaming mode a silver node reading one chunkable bronze file runs fused
+        # with its bronze node, so chunks flow straight from the reader to both outputs
+        fused = {}  # silver node name -> bronze node name
+        if streaming:
+            for name in selected:
+                bronze_name = self._streamable_bronze(self.graph.nodes[name])
+                if bronze_name is not None:
+                    fused[name] = bronze_name
+        fused_bronze = set(fused.values())
+
+        produced = {
+            artefact
+            for name in selected
+            for artefact in self.graph.nodes[name].artefacts
+        }
+        tasks = []
+        for name in selected:
+            node = self.graph.nodes[name]
+            if name in fused_bronze:
+                continue
+            if name in fused:
+                bronze_node = self.graph.nodes[fused[name]]
+                tasks.append(
+                    Task(
+                        nodes=(bronze_node, node),
+                        needs=(),
+                        streaming=True,
+                        read_sources=bronze_node.name in selected,
+                    )
+                )
+            elif (
+                streaming
+                and node.layer == 'bronze'
+                and 'chunksize' in node.declared('build_options', ())
+            ):
+                tasks.append(
+                    Task(nodes=(node,), needs=(), streaming=True, read_sources=True)
+                )
+            else:
+                needs = tuple(
+                    artefact for artefact in node.inputs if artefact in produced
+                )
+                tasks.append(Task(nodes=(node,), needs=needs))
+        return tasks
+
+    def _streamable_bronze(self, node):
+        """
+        Name of the bronze node a silver node can be fused with in streaming mode:
+        its single input comes from a chunkable bronze model with no other consumer
+        """
+        if node.layer != 'silver' or len(node.inputs) != 1:
+            return None
+        producer = self.graph.nodes[self.graph.producers[node.inputs[0]]]
+        if producer.layer != 'bronze' or 'chunksize' not in producer.declared(
+            'build_options', ()
+        ):
+            return None
+        if len(producer.outputs) != 1 or self.graph.downstream(producer.name) != [
+            node.name
+        ]:
+            return None
+        return producer.name
+
+    def run(self, selected: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Run the selected nodes (all nodes by default)
+
+        :return: In-memory artefacts produced by the run, except those released when
+                 spilling. Handed-off artefacts are opened memory-mapped.
+        """
+        with run_handoff(self.config) as config:
+            # Mapped artefacts are opened before the run's handoff directory is removed;
+            # their pages stay readable once the files are unlinked
+            return self._run(self.plan(selected), config)
+
+    def _run(self, tasks, config) -> Dict[str, pd.DataFrame]:
+        fingerprint = run_fingerprint(self.config, [task.name for task in tasks])
+        manifest = RunManifest.open(self.config, fingerprint, resume=self.resume)
+        input_keys = self.input_keys(tasks)
+        keys = self.cache_keys(tasks, input_keys) if self.cache is not None else {}
+        recorder = current_recorder()
+        producer_tasks = {
+            artefact: task.name
+            for task in tasks
+            for node in task.nodes
+            for artefact in node.artefacts
+        }
+        consumers = Counter(artefact for task in tasks for artefact in task.needs)
+        available = {}
+
+        pending = list(tasks)
+        running = {}
+        results: Dict[str, TaskResult] = {}
+        errors: Dict[str, BaseException] = {}
+        skipped = set()
+        logged = 0
+
+        with create_executor(self.config) as executor:
+            while pending or running:
+                # Plan order is topological, so skips cascade within one pass
+                for task in list(pending):
+                    upstream = {producer_tasks[artefact] for artefact in task.needs}
+                    if upstream & (errors.keys() | skipped):
+                        pending.remove(task)
+                        skipped.add(task.name)
+                        logging.warning(
+                            f"Skipping {task.name}: an upstream node failed"
+                        )
+                    elif all(artefact in available for artefact in task.needs):
+                        pending.remove(task)
+                        restored = self._resume(
+                            task,
+                            manifest,
+                            input_keys[task.name],
+                            results,
+                            producer_tasks,
+                        )
+                        if restored is None:
+                            restored = self._restore(task, keys.get(task.name))
+                            if restored is not None:
+                                manifest.record(
+                                    task.name, restored.saved, input_keys[task.name]
+                                )
+                        if restored is not None:
+                            results[task.name] = restored
+                            available.update(restored.artefacts)
+                        else:
+                            future = self._submit(executor, task, available, config)
+                            running[future] = task
+                        self._release(task, consumers, available)
+
+                if not running:
+                    # Nothing left to wait for: tasks still pending would never run
+                    for task in pending:
+                        missing = [
+                            artefact
+                            for artefact in task.needs
+                            if artefact not in available
+                        ]
+                        error = RuntimeError(
+                            f"Inputs of {task.name} never became available: {missing}"
+                        )
+                        error.add_note(f"pipeline node: {task.name}")
+                        errors[task.name] = error
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        error.add_note(f"pipeline node: {task.name}")
+                        errors[task.name] = error
+                    else:
+                        results[task.name] = future.result()
+                        available.update(results[task.name].artefacts)
+                        manifest.record(
+                            task.name, results[task.name].saved, input_keys[task.name]
+                        )
+                        if recorder is not None:
+                            recorder.extend(results[task.name].metrics)
+                        if keys.get(task.name) is not None:
+                            results[task.name].cached = False
+                            self.cache.store(keys[task.name], results[task.name].saved)
+
+                logged = self._log_saved(tasks, results, errors, skipped, logged)
+
+        self._log_saved(tasks, results, errors, skipped, logged)
+        manifest.finish(FAILED if errors else SUCCEEDED)
+
+        if errors:
+            raise ExceptionGroup(
+                f"Pipeline failed for: {', '.join(errors)}", list(errors.values())
+            )
+
+        return {
+            artefact: _load(value)
+            for artefact, value in available.items()
+            if _in_memory(value)
+        }
+
+    def _release(self, task, consumers, available):
+        """
+        When spilling, swap artefacts no pending task consumes for their persisted files
+        """
+        for artefact in task.needs:
+            consumers[artefact] -= 1
+            if (
+                self.spill is not None
+                and consumers[artefact] == 0
+                and _in_memory(available[artefact])
+            ):
+                available[artefact] = PersistedArtefact(
+                    artefact_path(self.config, artefact)
+                )
+
+    def input_keys(self, tasks: List[Task]) -> Dict[str, Optional[str]]:
+        """
+        Key of every task's inputs, code and settings. Node keys chain the keys of
+        the nodes they read from, so a changed input changes the key of everything
+        downstream of it. Tasks whose inputs cannot be hashed get no key.
+        """
+        node_keys: Dict[str, str] = {}
+        task_keys = {}
+        for task in tasks:
+            try:
+                for node in task.nodes:
+                    node_keys[node.name] = self._node_key(node, task, node_keys)
+            except FileNotFoundError:
+                task_keys[task.name] = None
+                continue
+            chunksize = get_chunksize(self.config) if task.streaming else None
+            task_keys[task.name] = hash_parts(
+                task.read_sources,
+                chunksize,
+                [node_keys[node.name] for node in task.nodes],
+            )
+        if self.cache is not None:
+            self.cache.flush()
+        return task_keys
+
+    def cache_keys(
+        self, tasks: List[Task], input_keys=None
+    ) -> Dict[str, Optional[str]]:
+        """
+        Cache key of every task: the key of its inputs, or None for tasks that are
+        always run
+
+        :param input_keys: Keys already computed by input_keys for the same tasks
+        """
+        task_keys = dict(
+            input_keys if input_keys is not None else self.input_keys(tasks)
+        )
+        for task in tasks:
+            if self.changes.enabled and any(
+                writes_changeset(node) for node in task.nodes
+            ):
+                # The changeset depends on the previous output, which
+                # the key does not cover
+                task_keys[task.name] = None
+        return task_keys
+
+    def _file_hash(self, path) -> str:
+        """
+        Content hash of a file, remembered across runs when the stage cache is enabled
+        """
+        return self.cache.file_hash(path) if self.cache is not None else hash_file(path)
+
+    def _node_key(self, node, task, node_keys):
+        if node.layer == 'bronze' and task.streaming and not task.read_sources:
+            input_hashes = [
+                self._file_hash(artefact_path(self.config, node.artefacts[0]))
+            ]
+        elif node.layer == 'bronze':
+            input_hashes = [
+                self._file_hash(source_path(self.config, key)) for key in node.sources
+            ]
+        else:
+            # Upstream keys when the producer is part of the run, else the
+            # persisted file's hash
+            input_hashes = [
+                node_keys.get(self.graph.producers[artefact])
+                or self._file_hash(artefact_path(self.config, artefact))
+                for artefact in node.inputs
+            ]
+        provider = node.declared('provider_name')
+        return hash_parts(
+            node.name,
+            code_version(node.model),
+            self.registry.schema_hash(provider) if provider else None,
+            get_layer_writer(self.config, node.layer).extension,
+            input_hashes,
+            # Columns and rows bronze keeps for its consumers
+            self.graph.pushdown(node.name) if node.layer == 'bronze' else None,
+            self._settings_key(node),
+        )
+
+    def _settings_key(self, node) -> dict:
+        """
+        Settings of the run that change what a node writes, or what it
+        checks before writing
+        """
+        settings = {'dtypes': DtypePolicy.from_config(self.config).mode}
+        if node.layer == 'bronze':
+            # A cache hit would skip the value checks of a stricter policy
+            settings['validation'] = asdict(ValidationPolicy.from_config(self.config))
+        if self.spill is not None and supports_spill(node.model):
+            # Spilled joins write their rows bucket by bucket
+            settings['spill'] = {
+                'memory_mb': self.spill.memory_mb,
+                'buckets': self.spill.buckets,
+            }
+        return settings
+
+    @staticmethod
+    def _resume(task, manifest, key, results, producer_tasks) -> Optional[TaskResult]:
+        """
+        Reuse the files of a task completed by the resumed run, or None when it
+        must run: it did not complete, its inputs or files changed, an upstream
+        task ran again, or it did not persist every artefact it produces (a gold
+        table written only as a changeset)
+        """
+        if not all(
+            results[producer_tasks[artefact]].resumed for artefact in task.needs
+        ):
+            return None
+        saved = manifest.completed(task.name, key)
+        if saved is None:
+            return None
+        if set(Scheduler._written_artefacts(task)) - {
+            artefact for artefact, _, _ in saved
+        }:
+            return None
+        return TaskResult(
+            artefacts={
+                artefact: PersistedArtefact(path) for artefact, path, _ in saved
+            },
+            saved=saved,
+            resumed=True,
+        )
+
+    @staticmethod
+    def _written_artefacts(task) -> List[str]:
+        """Artefacts a task persists to its layers"""
+        return [
+            artefact
+            for node in task.nodes
+            for artefact in node.artefacts
+            # A stream restarted from persisted bronze does not write bronze again
+            if not (task.streaming and not task.read_sources and node.layer == 'bronze')
+        ]
+
+    def _restore(self, task, key) -> Optional[TaskResult]:
+        """Restore the saved files of a task from the cache, or None on a miss"""
+        if key is None:
+            return None
+        targets = {
+            artefact: artefact_path(self.config, artefact)
+            for artefact in self._written_artefacts(task)
+        }
+        with stage('cache', node=task.name) as metrics:
+            restored = self.cache.restore(key, targets)
+            if restored is not None:
+                metrics.rows_out = sum(rows for _, _, rows in restored)
+        if restored is None:
+            return None
+        return TaskResult(
+            artefacts={
+                artefact: PersistedArtefact(path) for artefact, path, _ in restored
+            },
+            saved=restored,
+            cached=True,
+        )
+
+    def _submit(self, executor, task, available, config):
+        """Submit a task to the pool; config is the run's, with its handoff directory"""
+        schema_dir = self.registry.schema_dir
+        if task.streaming:
+            bronze_node, silver_node = (task.nodes + (None,))[:2]
+            if task.read_sources:
+                input_path = source_path(self.config, bronze_node.sources[0])
+            else:
+                input_path = artefact_path(self.config, bronze_node.artefacts[0])
+            return executor.submit(
+                run_streaming_nodes,
+                bronze_node,
+                silver_node,
+                input_path,
+                config,
+                schema_dir,
+            )
+
+        (node,) = task.nodes
+        if node.layer == 'bronze':
+            inputs = [source_path(self.config, key) for key in node.sources]
+        elif self.spill is not None and supports_spill(node.model):
+            # Every input is persisted by now; the join partitions the files themselves
+            inputs = [
+                PersistedArtefact(artefact_path(self.config, artefact))
+                for artefact in node.inputs
+            ]
+        else:
+            # Artefacts not produced by this run are read back from
+            # their persisted layer
+            inputs = [
+                (
+                    available[artefact]
+                    if artefact in available
+                    else PersistedArtefact(artefact_path(self.config, artefact))
+                )
+                for artefact in node.inputs
+            ]
+        options = {
+            'max_workers': (self.config.get('execution') or {}).get('workers') or 1
+        }
+        if node.layer == 'bronze':
+            options.update(self.graph.pushdown(node.name))
+        return executor.submit(run_node, node, inputs, config, schema_dir, options)
+
+    @staticmethod
+    def _log_saved(tasks, results, errors, skipped, logged):
+        """
+        Log saved files of finished tasks in plan order; returns the
+        number of tasks logged
+        """
+        while logged < len(tasks):
+            name = tasks[logged].name
+            if name in results:
+                if results[name].resumed:
+                    logging.info(f"Resumed: {name}")
+                elif results[name].cached is not None:
+                    logging.info(
+                        f"Cache {'hit' if results[name].cached else 'miss'}: {name}"
+                    )
+                action = (
+                    'Reused'
+                    if results[name].resumed
+                    else 'Restored' if results[name].cached else 'Saved'
+                )
+                for _, path, rows in results[name].saved:
+                    logging.info(f"✓ {action} file: {path} ({rows} rows)")
+            elif name not in errors and name not in skipped:
+                break
+            logged += 1
+        return logged
@@ -0,0 +1,192 @@
+import math
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from src.movies.metrics import stage
+from src.movies.storage.readers import iter_table_chunks, read_table
+
+# In-memory bytes per byte of an input file, and working set of a join per input byte
+FILE_EXPANSION = 3
+JOIN_OVERHEAD = 2
+
+
+@dataclass(frozen=True)
+class SpillSettings:
+    """
+    Out-of-core execution of joins: where buckets are spilled and the
+    memory they must fit in
+    """
+
+    dir: str
+    memory_mb: float = 1024
+    chunksize: int = 100_000  # rows read from an input at a time while partitioning
+    # Fixed bucket count, derived from the memory budget by default
+    buckets: Optional[int] = None
+
+    @classmethod
+    def from_config(cls, config) -> Optional['SpillSettings']:
+        """
+        Settings from the spill section of a config, or None when spilling is disabled
+        """
+        section = config.get('spill') or {}
+        if not section.get('enabled', bool(section)):
+            return None
+        options = {
+            key: section[key]
+            for key in ('memory_mb', 'chunksize', 'buckets')
+            if key in section
+        }
+        return cls(dir=section.get('dir', 'target/.spill'), **options)
+
+
+def supports_spill(model) -> bool:
+    """True when a model's rows only depend on the input rows sharing their join key"""
+    return getattr(model, 'join_key', None) is not None
+
+
+def estimate_bytes(value) -> int:
+    """Approximate in-memory size of an input, a DataFrame or the path of a table"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    return Path(value).stat().st_size * FILE_EXPANSION
+
+
+def bucket_count(inputs, settings: SpillSettings) -> int:
+    """
+    Number of buckets for one bucket of every input to be joined
+    within the memory budget
+    """
+    if settings.buckets:
+        return settings.buckets
+    working_set = sum(estimate_bytes(value) for value in inputs) * JOIN_OVERHEAD
+    return max(1, math.ceil(working_set / (settings.memory_mb * 2**20)))
+
+
+def bucket_of(keys: pd.Series, buckets: int):
+    """
+    Bucket of every key. Keys are hashed as strings so every input
+    agrees whatever its dtype
+    """
+    hashes = pd.util.hash_array(
+        keys.astype(str).to_numpy(dtype=object), categorize=False
+    )
+    return hashes % buckets
+
+
+def iter_frames(value, chunksize) -> Iterator[pd.DataFrame]:
+    """Chunks of an input, a DataFrame or the path of a table"""
+    if isinstance(value, pd.DataFrame):
+        for start in range(0, len(value), chunksize):
+            yield value.iloc[start : start + chunksize]
+    else:
+        yield from iter_table_chunks(value, chunksize)
+
+
+class SpillBuckets:
+    """
+    One input hash-partitioned by key into on-disk buckets. Every chunk added
+    writes one pickle part per non-empty bucket, which keeps dtypes exactly.
+    """
+
+    def __init__(self, directory, buckets: int):
+        self.directory = Path(directory)
+        self.buckets = buckets
+        self.parts: Dict[int, List[Path]] = {bucket: [] for bucket in range(buckets)}
+        # Columns and dtypes of an empty bucket
+        self.empty: Optional[pd.DataFrame] = None
+        self.rows = 0
+
+    def add(self, chunk: pd.DataFrame, key: str):
+        if self.empty is None:
+            self.empty = chunk.iloc[:0]
+        self.rows += len(chunk)
+        for bucket, part in chunk.groupby(
+            bucket_of(chunk[key], self.buckets), sort=False
+        ):
+            path = (
+                self.directory
+                / f"bucket{bucket:05d}"
+                / f"part{len(self.parts[bucket]):05d}.pkl"
+            )
+            path.parent.mkdir(parents=True, exist_ok=True)
+            part.to_pickle(path)
+            self.parts[bucket].append(path)
+
+    def load(self, bucket: int) -> pd.DataFrame:
+        frames = [pd.read_pickle(path) for path in self.parts[bucket]]
+        if not frames:
+            return self.empty.copy() if self.empty is not None else pd.DataFrame()
+        return (
+            pd.concat(frames, ignore_index=True)
+            if len(frames) > 1
+            else frames[0].reset_index(drop=True)
+        )
+
+
+def build_partitioned(
+    model, inputs, settings: SpillSettings, registry=None, **options
+) -> Dict[str, pd.DataFrame]:
+    """
+    Build a join model bucket by bucket: every input is hash-partitioned on the
+    model's join_key into on-disk buckets, the model is built on one bucket of
+    each input at a time and the bucket outputs are concatenated. Outputs of
+    models declaring an upsert_key are sorted by it, as the in-memory build is.
+
+    :param inputs: DataFrames or table paths, in the model's input order
+    :return: Output DataFrame per model attribute
+    """
+    buckets = bucket_count(inputs, settings)
+    if buckets == 1:
+        frames = [
+            value if isinstance(value, pd.DataFrame) else read_table(value)
+            for value in inputs
+        ]
+        built = model.build(frames, registry=registry, **options)
+        return {
+            attribute: getattr(built, attribute) for attribute in model.outputs.values()
+        }
+
+    Path(settings.dir).mkdir(parents=True, exist_ok=True)
+    directory = Path(tempfile.mkdtemp(prefix='spill-', dir=settings.dir))
+    try:
+        spills = []
+        with stage('spill') as metrics:
+            for index, value in enumerate(inputs):
+                spill = SpillBuckets(directory / f"input{index}", buckets)
+                for chunk in iter_frames(value, settings.chunksize):
+                    spill.add(chunk, model.join_key)
+                spills.append(spill)
+            metrics.rows_in = metrics.rows_out = sum(spill.rows for spill in spills)
+
+        parts = {attribute: [] for attribute in model.outputs.values()}
+        for bucket in range(buckets):
+            if not any(spill.parts[bucket] for spill in spills):
+                continue
+            built = model.build(
+                [spill.load(bucket) for spill in spills], registry=registry, **options
+            )
+            for attribute in parts:
+                parts[attribute].append(getattr(built, attribute))
+            del built
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    outputs = {}
+    for attribute, frames in parts.items():
+        if not frames:
+            # Every input was empty: build once so the output keeps its columns
+            built = model.build(
+                [spill.load(0) for spill in spills], registry=registry, **options
+            )
+            frames = [getattr(built, attribute)]
+        df = pd.concat(frames, ignore_index=True)
+        upsert_key = getattr(model, 'upsert_key', None)
+        if upsert_key is not None:
+            df = df.sort_values(upsert_key, kind='stable', ignore_index=True)
+        outputs[attribute] = df
+    return outputs
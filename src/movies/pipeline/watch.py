@@ -0,0 +1,346 @@
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from src.movies.metrics import MetricsRecorder, export_metrics, recording
+from src.movies.pipeline.graph import PipelineGraph
+from src.movies.pipeline.incremental import IncrementalRunner
+from src.movies.pipeline.scheduler import Scheduler
+from src.movies.schema.schema_registry import get_shared_registry
+from src.movies.storage.layers import source_pattern
+from src.movies.storage.partitions import is_pattern, list_partitions
+
+IDLE, RUNNING, FAILED = 'idle', 'running', 'failed'
+
+
+@dataclass(frozen=True)
+class WatchSettings:
+    """How the daemon polls the sources and where it serves its status"""
+
+    interval: float = 5.0  # seconds between two scans of the source directories
+    # Seconds a new file must stay unchanged before it is ingested
+    debounce: float = 10.0
+    host: str = '127.0.0.1'
+    port: Optional[int] = None  # no status endpoint by default
+    # Files present at startup count as processed instead of being ingested
+    skip_existing: bool = False
+
+    @classmethod
+    def from_config(cls, config) -> 'WatchSettings':
+        """Settings from the watch section of a config, defaults for the missing keys"""
+        section = (config or {}).get('watch') or {}
+        keys = ('interval', 'debounce', 'host', 'port', 'skip_existing')
+        return cls(**{key: section[key] for key in keys if key in section})
+
+
+def _source_keys(config, section=None, prefix='') -> List[str]:
+    """Dotted keys of every source of the source section, e.g. 'box_office.domestic'"""
+    section = config['source'] if section is None else section
+    keys = []
+    for name, value in section.items():
+        if isinstance(value, dict):
+            keys.extend(_source_keys(config, value, f"{prefix}{name}."))
+        else:
+            keys.append(f"{prefix}{name}")
+    return keys
+
+
+class SourceWatcher:
+    """
+    Scans the files matched by the configured sources and reports the sources
+    with a new or rewritten file. A file is only reported once its size and
+    modification time stayed the same for the debounce period, so files still
+    being written are left alone. Files present when the watcher starts are
+    reported like new ones, unless skip_existing considers them processed.
+    """
+
+    def __init__(
+        self,
+        config,
+        debounce: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+        skip_existing: bool = False,
+    ):
+        self.config = config
+        self.debounce = debounce
+        self.clock = clock
+        self.keys = _source_keys(config)
+        # Path -> (size, mtime) when last reported
+        self.processed: Dict[str, Tuple[int, int]] = {}
+        # Path -> (stamp, time first seen)
+        self.pending: Dict[str, Tuple[Tuple[int, int], float]] = {}
+        if skip_existing:
+            for _, path, stamp in self._scan():
+                self.processed[path] = stamp
+
+    def _scan(self):
+        """(source key, path, (size, mtime)) of every file matched by the sources"""
+        for key in self.keys:
+            pattern = source_pattern(self.config, key)
+            paths = glob.glob(pattern) if is_pattern(pattern) else [pattern]
+            for path in paths:
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield key, path, (stat.st_size, stat.st_mtime_ns)
+
+    def poll(self) -> Set[str]:
+        """
+        Scan the sources once
+
+        :return: Keys of the sources with a file that settled since the last poll
+        """
+        now = self.clock()
+        settled = set()
+        for key, path, stamp in self._scan():
+            if self.processed.get(path) == stamp:
+                continue
+            previous = self.pending.get(path)
+            if previous is None or previous[0] != stamp:
+                # New file, or still growing: restart its debounce period
+                self.pending[path] = (stamp, now)
+            elif now - previous[1] >= self.debounce:
+                del self.pending[path]
+                self.processed[path] = stamp
+                settled.add(key)
+        return settled
+
+
+class WatchDaemon:
+    """
+    Long-running pipeline: watches the source directories and runs the stages
+    affected by every settled drop, in the same process. The pipeline graph, the
+    imported models and the shared schema registry stay loaded between runs, and
+    the registry is only reloaded when a schema file changes.
+
+    With incremental processing enabled a drop runs the incremental pipeline,
+    which only ingests the new partitions; otherwise the bronze nodes reading the
+    changed sources are run together with everything downstream of them, once
+    the latest files of all their sources are settled and of the same partition.
+    """
+
+    def __init__(
+        self,
+        graph: PipelineGraph,
+        config,
+        settings: Optional[WatchSettings] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.graph = graph
+        self.config = config
+        self.settings = settings or WatchSettings.from_config(config)
+        self.watcher = SourceWatcher(
+            config, self.settings.debounce, clock, self.settings.skip_existing
+        )
+        # Settled sources whose bronze node waits for its other files
+        self.waiting: Set[str] = set()
+        self.server: Optional[ThreadingHTTPServer] = None
+        self.stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._status = {
+            'state': IDLE,
+            'started_at': time.time(),
+            'last_poll': None,
+            'pending_files': [],
+            'waiting_sources': [],
+            'runs': 0,
+            'failures': 0,
+            'last_run': None,
+        }
+
+    def affected_nodes(self, keys: Set[str]) -> List[str]:
+        """Bronze nodes reading any of the given sources, in topological order"""
+        return [
+            name
+            for name in self.graph.order
+            if any(source in keys for source in self.graph.nodes[name].sources)
+        ]
+
+    def ready(self, name: str) -> bool:
+        """
+        Whether a bronze node can run outside incremental mode, where it reads the
+        latest file of each source: those files are settled and, for sources that
+        are patterns, all of the same partition
+        """
+        latest = {}  # source key -> its latest partition, for sources that are patterns
+        for key in self.graph.nodes[name].sources:
+            pattern = source_pattern(self.config, key)
+            partitions = list_partitions(pattern)
+            if not partitions or partitions[max(partitions)] in self.watcher.pending:
+                return False
+            if is_pattern(pattern):
+                latest[key] = max(partitions)
+        if len(set(latest.values())) > 1:
+            logging.info(
+                f"Waiting for the other files of partition {max(latest.values())} of {name}: {latest}"
+            )
+            return False
+        return True
+
+    def run_stages(self, nodes: List[str]):
+        """Run the pipeline for the given bronze nodes and their descendants"""
+        registry = get_shared_registry()
+        recorder = MetricsRecorder()
+        try:
+            with recording(recorder):
+                if (self.config.get('incremental') or {}).get('enabled'):
+                    return IncrementalRunner(self.graph, self.config, registry).run()
+                return Scheduler(self.graph, self.config, registry).run(
+                    self.graph.select(start=nodes)
+                )
+        finally:
+            export_metrics(recorder, self.config)
+
+    def poll_once(self) -> Optional[List[str]]:
+        """
+        Scan the sources once and run the stages affected by the settled files.
+        A failed run is logged and recorded in the status; the daemon keeps watching.
+
+        :return: Bronze nodes run, or None when no file settled
+        """
+        keys = self.watcher.poll() | self.waiting
+        nodes = self.affected_nodes(keys)
+        if not (self.config.get('incremental') or {}).get('enabled'):
+            # The incremental pipeline waits for incomplete partitions itself
+            waiting = [name for name in nodes if not self.ready(name)]
+            self.waiting = {
+                key
+                for name in waiting
+                for key in self.graph.nodes[name].sources
+                if key in keys
+            }
+            nodes = [name for name in nodes if name not in waiting]
+        self._update(
+            last_poll=time.time(),
+            pending_files=sorted(self.watcher.pending),
+            waiting_sources=sorted(self.waiting),
+        )
+        if not nodes:
+            return None
+        keys = {
+            key
+            for name in nodes
+            for key in self.graph.nodes[name].sources
+            if key in keys
+        }
+
+        logging.info(
+            f"New drops for {sorted(keys)}: running {nodes} and their downstream stages"
+        )
+        run = {
+            'nodes': nodes,
+            'started_at': time.time(),
+            'finished_at': None,
+            'error': None,
+        }
+        self._update(state=RUNNING, last_run=run)
+        try:
+            self.run_stages(nodes)
+            state = IDLE
+        except Exception as e:
+            logging.exception(f"Run for {nodes} failed")
+            run['error'] = repr(e)
+            state = FAILED
+        run['finished_at'] = time.time()
+        with self._lock:
+            self._status['state'] = state
+            self._status['runs'] += 1
+            self._status['failures'] += state == FAILED
+        return nodes
+
+    def status(self) -> dict:
+        """Snapshot of the daemon state, as served by the status endpoint"""
+        with self._lock:
+            status = dict(self._status)
+            status['last_run'] = (
+                dict(status['last_run']) if status['last_run'] else None
+            )
+        return status
+
+    def healthy(self) -> bool:
+        """
+        Whether the polling loop is alive: it scanned the sources recently,
+        or is running stages
+        """
+        status = self.status()
+        if status['state'] == RUNNING:
+            return True
+        last_poll = status['last_poll']
+        return (
+            last_poll is not None
+            and time.time() - last_poll <= 3 * self.settings.interval + 1
+        )
+
+    def _update(self, **values):
+        with self._lock:
+            self._status.update(values)
+
+    def start_server(self) -> Optional[ThreadingHTTPServer]:
+        """
+        Serve /health and /status in a background thread, when a port is configured
+        """
+        if self.settings.port is None:
+            return None
+        self.server = ThreadingHTTPServer(
+            (self.settings.host, self.settings.port), _handler(self)
+        )
+        threading.Thread(
+            target=self.server.serve_forever, name='watch-status', daemon=True
+        ).start()
+        host, port = self.server.server_address[:2]
+        logging.info(f"Serving the daemon status on http://{host}:{port}/status")
+        return self.server
+
+    def run_forever(self):
+        """Poll the sources until stop() is called or the process is interrupted"""
+        self.start_server()
+        logging.info(
+            f"Watching {len(self.watcher.keys)} sources every {self.settings.interval}s"
+        )
+        try:
+            while not self.stopped.is_set():
+                self.poll_once()
+                self.stopped.wait(self.settings.interval)
+        except KeyboardInterrupt:
+            logging.info("Stopping the watch daemon")
+        finally:
+            if self.server is not None:
+                self.server.shutdown()
+                self.server.server_close()
+
+    def stop(self):
+        self.stopped.set()
+
+
+def _handler(daemon: WatchDaemon):
+    """Request handler class serving the status of a daemon as JSON"""
+
+    class StatusHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == '/health':
+                healthy = daemon.healthy()
+                self._send(200 if healthy else 503, {'healthy': healthy})
+            elif self.path == '/status':
+                self._send(200, daemon.status())
+            else:
+                self._send(404, {'error': f"Unknown path: {self.path}"})
+
+        def _send(self, code, body):
+            payload = json.dumps(body).encode()
+            self.send_response(code)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            logging.debug(format % args)
+
+    return StatusHandler
@@ -0,0 +1,370 @@
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+import numpy as np
+import pandas as pd
+
+from src.movies.main import load_config
+from src.movies.storage.layers import artefact_path
+from src.movies.storage.readers import read_table
+
+GOLD_TABLE = 'gold/movies_unified'
+HASH_COLUMNS = ('movie_title',)
+SORTED_COLUMNS = ('release_year', 'total_box_office_gross_usd')
+
+
+@dataclass(frozen=True)
+class QuerySettings:
+    """What the query service indexes and where it listens"""
+
+    table: str = GOLD_TABLE
+    hash_columns: Tuple[str, ...] = HASH_COLUMNS
+    sorted_columns: Tuple[str, ...] = SORTED_COLUMNS
+    # Seconds between two checks for a new gold file; 0 disables reloads
+    reload_interval: float = 5.0
+    host: str = '127.0.0.1'
+    port: int = 8766
+
+    @classmethod
+    def from_config(cls, config) -> 'QuerySettings':
+        """Settings from the query section of a config, defaults for the missing keys"""
+        section = dict((config or {}).get('query') or {})
+        for key in ('hash_columns', 'sorted_columns'):
+            if key in section:
+                section[key] = tuple(section[key])
+        fields = (
+            'table',
+            'hash_columns',
+            'sorted_columns',
+            'reload_interval',
+            'host',
+            'port',
+        )
+        return cls(**{key: section[key] for key in fields if key in section})
+
+
+class GoldIndex:
+    """
+    Immutable snapshot of a gold table with its indexes. Columns are kept as NumPy
+    arrays and a row is only turned into a dict when a query returns it.
+
+    Hash indexes map every value of a unique column to its row. Sorted indexes hold
+    the rows of a numeric column ordered by value, missing values excluded, so a
+    range is two binary searches and a top-N is a slice.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        hash_columns: Sequence[str] = HASH_COLUMNS,
+        sorted_columns: Sequence[str] = SORTED_COLUMNS,
+        version=None,
+    ):
+        self.version = version
+        self.columns = list(df.columns)
+        self.values: Dict[str, np.ndarray] = {
+            column: _column_array(df[column]) for column in self.columns
+        }
+        # Whole-number columns read back as floats because of missing values
+        # are returned as ints
+        self._layout = [
+            (column, values, _is_integral(values))
+            for column, values in self.values.items()
+        ]
+        self.hash_indexes: Dict[str, Dict[object, int]] = {}
+        for column in hash_columns:
+            keys = self.values[column].tolist()
+            index = dict(zip(keys, range(len(keys))))
+            if len(index) != len(keys):
+                raise ValueError(
+                    f"Cannot hash-index {column}: its values are not unique"
+                )
+            self.hash_indexes[column] = index
+        self.sorted_indexes: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for column in sorted_columns:
+            values = self.values[column]
+            rows = np.flatnonzero(~np.isnan(values))
+            # Stable, so equal values keep their table order
+            rows = rows[np.argsort(values[rows], kind='stable')]
+            self.sorted_indexes[column] = (values[rows], rows)
+
+    def __len__(self):
+        return len(next(iter(self.values.values()), ()))
+
+    def row(self, position: int) -> dict:
+        """One row as a dict of Python values, None for missing values"""
+        row = {}
+        for column, values, integral in self._layout:
+            value = values.item(position)
+            if value != value:  # NaN
+                value = None
+            elif integral:
+                value = int(value)
+            row[column] = value
+        return row
+
+    def get(self, value, column: str = HASH_COLUMNS[0]) -> Optional[dict]:
+        """Row whose hash-indexed column equals value, or None"""
+        position = self._hash_index(column).get(value)
+        return None if position is None else self.row(position)
+
+    def range(
+        self, column: str, low=None, high=None, limit: Optional[int] = None
+    ) -> List[dict]:
+        """
+        Rows with low <= column <= high (either bound may be
+        omitted), in ascending order
+        """
+        values, rows = self._sorted_index(column)
+        start = 0 if low is None else np.searchsorted(values, low, side='left')
+        stop = (
+            len(values) if high is None else np.searchsorted(values, high, side='right')
+        )
+        if limit is not None:
+            stop = min(stop, start + limit)
+        return [self.row(position) for position in rows[start:stop].tolist()]
+
+    def top(self, column: str, n: int = 10, ascending=False) -> List[dict]:
+        """
+        The n rows with the largest values of a column, or the smallest when ascending
+        """
+        _, rows = self._sorted_index(column)
+        selected = rows[:n] if ascending else rows[::-1][:n]
+        return [self.row(position) for position in selected.tolist()]
+
+    def _hash_index(self, column):
+        try:
+            return self.hash_indexes[column]
+        except KeyError:
+            raise ValueError(
+                f"No hash index on {column}. Indexed columns: {list(self.hash_indexes)}"
+            ) from None
+
+    def _sorted_index(self, column):
+        try:
+            return self.sorted_indexes[column]
+        except KeyError:
+            raise ValueError(
+                f"No sorted index on {column}. Indexed columns: {list(self.sorted_indexes)}"
+            ) from None
+
+
+def _column_array(series: pd.Series) -> np.ndarray:
+    """
+    Numbers as float64 with NaN for missing values, everything else as objects with None
+    """
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series.to_numpy(dtype='float64', na_value=np.nan)
+    return series.astype(object).where(series.notna(), None).to_numpy()
+
+
+def _is_integral(values: np.ndarray) -> bool:
+    if values.dtype != np.float64:
+        return False
+    present = values[~np.isnan(values)]
+    return bool(np.all(np.mod(present, 1) == 0) and np.all(np.abs(present) < 2**53))
+
+
+class QueryService:
+    """
+    Answers lookups on the gold table from an in-memory GoldIndex. The table is
+    loaded once; when a new gold run replaces the file, a new index is built in the
+    background and swapped in with a single assignment, so every query sees either
+    the old or the new snapshot, never a mix. A file is only loaded once its size
+    and modification time stayed the same between two checks, and a file that fails
+    to load leaves the current index in place.
+    """
+
+    def __init__(self, config, settings: Optional[QuerySettings] = None):
+        self.settings = settings or QuerySettings.from_config(config)
+        self.path = artefact_path(config, self.settings.table)
+        self.index: GoldIndex = self._build(self._stamp())
+        self._seen = self.index.version
+        self._stopped = threading.Event()
+
+    def _stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _build(self, stamp) -> GoldIndex:
+        started = time.perf_counter()
+        index = GoldIndex(
+            read_table(self.path),
+            self.settings.hash_columns,
+            self.settings.sorted_columns,
+            stamp,
+        )
+        logging.info(
+            f"Indexed {len(index)} rows of {self.path} in {time.perf_counter() - started:.2f}s"
+        )
+        return index
+
+    def refresh(self) -> bool:
+        """
+        Swap in a new index when the gold file changed and has settled since the
+        previous check
+
+        :return: True when a new index was swapped in
+        """
+        stamp = self._stamp()
+        if stamp is None or stamp == self.index.version:
+            self._seen = stamp
+            return False
+        if stamp != self._seen:
+            # Changed since the previous check: possibly still being written
+            self._seen = stamp
+            return False
+        try:
+            index = self._build(stamp)
+        except Exception:
+            logging.exception(
+                f"Keeping the current index: {self.path} could not be loaded"
+            )
+            return False
+        self.index = index
+        return True
+
+    def get(self, title: str) -> Optional[dict]:
+        """Movie with this exact title, or None"""
+        return self.index.get(title)
+
+    def range(
+        self, column: str, low=None, high=None, limit: Optional[int] = None
+    ) -> List[dict]:
+        """Movies whose column lies between low and high included, in ascending order"""
+        return self.index.range(column, low, high, limit)
+
+    def top(self, column: str, n: int = 10, ascending=False) -> List[dict]:
+        """The n movies with the largest (or smallest) values of a column"""
+        return self.index.top(column, n, ascending)
+
+    def start_reloading(self) -> Optional[threading.Thread]:
+        """
+        Check for new gold runs every reload_interval seconds in a background thread
+        """
+        if not self.settings.reload_interval:
+            return None
+        thread = threading.Thread(
+            target=self._reload_loop, name='gold-index-reload', daemon=True
+        )
+        thread.start()
+        return thread
+
+    def _reload_loop(self):
+        while not self._stopped.wait(self.settings.reload_interval):
+            self.refresh()
+
+    def stop(self):
+        self._stopped.set()
+
+    def serve(self) -> ThreadingHTTPServer:
+        """HTTP server answering the queries as JSON; call serve_forever() on it"""
+        server = ThreadingHTTPServer(
+            (self.settings.host, self.settings.port), _handler(self)
+        )
+        host, port = server.server_address[:2]
+        logging.info(f"Serving gold queries on http://{host}:{port}")
+        return server
+
+
+def _handler(service: QueryService):
+    """
+    Request handler class of a query service:
+
+    GET /movies/<title>
+    GET /range/<column>?low=&high=&limit=
+    GET /top/<column>?n=&ascending=
+    """
+
+    class QueryHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            parts = [unquote(part) for part in url.path.strip('/').split('/', 1)]
+            params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            try:
+                if parts[0] == 'movies' and len(parts) == 2:
+                    movie = service.get(parts[1])
+                    if movie is None:
+                        self._send(404, {'error': f"No movie titled {parts[1]!r}"})
+                    else:
+                        self._send(200, movie)
+                elif parts[0] == 'range' and len(parts) == 2:
+                    low, high, limit = (
+                        params.get(key) for key in ('low', 'high', 'limit')
+                    )
+                    self._send(
+                        200,
+                        service.range(
+                            parts[1],
+                            None if low is None else float(low),
+                            None if high is None else float(high),
+                            None if limit is None else int(limit),
+                        ),
+                    )
+                elif parts[0] == 'top' and len(parts) == 2:
+                    ascending = params.get('ascending', 'false').lower() in (
+                        '1',
+                        'true',
+                    )
+                    self._send(
+                        200, service.top(parts[1], int(params.get('n', 10)), ascending)
+                    )
+                elif parts[0] == 'health':
+                    self._send(
+                        200,
+                        {'rows': len(service.index), 'version': service.index.version},
+                    )
+                else:
+                    self._send(404, {'error': f"Unknown path: {url.path}"})
+            except ValueError as e:
+                self._send(400, {'error': str(e)})
+
+        def _send(self, code, body):
+            payload = json.dumps(body).encode()
+            self.send_response(code)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            logging.debug(format % args)
+
+    return QueryHandler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description='Serve indexed lookups on the gold layer of the Movies Data Pipeline'
+    )
+    parser.add_argument(
+        'config_path', type=str, help='Path to the YAML configuration file'
+    )
+    parser.add_argument(
+        '--port',
+        type=int,
+        help='Port to listen on, on 127.0.0.1 (query.port by default)',
+    )
+    args = parser.parse_args()
+
+    config = load_config(args.config_path)
+    settings = QuerySettings.from_config(config)
+    if args.port is not None:
+        settings = replace(settings, port=args.port)
+    service = QueryService(config, settings)
+    service.start_reloading()
+    try:
+        service.serve().serve_forever()
+    except KeyboardInterrupt:
+        service.stop()
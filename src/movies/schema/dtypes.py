@@ -0,0 +1,147 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+MODES = ('default', 'compact')
+HINTS = ('string', 'category', 'downcast', 'keep')
+ARROW_STRING = 'string[pyarrow]'
+
+
+@dataclass(frozen=True)
+class DtypePolicy:
+    """Dtypes of the frames built by the pipeline: pandas defaults, or compact ones"""
+
+    mode: str = 'default'
+
+    def __post_init__(self):
+        if self.mode not in MODES:
+            raise ValueError(
+                f"Unknown dtype mode: {self.mode}. Available modes: {list(MODES)}"
+            )
+
+    @property
+    def compact(self) -> bool:
+        return self.mode == 'compact'
+
+    @classmethod
+    def from_config(cls, config) -> 'DtypePolicy':
+        """
+        Policy from the dtypes section of a config, 'compact' when
+        the section has no mode
+        """
+        section = (config or {}).get('dtypes') or {}
+        if not section:
+            return cls()
+        return cls(mode=section.get('mode', 'compact'))
+
+
+@dataclass
+class MemoryReport:
+    """In-memory size of one table before and after compaction"""
+
+    table: str
+    bytes_before: int
+    bytes_after: int
+
+    @property
+    def ratio(self) -> float:
+        return self.bytes_before / self.bytes_after if self.bytes_after else 1.0
+
+    def __str__(self):
+        return (
+            f"Memory of {self.table}: {self.bytes_before / 2**20:.2f} MB -> "
+            f"{self.bytes_after / 2**20:.2f} MB ({self.ratio:.1f}x smaller)"
+        )
+
+
+def memory_bytes(df: pd.DataFrame) -> int:
+    """Deep in-memory size of a DataFrame, Python string objects included"""
+    return int(df.memory_usage(deep=True, index=False).sum())
+
+
+def _downcast_float(series: pd.Series) -> pd.Series:
+    """
+    float32 when every value survives the round trip, the series unchanged otherwise
+    """
+    narrow = series.astype('float32')
+    values, restored = series.to_numpy(), narrow.to_numpy(dtype='float64')
+    if np.array_equal(values, restored, equal_nan=True):
+        return narrow
+    return series
+
+
+def compact_series(series: pd.Series, hint: Optional[str] = None) -> pd.Series:
+    """
+    Narrowest dtype that keeps every value of a column: strings become Arrow-backed
+    strings (or categoricals when hinted) and integers the smallest integer width
+    holding their range. Floats become float32 only when hinted 'downcast' and no
+    value loses precision, since float32 values are written differently to CSV.
+    Other columns, and columns hinted 'keep', are returned unchanged.
+
+    :param hint: 'string', 'category', 'downcast' or 'keep'; by default the dtype
+                 decides
+    """
+    if hint == 'keep' or pd.api.types.is_bool_dtype(series):
+        return series
+    if hint == 'category':
+        return (
+            series
+            if isinstance(series.dtype, pd.CategoricalDtype)
+            else series.astype('category')
+        )
+    if pd.api.types.is_integer_dtype(series):
+        # Nullable integers stay nullable: Int64 downcasts to Int8/Int16/Int32
+        return pd.to_numeric(series, downcast='integer')
+    if pd.api.types.is_float_dtype(series):
+        return (
+            _downcast_float(series)
+            if hint == 'downcast' and series.dtype == 'float64'
+            else series
+        )
+    if hint == 'string' or series.dtype == object:
+        if series.dtype == ARROW_STRING:
+            return series
+        if hint == 'string' or pd.api.types.infer_dtype(series, skipna=True) in (
+            'string',
+            'empty',
+        ):
+            return series.astype(ARROW_STRING)
+    return series
+
+
+def compact_frame(
+    df: pd.DataFrame, hints: Optional[Dict[str, str]] = None
+) -> pd.DataFrame:
+    """
+    Compact every column of a DataFrame. Columns left unchanged are not copied.
+
+    :param hints: Column -> compaction hint, see compact_series
+    """
+    hints = hints or {}
+    if not df.columns.is_unique:
+        return df
+    data = {
+        column: compact_series(df[column], hints.get(column)) for column in df.columns
+    }
+    return pd.DataFrame(data, index=df.index, copy=False)
+
+
+_policy: ContextVar[DtypePolicy] = ContextVar('dtype_policy', default=DtypePolicy())
+
+
+def current_dtype_policy() -> DtypePolicy:
+    return _policy.get()
+
+
+@contextmanager
+def dtype_policy(policy: DtypePolicy):
+    """Apply a dtype policy to the models built within the block"""
+    token = _policy.set(policy)
+    try:
+        yield policy
+    finally:
+        _policy.reset(token)
@@ -1,9 +1,102 @@
 from dataclasses import dataclass, field
-from typing import Dict, Any, Optional, List
+from typing import Callable, Dict, Any, FrozenSet, Optional, List, Tuple
+import hashlib
 import json
+import logging
+import threading
 from pathlib import Path
 import pandas as pd
 
+from src.movies.metrics import stage
+from src.movies.schema.dtypes import (
+    ARROW_STRING, HINTS, MemoryReport, compact_frame, current_dtype_policy, memory_bytes
+)
+from src.movies.schema.validation import ValidationReport, validate_values
+
+DEFAULT_SCHEMA_DIR = Path(__file__).parent / "versions"
+
+
+@dataclass(frozen=True)
+class Cast:
+    """A column transformation and the check that tells whether it is already satisfied"""
+    is_satisfied: Callable[[pd.Series], bool]
+    apply: Callable[[pd.Series], pd.Series]
+
+
+def _to_string(series: pd.Series) -> pd.Series:
+    # Compact mode keeps strings in Arrow memory instead of one Python object per value
+    return series.astype(ARROW_STRING if current_dtype_policy().compact else str)
+
+
+CASTS: Dict[str, Cast] = {
+    "int": Cast(
+        # Any nullable integer, so that compacted Int8/Int16/Int32 columns are not widened again
+        is_satisfied=lambda s: pd.api.types.is_extension_array_dtype(s) and pd.api.types.is_integer_dtype(s),
+        apply=lambda s: pd.to_numeric(s, errors='coerce').astype('Int64'),
+    ),
+    "float": Cast(
+        # to_numeric leaves numeric columns untouched, so there is nothing to do
+        is_satisfied=lambda s: pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s),
+        apply=lambda s: pd.to_numeric(s, errors='coerce'),
+    ),
+    "string": Cast(
+        is_satisfied=lambda s: pd.api.types.infer_dtype(s, skipna=False) == 'string',
+        apply=_to_string,
+    ),
+}
+
+
+class TransformationPlan:
+    """
+    Compiled form of a SchemaVersion: casts, projection and rename run in one step.
+
+    The result is assembled from the input columns without copying them, so columns
+    that need no cast share memory with the input DataFrame.
+    """
+
+    def __init__(self, schema_version: 'SchemaVersion'):
+        self.casts: Dict[str, Cast] = {
+            column: CASTS[transform_type]
+            for column, transform_type in schema_version.transformations.items()
+            if transform_type in CASTS
+        }
+        # Projection keeps the declared schema columns; an empty schema keeps everything
+        self.columns = frozenset(schema_version.schema)
+        self.mapping: Dict[str, str] = dict(schema_version.mapping)
+
+    def execute(self, df: pd.DataFrame, cast=True, project=True, rename=True) -> pd.DataFrame:
+        """Apply the selected steps of the plan to a DataFrame"""
+        if not df.columns.is_unique:
+            # Column-wise assembly needs unique labels; fall back to the pandas operations
+            return self._execute_with_copies(df, cast, project, rename)
+
+        columns = df.columns
+        if project and self.columns:
+            columns = [column for column in columns if column in self.columns]
+
+        data = {}
+        for column in columns:
+            series = df[column]
+            transform = self.casts.get(column) if cast else None
+            if transform is not None and not transform.is_satisfied(series):
+                series = transform.apply(series)
+            data[self.mapping.get(column, column) if rename else column] = series
+
+        return pd.DataFrame(data, index=df.index, copy=False)
+
+    def _execute_with_copies(self, df, cast, project, rename):
+        if project and self.columns:
+            df = df.loc[:, df.columns.isin(self.columns)]
+        else:
+            df = df.copy()
+        if cast:
+            for column, transform in self.casts.items():
+                if column in df.columns:
+                    df[column] = transform.apply(df[column])
+        if rename:
+            df = df.rename(columns=self.mapping)
+        return df
+
 
 @dataclass
 class SchemaVersion:
@@ -13,23 +106,68 @@ class SchemaVersion:
     schema: Dict[str, str]  # column_name -> data_type
     mapping: Dict[str, str]  # source_column -> target_column
     transformations: Dict[str, str] = field(default_factory=dict)  # column -> transformation_type
+    constraints: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # column -> rule -> limit
+    dtypes: Dict[str, str] = field(default_factory=dict)  # column -> compaction hint
+    plan: TransformationPlan = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        unknown = {hint for hint in self.dtypes.values() if hint not in HINTS}
+        if unknown:
+            raise ValueError(f"Unknown dtype hints: {sorted(unknown)}. Available hints: {list(HINTS)}")
+        # Compile once; every transform of this version reuses the plan
+        self.plan = TransformationPlan(self)
 
     def apply_mapping(self, df: pd.DataFrame) -> pd.DataFrame:
         """Apply column mapping to a DataFrame"""
-        return df.rename(columns=self.mapping)
+        return self.plan.execute(df, cast=False, project=False)
 
     def apply_transformations(self, df: pd.DataFrame) -> pd.DataFrame:
         """Apply data type transformations to a DataFrame"""
-        df = df.copy()
-        for column, transform_type in self.transformations.items():
-            if column in df.columns:
-                if transform_type == "int":
-                    df[column] = pd.to_numeric(df[column], errors='coerce').astype('Int64')
-                elif transform_type == "float":
-                    df[column] = pd.to_numeric(df[column], errors='coerce')
-                elif transform_type == "string":
-                    df[column] = df[column].astype(str)
-        return df
+        return self.plan.execute(df, project=False, rename=False)
+
+    @property
+    def dtype_hints(self) -> Dict[str, str]:
+        """Compaction hints under both the source and the mapped column names"""
+        hints = dict(self.dtypes)
+        hints.update({self.mapping[column]: hint for column, hint in self.dtypes.items() if column in self.mapping})
+        return hints
+
+
+class VersionIndex:
+    """
+    Versions of one provider, sorted once, and the version detected for each
+    column signature (frozen set of column names).
+
+    A signature matches the newest version whose columns it contains. The
+    signature of every version is resolved when the index is built, others on
+    first lookup, so repeated detections are dictionary lookups.
+    """
+
+    def __init__(self, schemas: Dict[str, 'SchemaVersion']):
+        self.versions: Tuple[str, ...] = tuple(sorted(schemas, key=_version_number))
+        self._newest_first = [(version, frozenset(schemas[version].schema)) for version in reversed(self.versions)]
+        # signature -> (detected version or None, other matching versions not contained in it)
+        self._matches: Dict[FrozenSet, Tuple[Optional[str], Tuple[str, ...]]] = {}
+        for _, signature in self._newest_first:
+            self.match(signature)
+
+    def match(self, columns) -> Tuple[Optional[str], Tuple[str, ...]]:
+        """
+        Version detected for a set of columns, and the other matching versions that
+        it does not strictly extend: when there are any, the match is ambiguous
+        """
+        signature = columns if isinstance(columns, frozenset) else frozenset(columns)
+        match = self._matches.get(signature)
+        if match is None:
+            matching = [(version, required) for version, required in self._newest_first if required <= signature]
+            if not matching:
+                match = (None, ())
+            else:
+                # Older versions whose columns the detected one strictly extends are not ambiguous
+                version, detected = matching[0]
+                match = (version, tuple(other for other, required in matching[1:] if not required < detected))
+            self._matches[signature] = match
+        return match
 
 
 class SchemaRegistry:
@@ -41,90 +179,164 @@ class SchemaRegistry:
     - Automatic version detection
     - Schema validation
     - Column mapping and transformations
+
+    Version files are listed and stat'ed when the registry is created; a version
+    file is only read, parsed and hashed when first needed.
     """
 
     def __init__(self, schema_dir: str = None):
-        if schema_dir is None:
-            # Default to versions directory relative to this file
-            schema_dir = Path(__file__).parent / "versions"
-        self.schema_dir = Path(schema_dir).resolve()
-        self.schemas: Dict[str, Dict[str, SchemaVersion]] = {}
-        self._load_schemas()
-
-    def _load_schemas(self):
-        """Load all schema versions from JSON files (supports nested directories)"""
+        self.schema_dir = _resolve_schema_dir(schema_dir)
+        # provider -> version -> file, oldest version first, listed without parsing
+        self._files: Dict[str, Dict[str, Path]] = {}
+        self._parsed: Dict[Path, Optional[SchemaVersion]] = {}
+        # Per-file (mtime_ns, size) stamps, and content hashes of the files read so far
+        self._file_stamps: Dict[Path, Tuple[int, int]] = {}
+        self._file_hashes: Dict[Path, str] = {}
+        self._indexes: Dict[str, VersionIndex] = {}  # built on first detection
+        self._reported: set = set()  # ambiguous (provider, signature) already logged
+        self._lock = threading.RLock()
+        self._discover_files()
+
+    @property
+    def schemas(self) -> Dict[str, Dict[str, SchemaVersion]]:
+        """Every version of every provider, parsing the files not parsed yet"""
+        return {provider: self._versions(provider) for provider in self._files}
+
+    @property
+    def providers(self) -> List[str]:
+        """Names of the providers with at least one version file"""
+        return list(self._files)
+
+    def _discover_files(self):
+        """List the version files of every provider (supports nested directories)"""
         if not self.schema_dir.exists():
             raise FileNotFoundError(f"Schema directory not found: {self.schema_dir}")
+        self._files, self._file_stamps = self._scan_files()
+
+    def _scan_files(self) -> Tuple[Dict[str, Dict[str, Path]], Dict[Path, Tuple[int, int]]]:
+        """
+        Walk the schema directory once, without reading any file
+
+        :return: Version files per provider, oldest first, and the (mtime_ns, size) stamp of each file
+        """
+        files, stamps = {}, {}
+        for provider_name, schema_files in _discover_providers(self.schema_dir, ""):
+            versions = sorted(
+                (schema_file for schema_file in schema_files if _is_version(schema_file.stem)),
+                key=lambda schema_file: _version_number(schema_file.stem),
+            )
+            files[provider_name] = {schema_file.stem: schema_file for schema_file in versions}
+            for schema_file in versions:
+                stat = schema_file.stat()
+                stamps[schema_file] = (stat.st_mtime_ns, stat.st_size)
+        return files, stamps
+
+    def _read(self, schema_file: Path) -> bytes:
+        """Content of a version file, remembering its hash to detect later changes"""
+        content = schema_file.read_bytes()
+        self._file_hashes[schema_file] = hashlib.sha256(content).hexdigest()
+        return content
 
-        self._load_schemas_recursive(self.schema_dir, "")
-
-    def _load_schemas_recursive(self, directory, prefix):
-        """Recursively load schemas from nested directories"""
-        for item in directory.iterdir():
-            if item.is_dir():
-                # Check if this directory contains schema files
-                schema_files = list(item.glob("v*.json"))
-                if schema_files:
-                    # This is a provider directory with schemas
-                    provider_name = f"{prefix}/{item.name}" if prefix else item.name
-                    provider_schemas = {}
-
-                    for schema_file in sorted(schema_files):
-                        version = schema_file.stem
-                        try:
-                            with open(schema_file) as f:
-                                schema_data = json.load(f)
-
-                            # Ensure transformations field exists
-                            if 'transformations' not in schema_data:
-                                schema_data['transformations'] = {}
-
-                            provider_schemas[version] = SchemaVersion(**schema_data)
-                        except Exception as e:
-                            print(f"Warning: Failed to load schema {schema_file}: {e}")
-
-                    if provider_schemas:
-                        self.schemas[provider_name] = provider_schemas
-                else:
-                    # Recurse into subdirectory
-                    new_prefix = f"{prefix}/{item.name}" if prefix else item.name
-                    self._load_schemas_recursive(item, new_prefix)
+    def _load_schema(self, schema_file: Path) -> Optional[SchemaVersion]:
+        """Parse one version file once; files that fail to parse are skipped with a warning"""
+        with self._lock:
+            if schema_file in self._parsed:
+                return self._parsed[schema_file]
+            schema = None
+            try:
+                schema_data = json.loads(self._read(schema_file))
+
+                # Ensure transformations field exists
+                if 'transformations' not in schema_data:
+                    schema_data['transformations'] = {}
+
+                schema = SchemaVersion(**schema_data)
+            except Exception as e:
+                print(f"Warning: Failed to load schema {schema_file}: {e}")
+            self._parsed[schema_file] = schema
+            return schema
+
+    def _versions(self, provider: str) -> Dict[str, SchemaVersion]:
+        """Every parsed version of a provider, oldest first"""
+        versions = {}
+        for version, schema_file in self._files.get(provider, {}).items():
+            schema = self._load_schema(schema_file)
+            if schema is not None:
+                versions[version] = schema
+        return versions
+
+    def _index(self, provider: str) -> Optional[VersionIndex]:
+        index = self._indexes.get(provider)
+        if index is None and provider in self._files:
+            with self._lock:
+                index = self._indexes.setdefault(provider, VersionIndex(self._versions(provider)))
+        return index
+
+    def is_stale(self) -> bool:
+        """
+        Check whether any schema file was added, removed or changed since loading.
+        Only files whose stamp moved are hashed again, and only those already read:
+        files never read yet will be read in their current state anyway.
+        """
+        _, stamps = self._scan_files()
+        if stamps == self._file_stamps:
+            return False
+        if stamps.keys() != self._file_stamps.keys():
+            return True
+
+        with self._lock:
+            for schema_file, stamp in stamps.items():
+                known_hash = self._file_hashes.get(schema_file)
+                if stamp != self._file_stamps[schema_file] and known_hash is not None:
+                    if hashlib.sha256(schema_file.read_bytes()).hexdigest() != known_hash:
+                        return True
+
+        # Only timestamps moved (e.g. a touch or a checkout): remember them
+        self._file_stamps = stamps
+        return False
+
+    def schema_hash(self, provider: str) -> str:
+        """Content hash of every schema version file of a provider"""
+        digest = hashlib.sha256()
+        with self._lock:
+            for schema_file in sorted(self._files.get(provider, {}).values()):
+                if schema_file not in self._file_hashes:
+                    self._read(schema_file)
+                digest.update(f"{schema_file.name}:{self._file_hashes[schema_file]}\n".encode())
+        return digest.hexdigest()
 
     def get_schema(self, provider: str, version: str) -> Optional[SchemaVersion]:
         """Get a specific schema version for a provider"""
-        return self.schemas.get(provider, {}).get(version)
+        schema_file = self._files.get(provider, {}).get(version)
+        return self._load_schema(schema_file) if schema_file is not None else None
 
     def get_latest_version(self, provider: str) -> Optional[str]:
         """Get the latest version number for a provider"""
-        provider_schemas = self.schemas.get(provider, {})
-        if not provider_schemas:
-            return None
-        # Versions are like v1, v2, v3... sort them
-        versions = sorted(provider_schemas.keys(), key=lambda x: int(x[1:]))
+        versions = self.list_versions(provider)
         return versions[-1] if versions else None
 
     def list_versions(self, provider: str) -> List[str]:
-        """List all available versions for a provider"""
-        return list(self.schemas.get(provider, {}).keys())
+        """List all available versions for a provider, oldest first"""
+        return list(self._files.get(provider, {}))
 
     def detect_version(self, provider: str, df: pd.DataFrame) -> str:
         """
         Auto-detect schema version based on DataFrame columns.
-        Returns the first matching version or 'unknown'.
+        Returns the newest version whose columns are all present, or 'unknown'.
+        Matches that other versions could claim as well are logged once.
         """
-        provider_schemas = self.schemas.get(provider, {})
-
-        # Try versions in reverse order (newest first)
-        for version in sorted(provider_schemas.keys(), key=lambda x: int(x[1:]), reverse=True):
-            schema = provider_schemas[version]
-            expected_cols = set(schema.schema.keys())
-            actual_cols = set(df.columns)
+        index = self._index(provider)
+        if index is None:
+            return "unknown"
 
-            # Check if all expected columns are present
-            if expected_cols.issubset(actual_cols):
-                return version
-
-        return "unknown"
+        signature = frozenset(df.columns)
+        version, others = index.match(signature)
+        if others and (provider, signature) not in self._reported:
+            self._reported.add((provider, signature))
+            logging.warning(
+                f"Ambiguous schema version for {provider}: columns match {version} and {list(others)}, using {version}"
+            )
+        return version or "unknown"
 
     def validate_schema(self, provider: str, version: str, df: pd.DataFrame) -> tuple[bool, List[str]]:
         """
@@ -151,19 +363,115 @@ class SchemaRegistry:
 
         return len(errors) == 0, errors
 
+    def validate_values(self, provider: str, version: str, df: pd.DataFrame,
+                        sample_rows: Optional[int] = None, sample_size: int = 5) -> ValidationReport:
+        """
+        Check the values of a DataFrame against the declared types and constraints
+        of a schema version: dtype, nullable, min, max, enum and unique.
+        Each rule is one vectorized pass over its column.
+
+        :param sample_rows: Check a random sample of at most this many rows
+        :param sample_size: Bad rows kept per violated rule
+        :return: Violation counts and sampled bad rows per column and rule
+        """
+        schema = self.get_schema(provider, version)
+        if not schema:
+            raise ValueError(f"Schema not found: {provider}/{version}")
+        return validate_values(schema, df, provider, sample_rows=sample_rows, sample_size=sample_size)
+
     def transform_dataframe(self, provider: str, version: str, df: pd.DataFrame) -> pd.DataFrame:
         """
-        Apply full transformation pipeline: mapping + transformations.
+        Apply full transformation pipeline: transformations, projection and mapping,
+        executed in one step by the version's compiled plan.
         """
         schema = self.get_schema(provider, version)
         if not schema:
-            available = list(self.schemas.keys())
+            available = self.providers
             raise ValueError(f"Schema not found: {provider}/{version}. Available providers: {available}")
 
-        # Apply transformations first (on source columns)
-        df = schema.apply_transformations(df)
+        # Transformations run on source columns, mapping renames them afterwards
+        with stage('transform', rows_in=len(df)) as metrics:
+            transformed = schema.plan.execute(df)
+            metrics.rows_out = len(transformed)
+        return self.compact_dataframe(provider, version, transformed)
+
+    def compact_dataframe(self, provider: str, version: str, df: pd.DataFrame, table: str = None) -> pd.DataFrame:
+        """
+        Give a DataFrame compact dtypes when the current dtype policy asks for it,
+        following the dtype hints of the schema version, and log its memory before
+        and after. The DataFrame is returned unchanged otherwise.
+
+        :param table: Name of the table in the memory report, the provider by default
+        """
+        if not current_dtype_policy().compact:
+            return df
+        schema = self.get_schema(provider, version)
+        with stage('compact', rows_in=len(df)) as metrics:
+            report = MemoryReport(table or provider, memory_bytes(df), 0)
+            df = compact_frame(df, schema.dtype_hints if schema else None)
+            report.bytes_after = memory_bytes(df)
+            metrics.rows_out = len(df)
+            metrics.memory_in_mb = round(report.bytes_before / 2**20, 3)
+            metrics.memory_out_mb = round(report.bytes_after / 2**20, 3)
+        logging.info(str(report))
+        return df
+
+
+def _is_version(name: str) -> bool:
+    """Version files are named v1, v2, ...; other v*.json files are ignored"""
+    return name[:1] == 'v' and name[1:].isdigit()
+
+
+def _version_number(version: str) -> int:
+    """Versions are named v1, v2, ... and sort by their number"""
+    return int(version[1:])
+
+
+def _discover_providers(directory: Path, prefix: str):
+    """
+    Yield (provider_name, sorted schema files) for every provider directory.
+    A directory holding v*.json files is a provider; other directories are recursed into.
+    """
+    for item in directory.iterdir():
+        if not item.is_dir():
+            continue
+        name = f"{prefix}/{item.name}" if prefix else item.name
+        schema_files = sorted(item.glob("v*.json"))
+        if schema_files:
+            yield name, schema_files
+        else:
+            yield from _discover_providers(item, name)
+
+
+def _resolve_schema_dir(schema_dir=None) -> Path:
+    """Resolve a schema directory, defaulting to the versions directory next to this file"""
+    if schema_dir is None:
+        schema_dir = DEFAULT_SCHEMA_DIR
+    return Path(schema_dir).resolve()
+
+
+_shared_registries: Dict[Path, SchemaRegistry] = {}
+_shared_registries_lock = threading.Lock()
+
+
+def get_shared_registry(schema_dir: str = None) -> SchemaRegistry:
+    """
+    Return the process-wide SchemaRegistry for a schema directory.
+
+    The registry is loaded once and reused by every caller. It is reloaded when a
+    schema file is added, removed or its content changes. A reload replaces the
+    shared instance, so registries already handed out stay consistent.
+    """
+    key = _resolve_schema_dir(schema_dir)
+    with _shared_registries_lock:
+        registry = _shared_registries.get(key)
+        if registry is None or registry.is_stale():
+            registry = SchemaRegistry(key)
+            _shared_registries[key] = registry
+        return registry
 
-        # Then apply mapping (rename columns)
-        df = schema.apply_mapping(df)
 
-        return df
\ No newline at end of file
+def clear_shared_registries():
+    """Drop all shared registries so the next lookup reloads from disk"""
+    with _shared_registries_lock:
+        _shared_registries.clear()
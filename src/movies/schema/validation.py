@@ -0,0 +1,198 @@
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+MODES = ('off', 'warn', 'strict')
+
+
+class DataQualityError(ValueError):
+    """Raised in strict mode when values break the constraints of their schema"""
+
+
+@dataclass
+class Violation:
+    """Rows of one column breaking one rule"""
+
+    column: str
+    rule: str
+    count: int
+    # (row label, value), bounded
+    sample: List[Tuple[Any, Any]] = field(default_factory=list)
+
+    def __str__(self):
+        values = ', '.join(f"{label}={value!r}" for label, value in self.sample)
+        return f"{self.column} {self.rule}: {self.count} rows (e.g. {values})"
+
+
+@dataclass
+class ValidationReport:
+    provider: str
+    version: str
+    rows: int  # rows of the input
+    rows_checked: int  # fewer than rows in sampling mode
+    violations: List[Violation] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.violations
+
+    @property
+    def sampled(self) -> bool:
+        return self.rows_checked < self.rows
+
+    def summary(self) -> str:
+        checked = (
+            f"{self.rows_checked} of {self.rows} sampled rows"
+            if self.sampled
+            else f"{self.rows} rows"
+        )
+        lines = [
+            f"Data quality of {self.provider} {self.version} ({checked}): {len(self.violations)} violations"
+        ]
+        lines.extend(f"  {violation}" for violation in self.violations)
+        return '\n'.join(lines)
+
+
+def _rule_masks(
+    series: pd.Series, declared_type: Optional[str], constraints: Dict[str, Any]
+):
+    """
+    Yield (rule, mask of breaking rows) for one column, in the order dtype,
+    nullable, min, max, enum, unique. Every mask is one vectorized pass.
+    """
+    present = series.notna()
+    numeric = None
+    if (
+        declared_type in ('int64', 'float64')
+        or 'min' in constraints
+        or 'max' in constraints
+    ):
+        numeric = (
+            series
+            if pd.api.types.is_numeric_dtype(series)
+            else pd.to_numeric(series, errors='coerce')
+        )
+
+    if declared_type in ('int64', 'float64'):
+        if pd.api.types.is_bool_dtype(series):
+            yield 'dtype', present
+        elif not pd.api.types.is_numeric_dtype(series) or (
+            declared_type == 'int64' and not pd.api.types.is_integer_dtype(series)
+        ):
+            bad = present & numeric.isna()
+            if declared_type == 'int64':
+                bad |= numeric.notna() & (numeric % 1 != 0)
+            yield 'dtype', bad
+
+    if constraints.get('nullable', True) is False:
+        yield 'nullable', ~present
+    if 'min' in constraints:
+        yield 'min', (numeric < constraints['min']).fillna(False)
+    if 'max' in constraints:
+        yield 'max', (numeric > constraints['max']).fillna(False)
+    if 'enum' in constraints:
+        yield 'enum', present & ~series.isin(constraints['enum'])
+    if constraints.get('unique'):
+        yield 'unique', present & series.duplicated(keep=False)
+
+
+def validate_values(
+    schema_version,
+    df: pd.DataFrame,
+    provider: str = None,
+    sample_rows: Optional[int] = None,
+    sample_size: int = 5,
+    seed: int = 0,
+) -> ValidationReport:
+    """
+    Check every declared column of a DataFrame against its type and constraints
+
+    Columns absent from the DataFrame are skipped; missing columns are reported by
+    validate_schema. Uniqueness is only checked within the rows checked.
+
+    :param sample_rows: Check a random sample of at most this many rows
+    :param sample_size: Bad rows kept per violated rule
+    """
+    checked = df
+    if sample_rows is not None and len(df) > sample_rows:
+        checked = df.sample(n=sample_rows, random_state=seed).sort_index()
+
+    report = ValidationReport(provider, schema_version.version, len(df), len(checked))
+    columns = list(dict.fromkeys([*schema_version.schema, *schema_version.constraints]))
+    for column in columns:
+        if column not in checked.columns:
+            continue
+        series = checked[column]
+        constraints = schema_version.constraints.get(column, {})
+        for rule, mask in _rule_masks(
+            series, schema_version.schema.get(column), constraints
+        ):
+            count = int(mask.sum())
+            if count:
+                bad = series[mask].head(sample_size)
+                report.violations.append(
+                    Violation(column, rule, count, list(bad.items()))
+                )
+    return report
+
+
+@dataclass(frozen=True)
+class ValidationPolicy:
+    """What bronze ingestion does about value violations: nothing, log them or fail"""
+
+    mode: str = 'off'
+    sample_rows: Optional[int] = None
+    sample_size: int = 5
+
+    def __post_init__(self):
+        if self.mode not in MODES:
+            raise ValueError(
+                f"Unknown validation mode: {self.mode}. Available modes: {list(MODES)}"
+            )
+
+    @classmethod
+    def from_config(cls, config) -> 'ValidationPolicy':
+        """
+        Policy from the validation section of a config, 'warn' when
+        the section has no mode
+        """
+        section = (config or {}).get('validation') or {}
+        if not section:
+            return cls()
+        options = {
+            key: section[key]
+            for key in ('sample_rows', 'sample_size')
+            if key in section
+        }
+        return cls(mode=section.get('mode', 'warn'), **options)
+
+    def enforce(self, report: ValidationReport):
+        """Log the violations of a report, or raise them in strict mode"""
+        if report.ok:
+            return
+        if self.mode == 'strict':
+            raise DataQualityError(report.summary())
+        logging.warning(report.summary())
+
+
+_policy: ContextVar[ValidationPolicy] = ContextVar(
+    'validation_policy', default=ValidationPolicy()
+)
+
+
+def current_policy() -> ValidationPolicy:
+    return _policy.get()
+
+
+@contextmanager
+def validation_policy(policy: ValidationPolicy):
+    """Apply a validation policy to the models built within the block"""
+    token = _policy.set(policy)
+    try:
+        yield policy
+    finally:
+        _policy.reset(token)
@@ -0,0 +1,53 @@
+from src.movies.storage.partitions import is_pattern, latest_partition
+
+LAYERS = ('bronze', 'silver', 'gold')
+
+
+def get_layer_writer(config, layer):
+    """Return the writer configured for a layer in output.format (CSV by default)"""
+    # Writers import pandas; graph discovery only needs the layer names of this module
+    from src.movies.storage.writers import get_writer
+
+    formats = config['output'].get('format') or {}
+    return get_writer(formats.get(layer, 'csv'))
+
+
+def layer_path(config, layer, name):
+    """Path of a table persisted in a layer, with the extension of the layer's format"""
+    return (
+        f"{config['output'][layer]}/{name}{get_layer_writer(config, layer).extension}"
+    )
+
+
+def artefact_path(config, artefact):
+    """Path of a persisted artefact named '<layer>/<table>'"""
+    layer, name = artefact.split('/', 1)
+    return layer_path(config, layer, name)
+
+
+def partition_path(config, artefact, partition):
+    """
+    Path of one partition of an artefact, stored
+    as '<layer dir>/<table>/<partition><ext>'
+    """
+    layer, name = artefact.split('/', 1)
+    return f"{config['output'][layer]}/{name}/{partition}{get_layer_writer(config, layer).extension}"
+
+
+def source_pattern(config, key):
+    """
+    Resolve a dotted source key such as 'box_office.domestic' in the source section
+    """
+    value = config['source']
+    for part in key.split('.'):
+        value = value[part]
+    return value
+
+
+def source_path(config, key):
+    """
+    File read for a source: the configured path, or the latest
+    partition of a glob pattern
+    """
+    pattern = source_pattern(config, key)
+    return latest_partition(pattern) if is_pattern(pattern) else pattern
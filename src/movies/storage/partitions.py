@@ -0,0 +1,44 @@
+import glob
+import re
+from pathlib import Path
+from typing import Dict
+
+# Provider drops are prefixed with their date, e.g. 20251022_provider2.json
+PARTITION_PATTERN = re.compile(r'(\d{8})')
+
+
+def is_pattern(path) -> bool:
+    """Whether a configured source is a glob pattern rather than a single file"""
+    return glob.has_magic(str(path))
+
+
+def partition_of(path) -> str:
+    """Partition of a source file: the date in its name, or its stem when undated"""
+    match = PARTITION_PATTERN.search(Path(path).name)
+    return match.group(1) if match else Path(path).stem
+
+
+def list_partitions(pattern) -> Dict[str, str]:
+    """
+    Files matched by a source pattern, keyed by partition in ascending order
+
+    :param pattern: Glob pattern, or a plain path for a single-partition source
+    """
+    paths = sorted(glob.glob(pattern)) if is_pattern(pattern) else [pattern]
+    partitions = {}
+    for path in paths:
+        partition = partition_of(path)
+        if partition in partitions:
+            raise ValueError(
+                f"Files {partitions[partition]} and {path} are both partition {partition} of {pattern}"
+            )
+        partitions[partition] = path
+    return dict(sorted(partitions.items()))
+
+
+def latest_partition(pattern) -> str:
+    """File of the most recent partition matched by a source pattern"""
+    partitions = list_partitions(pattern)
+    if not partitions:
+        raise FileNotFoundError(f"No file matches source pattern: {pattern}")
+    return partitions[max(partitions)]
@@ -0,0 +1,389 @@
+import gzip
+import io
+import json
+import math
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.movies.metrics import stage
+
+# Compressed text files are read through a decompressing
+# stream: name.csv.gz, name.json.zst
+COMPRESSIONS = {'.gz': 'gzip', '.zst': 'zstd'}
+JSON_SUFFIXES = ('.json', '.ndjson', '.jsonl')
+
+
+def table_format(file_path) -> Tuple[str, Optional[str]]:
+    """
+    Format suffix and compression of a table file
+
+    :return: e.g. ('.csv', None) for name.csv and ('.json', 'zstd') for name.json.zst
+    """
+    path = Path(file_path)
+    compression = COMPRESSIONS.get(path.suffix)
+    if compression is None:
+        return path.suffix, None
+    if path.with_suffix('').suffix not in ('.csv',) + JSON_SUFFIXES:
+        raise ValueError(f"Only CSV and JSON files can be read compressed: {file_path}")
+    return path.with_suffix('').suffix, compression
+
+
+def open_text(file_path):
+    """
+    Open a text table file for reading, decompressing gzip and zstd files on the fly
+    """
+    _, compression = table_format(file_path)
+    if compression == 'gzip':
+        return gzip.open(file_path, 'rt', encoding='utf-8')
+    if compression == 'zstd':
+        import pyarrow as pa
+
+        return io.TextIOWrapper(
+            pa.input_stream(str(file_path), compression='zstd'), encoding='utf-8'
+        )
+    return open(file_path, encoding='utf-8')
+
+
+def read_table(
+    file_path, columns=None, dtypes: Optional[Dict[str, str]] = None
+) -> pd.DataFrame:
+    """
+    Read a whole table, choosing the reader from the file extension
+
+    :param file_path: Path to a .csv, .json, .ndjson, .parquet or .arrow file;
+                      CSV and JSON files may be compressed (.gz, .zst)
+    :param columns: Columns to read, all by default. Other columns are skipped by
+                    the CSV, Parquet and Arrow readers and by the JSON column buffers.
+    :param dtypes: Declared column types ('int64', 'float64', 'string'), used by the
+                   JSON reader to decode values straight into typed buffers
+    :return: DataFrame
+    """
+    with stage('read') as metrics:
+        suffix, _ = table_format(file_path)
+        columns = list(columns) if columns is not None else None
+        if suffix in JSON_SUFFIXES:
+            # Numeric strings become numbers, as pd.read_json converts them
+            df = build_frame(
+                iter_json_file(file_path), dtypes, columns, convert_numbers=True
+            )
+        elif suffix == '.csv':
+            with open_text(file_path) as file:
+                df = pd.read_csv(file, usecols=columns)
+        elif suffix == '.parquet':
+            df = pd.read_parquet(file_path, columns=columns)
+        elif suffix in ('.arrow', '.feather'):
+            df = pd.read_feather(file_path, columns=columns)
+        else:
+            df = pd.read_csv(file_path, usecols=columns)
+        metrics.rows_out = len(df)
+    return df
+
+
+def read_mapped(file_path) -> pd.DataFrame:
+    """
+    Open an uncompressed Arrow IPC file memory-mapped. Numeric columns without
+    nulls are read-only views of the mapped pages and strings stay in Arrow memory,
+    so every process reading the file shares one physical copy of it.
+
+    :param file_path: Path to an Arrow IPC file written without compression
+    :return: DataFrame
+    """
+    import pyarrow as pa
+
+    with stage('read') as metrics:
+        # The table keeps the mapping open for as long as its buffers are referenced
+        table = pa.ipc.open_file(pa.memory_map(str(file_path))).read_all()
+        arrow_strings = {
+            pa.string(): pd.StringDtype('pyarrow'),
+            pa.large_string(): pd.StringDtype('pyarrow'),
+        }
+        df = table.to_pandas(split_blocks=True, types_mapper=arrow_strings.get)
+        metrics.rows_out = len(df)
+    return df
+
+
+def iter_table_chunks(file_path, chunksize, dtypes: Optional[Dict[str, str]] = None):
+    """
+    Read a table as a sequence of DataFrames with at most chunksize rows,
+    choosing the reader from the file extension
+
+    :param file_path: Path to a .csv, .json, .ndjson, .parquet or .arrow file;
+                      CSV and JSON files may be compressed (.gz, .zst)
+    :param chunksize: Maximum number of rows per chunk
+    :param dtypes: Declared column types, see read_table
+    :return: Iterator of DataFrames
+    """
+    suffix, _ = table_format(file_path)
+    if suffix in JSON_SUFFIXES:
+        return iter_json_chunks(file_path, chunksize, dtypes)
+    if suffix == '.parquet':
+        return iter_parquet_chunks(file_path, chunksize)
+    if suffix in ('.arrow', '.feather'):
+        return iter_arrow_chunks(file_path, chunksize)
+    return iter_csv_chunks(file_path, chunksize)
+
+
+def iter_csv_chunks(file_path, chunksize, **read_kwargs):
+    """
+    Read a CSV file as a sequence of DataFrames with at most chunksize rows
+
+    :param file_path: Path to the CSV file
+    :param chunksize: Maximum number of rows per chunk
+    :return: Iterator of DataFrames
+    """
+    with (
+        open_text(file_path) as file,
+        pd.read_csv(file, chunksize=chunksize, **read_kwargs) as reader,
+    ):
+        yield from reader
+
+
+def iter_parquet_chunks(file_path, chunksize):
+    """
+    Read a Parquet file as a sequence of DataFrames with at most chunksize rows
+
+    :param file_path: Path to the Parquet file
+    :param chunksize: Maximum number of rows per chunk
+    :return: Iterator of DataFrames
+    """
+    import pyarrow.parquet as pq
+
+    with pq.ParquetFile(file_path) as parquet_file:
+        for batch in parquet_file.iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+
+
+def iter_arrow_chunks(file_path, chunksize):
+    """
+    Read an Arrow IPC file as a sequence of DataFrames with at most chunksize rows
+
+    :param file_path: Path to the Arrow IPC file
+    :param chunksize: Maximum number of rows per chunk
+    :return: Iterator of DataFrames
+    """
+    import pyarrow as pa
+
+    with pa.memory_map(str(file_path)) as source:
+        reader = pa.ipc.open_file(source)
+        for index in range(reader.num_record_batches):
+            batch = reader.get_batch(index)
+            for offset in range(0, batch.num_rows, chunksize):
+                yield batch.slice(offset, chunksize).to_pandas()
+
+
+def iter_json_chunks(file_path, chunksize, dtypes: Optional[Dict[str, str]] = None):
+    """
+    Read a JSON array or NDJSON file of records as a sequence of DataFrames with at
+    most chunksize rows. Records are decoded one at a time, so the whole file is
+    never held in memory.
+
+    :param file_path: Path to the JSON file
+    :param chunksize: Maximum number of rows per chunk
+    :param dtypes: Declared column types, see read_table
+    :return: Iterator of DataFrames
+    """
+    records = iter_json_file(file_path)
+    while True:
+        # Numeric strings become numbers, as in a full read
+        chunk = build_frame(records, dtypes, max_rows=chunksize, convert_numbers=True)
+        if chunk.empty:
+            return
+        yield chunk
+        if len(chunk) < chunksize:
+            return
+
+
+def iter_json_file(file_path) -> Iterator[dict]:
+    """
+    Records of a JSON file: the elements of a top-level array, or
+    one per line for NDJSON
+    """
+    suffix, _ = table_format(file_path)
+    if suffix in ('.ndjson', '.jsonl'):
+        return iter_ndjson_records(file_path)
+    return iter_json_records(file_path)
+
+
+def iter_ndjson_records(file_path) -> Iterator[dict]:
+    """
+    Decode a newline-delimited JSON file one line at a time; blank lines are skipped
+
+    :param file_path: Path to the NDJSON file
+    :return: Iterator of decoded records
+    """
+    with open_text(file_path) as file:
+        for line_number, line in enumerate(file, start=1):
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(
+                        f"Invalid JSON on line {line_number} of {file_path}: {e}"
+                    ) from e
+
+
+class _ColumnBuffer:
+    """
+    Values of one column, decoded into a typed array when the declared type is
+    int64 or float64, so the column never exists as one Python object per value.
+    A value that does not fit the declared type turns the buffer into a list.
+    """
+
+    def __init__(self, declared_type: Optional[str], rows: int):
+        self.typecode = {'int64': 'q', 'float64': 'd'}.get(declared_type)
+        self.missing = array('b')
+        if self.typecode is None:
+            self.values = [None] * rows
+        else:
+            self.values = array(self.typecode, bytes(8 * rows))
+            self.missing.extend([1] * rows)
+
+    def append(self, value):
+        if self.typecode is not None:
+            kind = type(value)
+            if kind is int or (kind is float and self.typecode == 'd'):
+                try:
+                    self.values.append(value)
+                    self.missing.append(0)
+                    return
+                except OverflowError:
+                    pass
+            elif value is None:
+                self.values.append(0)
+                self.missing.append(1)
+                return
+            self._to_list()
+        self.values.append(value)
+
+    def _to_list(self):
+        self.values = [
+            None if missing else value
+            for value, missing in zip(self.values, self.missing)
+        ]
+        self.typecode = None
+
+    def to_array(self, convert_numbers=False):
+        if self.typecode is None:
+            # Inferred the way pd.DataFrame.from_records infers a column
+            values = pd.Series(self.values, dtype=None if self.values else object)
+            if convert_numbers and values.dtype == object:
+                try:
+                    values = pd.to_numeric(values)
+                except (ValueError, TypeError):
+                    pass
+            return values.to_numpy()
+        values = np.frombuffer(
+            self.values, dtype='int64' if self.typecode == 'q' else 'float64'
+        )
+        missing = np.frombuffer(self.missing, dtype=np.int8).astype(bool)
+        if missing.any():
+            # Missing values become NaN, as pandas does for numbers read from JSON
+            values = values.astype('float64')
+            values[missing] = math.nan
+        return values
+
+
+def build_frame(
+    records: Iterable[dict],
+    dtypes: Optional[Dict[str, str]] = None,
+    columns=None,
+    max_rows: Optional[int] = None,
+    convert_numbers=False,
+) -> pd.DataFrame:
+    """
+    Build a DataFrame from decoded records column by column. Values are appended to
+    typed buffers following the declared types as they are decoded, so records are
+    never all held at once. Keys missing from a record give missing values; columns
+    are ordered by first appearance.
+
+    :param dtypes: Declared column types; int64 and float64 columns are decoded into
+                   typed arrays
+    :param columns: Keep only these columns, in this order
+    :param max_rows: Consume at most this many records
+    :param convert_numbers: Convert untyped columns holding only numeric strings to
+                            numbers
+    """
+    dtypes = dtypes or {}
+    wanted = set(columns) if columns is not None else None
+    buffers: Dict[str, _ColumnBuffer] = {}
+    rows = 0
+    for record in records:
+        appended = 0
+        for key, value in record.items():
+            buffer = buffers.get(key)
+            if buffer is None:
+                if wanted is not None and key not in wanted:
+                    continue
+                buffer = buffers[key] = _ColumnBuffer(dtypes.get(key), rows)
+            buffer.append(value)
+            appended += 1
+        rows += 1
+        if appended < len(buffers):
+            # The record lacks some keys
+            for buffer in buffers.values():
+                if len(buffer.values) < rows:
+                    buffer.append(None)
+        if rows == max_rows:
+            break
+
+    if columns is not None and rows:
+        missing = [column for column in columns if column not in buffers]
+        if missing:
+            raise KeyError(f"Columns not found in the records: {missing}")
+    names = (
+        list(buffers)
+        if columns is None
+        else [column for column in columns if column in buffers]
+    )
+    data = {name: buffers[name].to_array(convert_numbers) for name in names}
+    return pd.DataFrame(data, index=pd.RangeIndex(rows))
+
+
+def iter_json_records(file_path, block_size=1 << 16):
+    """
+    Incrementally decode the elements of a top-level JSON array
+
+    :param file_path: Path to the JSON file
+    :param block_size: Number of characters read from the file at a time
+    :return: Iterator of decoded array elements
+    """
+    decoder = json.JSONDecoder()
+    with open_text(file_path) as file:
+        buffer = file.read(block_size)
+        eof = len(buffer) < block_size
+        pos = _skip_whitespace(buffer, 0)
+        if pos >= len(buffer) or buffer[pos] != '[':
+            raise ValueError(f"Expected a JSON array in {file_path}")
+        pos += 1
+
+        while True:
+            pos = _skip_whitespace(buffer, pos, extra=',')
+            if pos < len(buffer) and buffer[pos] == ']':
+                return
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+                # A value ending at the buffer edge may be truncated (e.g. a number)
+                if end < len(buffer) or eof:
+                    yield value
+                    pos = end
+                    continue
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            # Need more data: drop what was consumed and read the next block
+            block = file.read(block_size)
+            eof = len(block) < block_size
+            buffer = buffer[pos:] + block
+            pos = 0
+            if not buffer:
+                raise ValueError(f"Unterminated JSON array in {file_path}")
+
+
+def _skip_whitespace(buffer, pos, extra=''):
+    while pos < len(buffer) and (buffer[pos].isspace() or buffer[pos] in extra):
+        pos += 1
+    return pos
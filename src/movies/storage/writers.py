@@ -0,0 +1,176 @@
+from abc import ABC, abstractmethod
+
+import pandas as pd
+
+
+class TableSink(ABC):
+    """Incremental output opened by a DataFrameWriter; chunks are appended in order"""
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+
+    def write(self, df: pd.DataFrame):
+        """Append a DataFrame chunk to the output"""
+        self._write(df)
+        self.rows += len(df)
+
+    @abstractmethod
+    def _write(self, df: pd.DataFrame):
+        pass
+
+    def close(self):
+        """Flush and close the output"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class NullSink(TableSink):
+    """Sink that counts and discards chunks, for outputs that must not be rewritten"""
+
+    def _write(self, df):
+        pass
+
+
+class DataFrameWriter(ABC):
+    """
+    Abstract base class for layer output formats.
+    Writers persist a whole DataFrame with write() or a stream of chunks with open().
+    """
+
+    extension = None
+
+    @abstractmethod
+    def write(self, df: pd.DataFrame, path):
+        """Write a DataFrame to path, replacing any existing file"""
+
+    @abstractmethod
+    def open(self, path) -> TableSink:
+        """Open path for incremental writes"""
+
+
+class CsvWriter(DataFrameWriter):
+    extension = '.csv'
+
+    def write(self, df, path):
+        df.to_csv(path, index=False)
+
+    def open(self, path):
+        return _CsvSink(path)
+
+
+class _CsvSink(TableSink):
+    def _write(self, df):
+        header = self.rows == 0
+        df.to_csv(self.path, index=False, mode='w' if header else 'a', header=header)
+
+    def close(self):
+        if self.rows == 0:
+            # Nothing was written; leave an empty file rather than a stale one
+            open(self.path, 'w').close()
+
+
+class ParquetWriter(DataFrameWriter):
+    """Typed, compressed columnar output"""
+
+    extension = '.parquet'
+
+    def __init__(self, compression='zstd'):
+        self.compression = compression
+
+    def write(self, df, path):
+        df.to_parquet(path, index=False, compression=self.compression)
+
+    def open(self, path):
+        return _ParquetSink(path, self.compression)
+
+
+class _ParquetSink(TableSink):
+    def __init__(self, path, compression):
+        super().__init__(path)
+        self.compression = compression
+        self._writer = None
+
+    def _write(self, df):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self._writer is None:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            self._schema = table.schema
+            self._writer = pq.ParquetWriter(
+                self.path, self._schema, compression=self.compression
+            )
+        else:
+            # Later chunks must match the schema fixed by the first one
+            table = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+class ArrowIpcWriter(DataFrameWriter):
+    """Arrow IPC (Feather v2) file output"""
+
+    extension = '.arrow'
+
+    def __init__(self, compression='lz4'):
+        self.compression = compression
+
+    def write(self, df, path):
+        with self.open(path) as sink:
+            sink.write(df)
+
+    def open(self, path):
+        return _ArrowIpcSink(path, self.compression)
+
+
+class _ArrowIpcSink(TableSink):
+    def __init__(self, path, compression):
+        super().__init__(path)
+        self.compression = compression
+        self._writer = None
+
+    def _write(self, df):
+        import pyarrow as pa
+
+        if self._writer is None:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            self._schema = table.schema
+            options = pa.ipc.IpcWriteOptions(compression=self.compression)
+            self._writer = pa.ipc.new_file(self.path, self._schema, options=options)
+        else:
+            table = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+WRITERS = {
+    'csv': CsvWriter,
+    'parquet': ParquetWriter,
+    'arrow': ArrowIpcWriter,
+}
+
+
+def get_writer(format_name='csv') -> DataFrameWriter:
+    """
+    Create the writer registered for an output format
+
+    :param format_name: One of the WRITERS keys
+    :return: DataFrameWriter instance
+    """
+    writer_class = WRITERS.get(format_name)
+    if writer_class is None:
+        raise ValueError(
+            f"Unknown output format: {format_name}. Available formats: {list(WRITERS)}"
+        )
+    return writer_class()
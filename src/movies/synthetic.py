@@ -0,0 +1,223 @@
+import argparse
+import json
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.movies.schema.schema_registry import get_shared_registry
+
+# Bronze columns holding the join key and the release year of a title
+KEY_COLUMNS = ('title', 'movie_title', 'film_name')
+YEAR_COLUMNS = ('year', 'release_year', 'year_of_release')
+# Integer ranges by column name suffix, the last entry being the default
+INT_RANGES = (
+    ('_percentage', 0, 101),
+    ('_usd', 100_000, 500_000_000),
+    ('', 0, 5_000_000),
+)
+FIRST_YEAR, YEARS = 1950, 76
+CHUNK_ROWS = 500_000
+
+
+@dataclass(frozen=True)
+class SourceSpec:
+    """A provider file, generated from the columns of its bronze schema"""
+
+    key: str  # dotted source key of the config
+    provider: str  # bronze schema provider
+    file_name: str  # '{date}' is replaced by the partition date
+    group: str  # files of one group describe the same titles
+    drop: Tuple[str, ...] = ()  # schema columns absent from this file
+    # Columns not in the schema, with their dtypes
+    extra: Dict[str, str] = field(default_factory=dict)
+
+
+SOURCES = (
+    SourceSpec(
+        'audience_pulse',
+        'bronze/audience_pulse',
+        'audience_pulse/{date}_provider2.json',
+        'audience_pulse',
+    ),
+    SourceSpec(
+        'critic_agg',
+        'bronze/critic_agg',
+        'critic_agg/{date}_provider1.csv',
+        'critic_agg',
+    ),
+    SourceSpec(
+        'box_office.domestic',
+        'bronze/box_office',
+        'box_office_metrics/{date}_provider3_domestic.csv',
+        'box_office',
+    ),
+    SourceSpec(
+        'box_office.financials',
+        'bronze/box_office',
+        'box_office_metrics/{date}_provider3_financials.csv',
+        'box_office',
+        drop=('box_office_gross_usd',),
+        extra={'production_budget_usd': 'int64', 'marketing_spend_usd': 'int64'},
+    ),
+    SourceSpec(
+        'box_office.international',
+        'bronze/box_office',
+        'box_office_metrics/{date}_provider3_international.csv',
+        'box_office',
+    ),
+)
+
+
+def title_ids(group_index: int, rows: int, overlap: float) -> np.ndarray:
+    """
+    Title ids of one provider group: the first rows * overlap ids are shared by
+    every group, the others are unique to the group
+    """
+    shared = int(rows * overlap)
+    unique_start = shared + group_index * (rows - shared)
+    return np.concatenate(
+        [np.arange(shared), np.arange(unique_start, unique_start + rows - shared)]
+    )
+
+
+def generate_column(
+    name: str, dtype: str, ids: np.ndarray, rng: np.random.Generator
+) -> np.ndarray:
+    """Values of one column for the given title ids"""
+    if name in KEY_COLUMNS:
+        return np.char.add('Movie ', ids.astype(str)).astype(object)
+    if name in YEAR_COLUMNS:
+        # A title has the same year in every provider
+        years = FIRST_YEAR + ids % YEARS
+        return years.astype(str).astype(object) if dtype == 'string' else years
+    if dtype == 'int64':
+        low, high = next(
+            (low, high) for suffix, low, high in INT_RANGES if name.endswith(suffix)
+        )
+        return rng.integers(low, high, size=len(ids))
+    if dtype == 'float64':
+        return rng.uniform(0, 10, size=len(ids)).round(1)
+    return np.char.add(
+        f'{name} ', rng.integers(0, 1000, size=len(ids)).astype(str)
+    ).astype(object)
+
+
+def source_columns(spec: SourceSpec, registry) -> Dict[str, str]:
+    """Column dtypes of a generated file: its bronze v1 schema, adjusted for the file"""
+    schema = registry.get_schema(spec.provider, 'v1')
+    if schema is None:
+        raise ValueError(f"No v1 schema for {spec.provider}")
+    columns = {
+        name: dtype for name, dtype in schema.schema.items() if name not in spec.drop
+    }
+    columns.update(spec.extra)
+    return columns
+
+
+def _write_chunk(df: pd.DataFrame, path: Path, first: bool, last: bool):
+    if path.suffix == '.json':
+        records = df.to_json(orient='records')[1:-1]
+        with open(path, 'w' if first else 'a') as file:
+            file.write(('[' if first else ',') + records + (']' if last else ''))
+    else:
+        df.to_csv(path, mode='w' if first else 'a', header=first, index=False)
+
+
+def generate(
+    output_dir,
+    rows: int,
+    overlap: float = 0.8,
+    seed: int = 0,
+    date: str = '20250101',
+    overlaps: Optional[Dict[str, float]] = None,
+    registry=None,
+) -> Dict[str, str]:
+    """
+    Write one synthetic drop of every provider. The same arguments always
+    produce the same files.
+
+    :param output_dir: Directory receiving one sub-directory per provider
+    :param rows: Rows per file
+    :param overlap: Fraction of each provider's titles present in every provider
+    :param overlaps: Overlap per provider group ('audience_pulse', 'critic_agg',
+                     'box_office')
+    :return: Path of every generated file by dotted source key, for the source
+             section of a config
+    """
+    if not 0 <= overlap <= 1:
+        raise ValueError(f"Overlap must be between 0 and 1, got {overlap}")
+    registry = registry if registry is not None else get_shared_registry()
+    groups = list(dict.fromkeys(spec.group for spec in SOURCES))
+    overlaps = overlaps or {}
+
+    paths = {}
+    for spec_index, spec in enumerate(SOURCES):
+        group_index = groups.index(spec.group)
+        ids = title_ids(group_index, rows, overlaps.get(spec.group, overlap))
+        # Shuffled per group, so the files of a group list titles in the same order
+        ids = np.random.default_rng([seed, group_index]).permutation(ids)
+        rng = np.random.default_rng([seed, group_index, spec_index])
+        columns = source_columns(spec, registry)
+
+        path = Path(output_dir) / spec.file_name.format(date=date)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        starts = range(0, max(rows, 1), CHUNK_ROWS)
+        for start in starts:
+            chunk_ids = ids[start : start + CHUNK_ROWS]
+            df = pd.DataFrame(
+                {
+                    name: generate_column(name, dtype, chunk_ids, rng)
+                    for name, dtype in columns.items()
+                }
+            )
+            _write_chunk(df, path, first=start == 0, last=start == starts[-1])
+        paths[spec.key] = str(path)
+        logging.info(f"✓ Generated {path} ({rows} rows)")
+    return paths
+
+
+def source_config(paths: Dict[str, str]) -> dict:
+    """
+    Nest generated paths by dotted source key, as in the source section of a config
+    """
+    source = {}
+    for key, path in paths.items():
+        *parents, name = key.split('.')
+        section = source
+        for parent in parents:
+            section = section.setdefault(parent, {})
+        section[name] = path
+    return source
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    parser = argparse.ArgumentParser(
+        description='Generate synthetic provider drops from the bronze schemas'
+    )
+    parser.add_argument(
+        'output_dir', type=str, help='Directory receiving the generated files'
+    )
+    parser.add_argument('--rows', type=int, default=10_000, help='Rows per file')
+    parser.add_argument(
+        '--overlap',
+        type=float,
+        default=0.8,
+        help='Fraction of titles shared by every provider',
+    )
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    parser.add_argument(
+        '--date', type=str, default='20250101', help='Partition date of the drop'
+    )
+    args = parser.parse_args()
+
+    generated = generate(
+        args.output_dir, args.rows, overlap=args.overlap, seed=args.seed, date=args.date
+    )
+    print(json.dumps({'source': source_config(generated)}, indent=2))
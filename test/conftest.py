@@ -0,0 +1,60 @@
+import shutil
+
+import pytest
+
+LAYERS = ('bronze', 'silver', 'gold')
+DROPS = {
+    'audience_pulse': 'src/movies/data/audience_pulse/20251022_provider2.json',
+    'critic_agg': 'src/movies/data/critic_agg/20251022_provider1.csv',
+    'box_office_domestic': 'src/movies/data/box_office_metrics/20251022_provider3_domestic.csv',
+    'box_office_financials': 'src/movies/data/box_office_metrics/20251022_provider3_financials.csv',
+    'box_office_international': 'src/movies/data/box_office_metrics/20251022_provider3_international.csv',
+}
+
+
+def _output(tmp_path):
+    output = {layer: str(tmp_path / layer) for layer in LAYERS}
+    for directory in output.values():
+        (tmp_path / directory).mkdir()
+    return output
+
+
+@pytest.fixture
+def config(tmp_path):
+    """Pipeline config reading the test provider files, with every layer under tmp_path"""
+    return {
+        'source': {
+            'audience_pulse': 'test/data/audience_pulse/test_provider2.json',
+            'critic_agg': 'test/data/critic_agg/test_provider1.csv',
+            'box_office': {
+                'domestic': 'test/data/box_office_metrics/test_provider3_domestic.csv',
+                'financials': 'test/data/box_office_metrics/test_provider3_financials.csv',
+                'international': 'test/data/box_office_metrics/test_provider3_international.csv',
+            },
+        },
+        'output': _output(tmp_path),
+    }
+
+
+@pytest.fixture
+def partitioned_config(tmp_path):
+    """
+    Pipeline config reading dated drops: the 20251022 provider files are copied to
+    tmp_path/data as 20251022_<source>.<ext> and each source is a glob over its drops
+    """
+    data = tmp_path / 'data'
+    data.mkdir()
+    for name, path in DROPS.items():
+        shutil.copyfile(path, data / f"20251022_{name}{path[path.rindex('.'):]}")
+    return {
+        'source': {
+            'audience_pulse': str(data / '*_audience_pulse.json'),
+            'critic_agg': str(data / '*_critic_agg.csv'),
+            'box_office': {
+                'domestic': str(data / '*_box_office_domestic.csv'),
+                'financials': str(data / '*_box_office_financials.csv'),
+                'international': str(data / '*_box_office_international.csv'),
+            },
+        },
+        'output': _output(tmp_path),
+    }
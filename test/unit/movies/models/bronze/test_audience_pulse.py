@@ -35,3 +35,13 @@ class TestAudiencePulse:
         assert first_row['year'] == 2020
         assert first_row['audience_average_score'] == 8.5
         assert first_row['total_audience_ratings'] == 500000
+
+    def test_chunked_mode_streams_all_rows(self, test_file_path):
+        """Test that chunked mode yields every record in bounded chunks"""
+        audience_pulse = AudiencePulse(test_file_path, chunksize=1)
+        assert audience_pulse.is_streaming
+
+        chunks = list(audience_pulse.iter_chunks())
+        assert [len(chunk) for chunk in chunks] == [1, 1]
+        assert list(chunks[0].columns) == list(AudiencePulse(test_file_path).df.columns)
+        assert chunks[1].iloc[0]['title'] == 'Test Movie B'
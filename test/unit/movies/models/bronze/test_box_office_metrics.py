@@ -76,3 +76,20 @@ class TestBoxOfficeMetrics:
         assert first_row['year_of_release'] == 2020
         assert first_row['production_budget_usd'] == 150000000
         assert first_row['marketing_spend_usd'] == 80000000
+
+    def test_pushdown_reads_used_columns_and_shared_titles(self, tmp_path):
+        """Test that projected reads keep the requested columns and the semi-join drops unmatched titles"""
+        domestic = tmp_path / 'domestic.csv'
+        domestic.write_text("film_name,year_of_release,box_office_gross_usd\nTest Film A,2020,1\nOnly Here,2021,2\n")
+        model = BoxOfficeMetrics(
+            str(domestic),
+            "test/data/box_office_metrics/test_provider3_financials.csv",
+            "test/data/box_office_metrics/test_provider3_international.csv",
+            columns={'box_office_financials': ['film_name', 'marketing_spend_usd']},
+            semi_join_key='film_name',
+        )
+
+        assert list(model.financials_df.columns) == ['film_name', 'marketing_spend_usd']
+        assert list(model.international_df.columns) == ['film_name', 'year_of_release', 'box_office_gross_usd']
+        assert model.domestic_df['film_name'].tolist() == ['Test Film A']
+        assert model.financials_df['film_name'].tolist() == ['Test Film A']
@@ -2,6 +2,7 @@ import pytest
 import pandas as pd
 
 from src.movies.models.bronze.critic_agg import CriticAgg
+from src.movies.schema.schema_registry import SchemaRegistry, get_shared_registry
 
 
 class TestCriticAgg:
@@ -35,3 +36,32 @@ class TestCriticAgg:
         assert first_row['movie_title'] == 'my_film_test_1'
         assert first_row['release_year'] == 1998
         assert first_row['critic_score_percentage'] == 12
+
+    def test_uses_shared_registry_by_default(self, critic_agg):
+        """Test that models share the process-wide registry"""
+        assert critic_agg.registry is get_shared_registry()
+
+    def test_injected_registry(self, test_file_path):
+        """Test that a registry passed to the constructor is used"""
+        registry = SchemaRegistry()
+        critic_agg = CriticAgg(test_file_path, registry=registry)
+        assert critic_agg.registry is registry
+
+    def test_chunked_mode_streams_all_rows(self, test_file_path):
+        """Test that chunked mode yields the same rows as a full read"""
+        critic_agg = CriticAgg(test_file_path, chunksize=1)
+        assert critic_agg.is_streaming
+        assert critic_agg.df is None
+
+        chunks = list(critic_agg.iter_chunks())
+        assert all(len(chunk) <= 1 for chunk in chunks)
+        pd.testing.assert_frame_equal(
+            pd.concat(chunks, ignore_index=True), CriticAgg(test_file_path).df
+        )
+
+    def test_chunked_mode_validates_first_chunk(self, tmp_path):
+        """Test that a schema mismatch is raised before any chunk is consumed"""
+        path = tmp_path / 'bad.csv'
+        pd.DataFrame({'unexpected': [1, 2]}).to_csv(path, index=False)
+        with pytest.raises(ValueError):
+            CriticAgg(str(path), version='v1', chunksize=1)
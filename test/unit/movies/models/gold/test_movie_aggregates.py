@@ -0,0 +1,140 @@
+import pytest
+import numpy as np
+import pandas as pd
+from src.movies.models.gold.movie_aggregates import MovieAggregates
+from src.movies.schema.schema_registry import SchemaRegistry
+
+
+class TestMovieAggregates:
+    @pytest.fixture
+    def registry(self):
+        return SchemaRegistry()
+
+    @pytest.fixture
+    def unified_df(self):
+        """Unified movies with missing scores, box office figures and release years"""
+        rng = np.random.default_rng(0)
+        rows = 200
+        df = pd.DataFrame(
+            {
+                'movie_title': [f'Movie {i:03d}' for i in range(rows)],
+                'audience_release_year': rng.integers(2000, 2010, rows).astype(float),
+                'audience_score_percentage': rng.integers(0, 100, rows).astype(float),
+                'critic_release_year': rng.integers(2000, 2010, rows).astype(float),
+                'critic_score_percentage': rng.integers(0, 100, rows).astype(float),
+                'release_year': rng.integers(2000, 2010, rows).astype(float),
+                'total_box_office_gross_usd': rng.uniform(1e6, 1e9, rows),
+                'production_budget_usd': rng.uniform(1e6, 3e8, rows),
+                'marketing_spend_usd': rng.uniform(0, 1e8, rows),
+            }
+        )
+        df.loc[::7, 'release_year'] = np.nan
+        df.loc[
+            ::11,
+            [
+                'total_box_office_gross_usd',
+                'production_budget_usd',
+                'marketing_spend_usd',
+            ],
+        ] = np.nan
+        df.loc[::5, 'critic_score_percentage'] = np.nan
+        return df
+
+    def test_roi_by_year(self, unified_df, registry):
+        """Test that the yearly ROI matches a groupby of the films with a box office"""
+        report = MovieAggregates.build([unified_df], registry=registry).roi_by_year
+
+        year = unified_df['release_year'].fillna(unified_df['critic_release_year'])
+        cost = unified_df['production_budget_usd'] + unified_df['marketing_spend_usd']
+        financed = unified_df.assign(year=year, cost=cost).dropna(
+            subset=['cost', 'total_box_office_gross_usd']
+        )
+        expected = financed.groupby('year').agg(
+            films=('cost', 'size'),
+            gross=('total_box_office_gross_usd', 'sum'),
+            cost=('cost', 'sum'),
+        )
+        assert report['release_year'].tolist() == expected.index.astype(int).tolist()
+        assert report['films'].tolist() == expected['films'].tolist()
+        np.testing.assert_allclose(
+            report['roi'], (expected['gross'] - expected['cost']) / expected['cost']
+        )
+
+    def test_correlation_matches_pandas(self, unified_df, registry):
+        """
+        Test that the correlations from the yearly statistics equal
+        pandas' Pearson correlation
+        """
+        report = MovieAggregates.build(
+            [unified_df], registry=registry
+        ).score_gross_correlation.set_index('score')
+
+        for column in ('critic_score_percentage', 'audience_score_percentage'):
+            expected = unified_df[column].corr(unified_df['total_box_office_gross_usd'])
+            assert report.loc[column, 'pearson_r'] == pytest.approx(expected, rel=1e-9)
+        assert (
+            report.loc['critic_score_percentage', 'films']
+            == unified_df[['critic_score_percentage', 'total_box_office_gross_usd']]
+            .dropna()
+            .shape[0]
+        )
+
+    def test_top_budget_efficiency(self, unified_df, registry):
+        """Test that the top films by gross per budget dollar are listed best first"""
+        top = MovieAggregates.build(
+            [unified_df], registry=registry
+        ).top_budget_efficiency
+
+        efficiency = (
+            unified_df['total_box_office_gross_usd']
+            / unified_df['production_budget_usd']
+        )
+        expected = unified_df.loc[
+            efficiency.nlargest(MovieAggregates.top_n).index, 'movie_title'
+        ]
+        assert top['movie_title'].tolist() == expected.tolist()
+
+    def test_top_budget_efficiency_skips_missing(self, unified_df, registry):
+        """Test that with fewer valued films than top_n the report lists only those"""
+        unified_df.loc[3:, 'production_budget_usd'] = np.nan
+
+        top = MovieAggregates.build(
+            [unified_df], registry=registry
+        ).top_budget_efficiency
+
+        assert sorted(top['movie_title']) == [
+            'Movie 001',
+            'Movie 002',
+        ]  # Movie 000 has no box office
+        assert top['budget_efficiency'].notna().all()
+
+    def test_refresh_equals_full_build(self, unified_df, registry):
+        """
+        Test that refreshing changed titles gives the same reports
+        as rebuilding everything
+        """
+        previous = MovieAggregates.build([unified_df], registry=registry)
+        changed = unified_df.iloc[[3, 50, 120]].copy()
+        changed['release_year'] = [2003.0, np.nan, 2031.0]  # moved, lost and new group
+        changed['total_box_office_gross_usd'] *= 10
+        new_film = unified_df.iloc[[0]].assign(
+            movie_title='New Film', release_year=2005.0
+        )
+        changed = pd.concat([changed, new_film], ignore_index=True)
+
+        refreshed = MovieAggregates.refresh(
+            previous.base, previous.statistics, changed, registry=registry
+        )
+
+        updated = pd.concat(
+            [
+                unified_df[~unified_df['movie_title'].isin(changed['movie_title'])],
+                changed,
+            ]
+        )
+        rebuilt = MovieAggregates.build([updated], registry=registry)
+        for attribute in MovieAggregates.outputs.values():
+            pd.testing.assert_frame_equal(
+                getattr(refreshed, attribute), getattr(rebuilt, attribute)
+            )
+        assert 2031 in refreshed.roi_by_year['release_year'].tolist()
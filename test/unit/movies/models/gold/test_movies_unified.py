@@ -66,7 +66,15 @@ class TestMoviesUnified:
         movies_unified = MoviesUnified(mock_audience_pulse, mock_critic_agg, mock_box_office_metrics)
         actual_df = movies_unified.df
 
-        expected_df = pd.read_csv('test/data/movies_unified/expected_gold_output.csv')
+        # Integer columns stay nullable integers where the outer join leaves gaps
+        integers = [
+            'audience_release_year', 'total_audience_ratings', 'critic_release_year', 'critic_score_percentage',
+            'total_critic_reviews_counted', 'release_year', 'total_box_office_gross_usd', 'production_budget_usd',
+            'marketing_spend_usd',
+        ]
+        expected_df = pd.read_csv(
+            'test/data/movies_unified/expected_gold_output.csv', dtype={column: 'Int64' for column in integers}
+        )
 
         pd.testing.assert_frame_equal(actual_df, expected_df)
 
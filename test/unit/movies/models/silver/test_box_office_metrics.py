@@ -97,3 +97,14 @@ class TestBoxOfficeMetrics:
 
         pd.testing.assert_frame_equal(result_df, expected_df)
 
+
+    def test_unused_columns_and_unmatched_titles_are_ignored(self, box_office_metrics, domestic_df, financials_df, international_df):
+        """Test that extra columns and titles missing from one file leave the result unchanged"""
+        domestic_df = pd.concat([domestic_df, pd.DataFrame({
+            'film_name': ['Domestic Only'], 'year_of_release': [2022], 'box_office_gross_usd': [1]
+        })], ignore_index=True)
+        financials_df = financials_df.assign(distributor='Studio')
+
+        wide = BoxOfficeMetrics(domestic_df, financials_df, international_df)
+
+        pd.testing.assert_frame_equal(wide.df, box_office_metrics.df)
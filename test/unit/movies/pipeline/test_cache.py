@@ -0,0 +1,197 @@
+import shutil
+
+import pytest
+import pandas as pd
+from src.movies.pipeline import cache
+from src.movies.pipeline.cache import StageCache, code_version
+from src.movies.pipeline.graph import PipelineGraph
+from src.movies.pipeline.scheduler import Scheduler
+
+
+class TestStageCache:
+    @pytest.fixture
+    def cache(self, tmp_path):
+        return StageCache(tmp_path / 'cache')
+
+    def test_from_config(self, tmp_path):
+        """Test that the cache is only created when configured and enabled"""
+        assert StageCache.from_config({}) is None
+        assert (
+            StageCache.from_config({'cache': {'enabled': False, 'dir': str(tmp_path)}})
+            is None
+        )
+        assert (
+            StageCache.from_config({'cache': {'dir': str(tmp_path)}}).cache_dir
+            == tmp_path
+        )
+
+    def test_file_hash_follows_content(self, cache, tmp_path):
+        """Test that file hashes change with the content and persist across instances"""
+        path = tmp_path / 'input.csv'
+        path.write_text('a\n1\n')
+        first = cache.file_hash(path)
+        cache.flush()
+        assert StageCache(cache.cache_dir).file_hash(path) == first
+
+        path.write_text('a\n2\n')
+        assert cache.file_hash(path) != first
+
+    def test_store_and_restore(self, cache, tmp_path):
+        """Test that a stored entry is copied back to the requested paths"""
+        output = tmp_path / 'out.csv'
+        output.write_text('a\n1\n')
+        cache.store('key', [('silver/table', str(output), 1)])
+        output.unlink()
+
+        assert cache.restore('missing', {'silver/table': str(output)}) is None
+        restored = cache.restore('key', {'silver/table': str(output)})
+
+        assert restored == [('silver/table', str(output), 1)]
+        assert output.read_text() == 'a\n1\n'
+
+
+class TestSchedulerCache:
+    @pytest.fixture
+    def graph(self):
+        return PipelineGraph.discover()
+
+    @pytest.fixture
+    def config(self, config, tmp_path):
+        """The shared config with a cache and a critic file the tests can edit"""
+        critic_path = tmp_path / 'critic.csv'
+        shutil.copyfile(config['source']['critic_agg'], critic_path)
+        config['source']['critic_agg'] = str(critic_path)
+        config['cache'] = {'dir': str(tmp_path / 'cache')}
+        return config
+
+    @pytest.fixture
+    def edit_module(self, monkeypatch):
+        """Make the cache see an edited source for the given modules"""
+        module_source = cache.module_source
+
+        def edit(*module_names):
+            monkeypatch.setattr(
+                cache,
+                'module_source',
+                lambda name: module_source(name)
+                + (b'\n# edited\n' if name in module_names else b''),
+            )
+            code_version.cache_clear()
+
+        yield edit
+        code_version.cache_clear()
+
+    @staticmethod
+    def cached(scheduler, tasks):
+        return {
+            name
+            for name, key in scheduler.cache_keys(tasks).items()
+            if scheduler.cache.lookup(key)
+        }
+
+    def test_second_run_restores_everything(self, graph, config):
+        """
+        Test that an unchanged run is restored from the cache with the same outputs
+        """
+        first = Scheduler(graph, config).run()
+        scheduler = Scheduler(graph, config)
+        tasks = scheduler.plan()
+        assert self.cached(scheduler, tasks) == {task.name for task in tasks}
+
+        artefacts = scheduler.run()
+        assert artefacts == {}
+        pd.testing.assert_frame_equal(
+            pd.read_csv(f"{config['output']['gold']}/movies_unified.csv"),
+            first['gold/movies_unified'],
+            check_dtype=False,
+        )
+
+    def test_changed_source_invalidates_downstream(self, graph, config):
+        """Test that changing one provider's file only reruns that provider and gold"""
+        Scheduler(graph, config).run()
+        with open(config['source']['critic_agg'], 'a') as file:
+            file.write('Extra Movie,2020,80,7.0,50\n')
+
+        scheduler = Scheduler(graph, config)
+        tasks = scheduler.plan()
+        misses = {task.name for task in tasks} - self.cached(scheduler, tasks)
+        assert misses == {
+            'bronze/critic_agg',
+            'silver/critic_agg',
+            'gold/movies_unified',
+            'gold/movie_aggregates',
+        }
+
+    def test_schema_change_invalidates_provider(self, graph, config, monkeypatch):
+        """Test that a different schema hash for a provider changes its key"""
+        scheduler = Scheduler(graph, config)
+        tasks = scheduler.plan()
+        before = scheduler.cache_keys(tasks)
+
+        schema_hash = scheduler.registry.schema_hash
+        monkeypatch.setattr(
+            scheduler.registry,
+            'schema_hash',
+            lambda provider: (
+                'changed'
+                if provider == 'silver/audience_pulse'
+                else schema_hash(provider)
+            ),
+        )
+        after = scheduler.cache_keys(tasks)
+
+        changed = {name for name in before if before[name] != after[name]}
+        assert changed == {
+            'silver/audience_pulse',
+            'gold/movies_unified',
+            'gold/movie_aggregates',
+        }
+
+    def test_dtype_mode_invalidates_every_stage(self, graph, config):
+        """Test that switching the dtype policy misses the cache for every stage"""
+        scheduler = Scheduler(graph, config)
+        tasks = scheduler.plan()
+        before = scheduler.cache_keys(tasks)
+
+        config['dtypes'] = {'mode': 'compact'}
+        after = Scheduler(graph, config).cache_keys(tasks)
+        assert all(before[name] != after[name] for name in before)
+
+    def test_validation_mode_invalidates_bronze(self, graph, config):
+        """
+        Test that a stricter validation policy reruns bronze, which reruns its consumers
+        """
+        scheduler = Scheduler(graph, config)
+        tasks = scheduler.plan()
+        before = scheduler.cache_keys(tasks)
+
+        config['validation'] = {'mode': 'strict'}
+        after = Scheduler(graph, config).cache_keys(tasks)
+        assert all(before[name] != after[name] for name in before)
+
+    def test_imported_module_edit_invalidates_stages(self, graph, config, edit_module):
+        """Test that editing a module the models only import changes their keys"""
+        scheduler = Scheduler(graph, config)
+        tasks = scheduler.plan()
+        before = scheduler.cache_keys(tasks)
+
+        edit_module('src.movies.schema.dtypes')
+        after = scheduler.cache_keys(tasks)
+        assert all(before[name] != after[name] for name in before)
+
+    def test_join_engine_edit_invalidates_joining_stages(
+        self, graph, config, edit_module
+    ):
+        """Test that editing the join engine reruns the stages that join, and gold"""
+        scheduler = Scheduler(graph, config)
+        Scheduler(graph, config).run()
+
+        edit_module('src.movies.joins')
+        tasks = scheduler.plan()
+        misses = {task.name for task in tasks} - self.cached(scheduler, tasks)
+        assert misses == {
+            'bronze/box_office_metrics',
+            'silver/box_office_metrics',
+            'gold/movies_unified',
+            'gold/movie_aggregates',
+        }
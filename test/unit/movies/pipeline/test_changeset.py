@@ -0,0 +1,184 @@
+from pathlib import Path
+
+import pytest
+import numpy as np
+import pandas as pd
+from src.movies.pipeline.changeset import (
+    DELETE,
+    INSERT,
+    OP_COLUMN,
+    UPDATE,
+    ChangesetSettings,
+    compute_changeset,
+    row_hashes,
+    write_changeset,
+)
+from src.movies.pipeline.graph import PipelineGraph
+from src.movies.pipeline.scheduler import Scheduler
+
+
+class TestChangeset:
+    @pytest.fixture
+    def config(self, config):
+        config['changeset'] = {'enabled': True}
+        return config
+
+    @pytest.fixture
+    def table(self):
+        return pd.DataFrame(
+            {
+                'movie_title': ['Alien', 'Dune', 'Heat'],
+                'rating': [8.5, 8.0, np.nan],
+                'votes': pd.array([10, 20, None], dtype='Int64'),
+            }
+        )
+
+    def test_settings_from_config(self, config, tmp_path):
+        """
+        Test that capture is off without a changeset section, and writes
+        under gold by default
+        """
+        assert not ChangesetSettings.from_config({}).enabled
+        settings = ChangesetSettings.from_config(config)
+        assert settings.enabled and settings.snapshot
+        assert settings.directory(config) == tmp_path / 'gold' / '_changes'
+
+    def test_row_hashes_ignore_dtypes(self, table):
+        """Test that a row hashes the same whatever the dtypes it is held in"""
+        read_back = table.astype({'movie_title': 'string[pyarrow]', 'votes': 'float64'})
+
+        pd.testing.assert_series_equal(
+            row_hashes(table, 'movie_title'), row_hashes(read_back, 'movie_title')
+        )
+        assert row_hashes(table, 'movie_title').is_unique
+
+    def test_row_hashes_need_unique_key(self, table):
+        """Test that a duplicated key is rejected"""
+        with pytest.raises(ValueError):
+            row_hashes(pd.concat([table, table.head(1)]), 'movie_title')
+
+    def test_first_changeset_inserts_everything(self, config, table):
+        """Test that without a previous materialisation every row is an insert"""
+        changeset = compute_changeset(
+            config, 'gold/movies_unified', table, 'movie_title'
+        )
+
+        assert changeset.changes[OP_COLUMN].tolist() == [INSERT] * 3
+        assert list(changeset.changes.columns) == [
+            OP_COLUMN,
+            'movie_title',
+            'rating',
+            'votes',
+        ]
+
+    def test_inserts_updates_deletes(self, config, table):
+        """
+        Test that the changeset against the stored hashes holds only the changed rows
+        """
+        write_changeset(
+            config,
+            compute_changeset(config, 'gold/movies_unified', table, 'movie_title'),
+        )
+        new = pd.DataFrame(
+            {
+                'movie_title': ['Alien', 'Dune', 'Up'],
+                'rating': [8.5, 8.1, 7.0],
+                'votes': pd.array([10, 20, 5], dtype='Int64'),
+            }
+        )
+
+        changeset = compute_changeset(config, 'gold/movies_unified', new, 'movie_title')
+        path = write_changeset(config, changeset)
+
+        written = pd.read_csv(path)
+        assert written[[OP_COLUMN, 'movie_title']].values.tolist() == [
+            [UPDATE, 'Dune'],
+            [INSERT, 'Up'],
+            [DELETE, 'Heat'],
+        ]
+        assert written.loc[0, 'rating'] == 8.1
+        assert written.loc[2, ['rating', 'votes']].isna().all()
+        assert changeset.changes['votes'].dtype == 'Int64'
+
+    def test_deletes_keep_integer_columns(self, config, table):
+        """
+        Test that deleted rows leave numpy integer columns as nullable
+        integers, not floats
+        """
+        table = table.assign(votes=[10, 20, 30])
+        write_changeset(
+            config,
+            compute_changeset(config, 'gold/movies_unified', table, 'movie_title'),
+        )
+
+        changes = compute_changeset(
+            config, 'gold/movies_unified', table.head(2), 'movie_title'
+        ).changes
+        assert changes[OP_COLUMN].tolist() == [DELETE]
+        assert changes['votes'].dtype == 'Int64' and changes['votes'].isna().all()
+        updated = table.assign(votes=[10, 21, 30])
+        assert (
+            compute_changeset(config, 'gold/movies_unified', updated, 'movie_title')
+            .changes['votes']
+            .dtype
+            == 'int64'
+        )
+
+    def test_unchanged_table_writes_no_changeset(self, config, table):
+        """Test that an unchanged table writes no file but keeps its state"""
+        write_changeset(
+            config,
+            compute_changeset(config, 'gold/movies_unified', table, 'movie_title'),
+        )
+        changeset = compute_changeset(
+            config, 'gold/movies_unified', table.copy(), 'movie_title'
+        )
+
+        assert changeset.changes.empty
+        assert write_changeset(config, changeset) is None
+        assert (
+            len(
+                list(
+                    (
+                        Path(config['output']['gold']) / '_changes' / 'movies_unified'
+                    ).iterdir()
+                )
+            )
+            == 1
+        )
+
+    def test_previous_snapshot_bootstraps_state(self, config, table, tmp_path):
+        """
+        Test that a snapshot written before capture was enabled is the
+        first comparison base
+        """
+        table.to_csv(tmp_path / 'gold' / 'movies_unified.csv', index=False)
+
+        changeset = compute_changeset(
+            config,
+            'gold/movies_unified',
+            table.assign(rating=[8.5, 8.0, 6.0]),
+            'movie_title',
+        )
+
+        assert changeset.changes[[OP_COLUMN, 'movie_title']].values.tolist() == [
+            [UPDATE, 'Heat']
+        ]
+
+    def test_scheduler_writes_only_changesets(self, config, tmp_path):
+        """Test that gold writes its changeset and no snapshot when snapshot is off"""
+        config['changeset']['snapshot'] = False
+        graph = PipelineGraph.discover()
+
+        gold = Scheduler(graph, config).run()['gold/movies_unified']
+        Scheduler(graph, config).run()
+
+        assert not (tmp_path / 'gold' / 'movies_unified.csv').exists()
+        changesets = sorted(
+            (tmp_path / 'gold' / '_changes' / 'movies_unified').iterdir()
+        )
+        assert len(changesets) == 1  # the second run changed nothing
+        assert (
+            pd.read_csv(changesets[0])['movie_title'].tolist()
+            == gold['movie_title'].tolist()
+        )
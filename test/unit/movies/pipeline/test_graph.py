@@ -0,0 +1,128 @@
+import subprocess
+import sys
+
+import pytest
+from src.movies.pipeline.graph import Node, PipelineGraph, discover_nodes
+
+
+class TestPipelineGraph:
+    @pytest.fixture
+    def graph(self):
+        return PipelineGraph.discover()
+
+    def test_discovers_all_models(self, graph):
+        """Test that every bronze, silver and gold model becomes a node"""
+        assert graph.order == [
+            'bronze/audience_pulse',
+            'bronze/box_office_metrics',
+            'bronze/critic_agg',
+            'silver/audience_pulse',
+            'silver/box_office_metrics',
+            'silver/critic_agg',
+            'gold/movies_unified',
+            'gold/movie_aggregates',
+        ]
+
+    def test_dependencies_follow_declared_inputs(self, graph):
+        """Test that nodes depend only on the producers of their inputs"""
+        assert graph.upstream('silver/box_office_metrics') == [
+            'bronze/box_office_metrics'
+        ]
+        assert graph.upstream('silver/critic_agg') == ['bronze/critic_agg']
+        assert graph.upstream('gold/movies_unified') == [
+            'silver/audience_pulse',
+            'silver/box_office_metrics',
+            'silver/critic_agg',
+        ]
+        assert graph.upstream('gold/movie_aggregates') == ['gold/movies_unified']
+
+    def test_select_only(self, graph):
+        """Test that only selects exactly the given node"""
+        assert graph.select(only=['silver/critic_agg']) == ['silver/critic_agg']
+
+    def test_select_from(self, graph):
+        """Test that start selects the node and everything downstream"""
+        assert graph.select(start=['bronze/critic_agg']) == [
+            'bronze/critic_agg',
+            'silver/critic_agg',
+            'gold/movies_unified',
+            'gold/movie_aggregates',
+        ]
+
+    def test_select_layer(self, graph):
+        """Test that a layer name selects every node of the layer"""
+        assert graph.select(only=['silver']) == [
+            'silver/audience_pulse',
+            'silver/box_office_metrics',
+            'silver/critic_agg',
+        ]
+
+    def test_select_unknown_target(self, graph):
+        """Test that an unknown target is rejected"""
+        with pytest.raises(ValueError):
+            graph.select(only=['silver/unknown'])
+
+    def test_cycle_is_rejected(self):
+        """Test that cyclic declarations are reported"""
+
+        class First:
+            inputs = ('silver/second',)
+            outputs = {'first': 'df'}
+
+        class Second:
+            inputs = ('silver/first',)
+            outputs = {'second': 'df'}
+
+        with pytest.raises(ValueError):
+            PipelineGraph(
+                [
+                    Node.from_model('silver/first', 'silver', First),
+                    Node.from_model('silver/second', 'silver', Second),
+                ]
+            )
+
+    def test_missing_producer_is_rejected(self):
+        """Test that an input nobody produces is reported"""
+
+        class Orphan:
+            inputs = ('bronze/missing',)
+            outputs = {'orphan': 'df'}
+
+        with pytest.raises(ValueError):
+            PipelineGraph([Node.from_model('silver/orphan', 'silver', Orphan)])
+
+    def test_pushdown(self, graph):
+        """
+        Test that bronze reads get the columns and join key declared by their consumers
+        """
+        options = graph.pushdown('bronze/box_office_metrics')
+
+        assert options['columns']['box_office_international'] == [
+            'film_name',
+            'box_office_gross_usd',
+        ]
+        assert options['semi_join_key'] == 'film_name'
+        assert graph.pushdown('bronze/critic_agg') == {}
+
+    def test_discovery_does_not_import_models(self):
+        """
+        Test that the graph is read from the model sources without
+        importing them or pandas
+        """
+        script = (
+            "import sys; from src.movies.pipeline.graph import PipelineGraph; PipelineGraph.discover(); "
+            "print(any(name.startswith('src.movies.models') or name == 'pandas' for name in sys.modules))"
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', script], capture_output=True, text=True, check=True
+        )
+        assert result.stdout.strip() == 'False'
+
+    def test_parsed_nodes_match_imported_models(self):
+        """
+        Test that nodes read from the sources equal nodes built from the imported models
+        """
+        for node in discover_nodes():
+            imported = Node.from_model(node.name, node.layer, node.model)
+            assert node == imported
+            assert node.declarations == imported.declarations
@@ -0,0 +1,233 @@
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+import pandas as pd
+from src.movies.pipeline.graph import PipelineGraph
+from src.movies.pipeline.incremental import (
+    PARTITION_COLUMN,
+    IncrementalRunner,
+    current_state_path,
+    load_current_state,
+    pending_partitions,
+)
+from src.movies.pipeline.scheduler import Scheduler
+from src.movies.storage.layers import artefact_path
+
+
+class TestIncrementalRunner:
+    @pytest.fixture
+    def graph(self):
+        return PipelineGraph.discover()
+
+    @pytest.fixture
+    def config(self, partitioned_config, tmp_path):
+        partitioned_config['incremental'] = {
+            'enabled': True,
+            'state': str(tmp_path / 'state' / 'watermarks.json'),
+        }
+        return partitioned_config
+
+    def add_critic_drop(self, config, date):
+        path = config['source']['critic_agg'].replace('*', date)
+        with open(path, 'w') as file:
+            file.write(
+                'movie_title,release_year,critic_score_percentage,top_critic_score,total_critic_reviews_counted\n'
+            )
+            file.write('Inception,2010,88,8.2,460\n')
+            file.write('New Film,2025,70,6.0,10\n')
+
+    def test_first_run_matches_full_run(self, graph, config):
+        """Test that a first incremental run builds the same gold table as a full run"""
+        gold = IncrementalRunner(graph, config).run()['gold/movies_unified']
+
+        expected = Scheduler(graph, config).run()['gold/movies_unified']
+        pd.testing.assert_frame_equal(gold, expected, check_dtype=False)
+        with open(config['incremental']['state']) as file:
+            assert json.load(file)['bronze/critic_agg'] == '20251022'
+
+    def test_new_drop_updates_changed_keys_only(self, graph, config):
+        """Test that a new drop is ingested alone and only its keys change in gold"""
+        before = (
+            IncrementalRunner(graph, config)
+            .run()['gold/movies_unified']
+            .set_index('movie_title')
+        )
+        self.add_critic_drop(config, '20251023')
+
+        gold = (
+            IncrementalRunner(graph, config)
+            .run()['gold/movies_unified']
+            .set_index('movie_title')
+        )
+
+        assert list(gold.index) == [
+            'Inception',
+            'New Film',
+            'Parasite',
+            'The Dark Knight',
+        ]
+        assert gold.loc['Inception', 'critic_score_percentage'] == 88
+        assert (
+            gold.loc['Inception', 'audience_score_percentage']
+            == before.loc['Inception', 'audience_score_percentage']
+        )
+        pd.testing.assert_series_equal(
+            gold.loc['Parasite'], before.loc['Parasite'], check_dtype=False
+        )
+
+    def test_new_drop_refreshes_aggregates(self, graph, config):
+        """
+        Test that the aggregates refreshed from the changed titles
+        equal a rebuild from gold
+        """
+        IncrementalRunner(graph, config).run()
+        self.add_critic_drop(config, '20251023')
+
+        refreshed = IncrementalRunner(graph, config).run()
+
+        model = graph.nodes['gold/movie_aggregates'].model
+        rebuilt = model.build(
+            [pd.read_csv(artefact_path(config, 'gold/movies_unified'))]
+        )
+        for artefact, attribute in graph.nodes['gold/movie_aggregates'].outputs:
+            pd.testing.assert_frame_equal(
+                refreshed[artefact], getattr(rebuilt, attribute), check_dtype=False
+            )
+        assert 'New Film' in refreshed['gold/movie_metrics']['movie_title'].tolist()
+
+    def test_rewritten_drop_removes_title_from_aggregates(self, graph, config):
+        """
+        Test that a title dropped by a rewritten partition leaves the aggregates too
+        """
+        IncrementalRunner(graph, config).run()
+        self.add_critic_drop(config, '20251023')
+        IncrementalRunner(graph, config).run()
+        # The drop is rewritten without New Film, its only title, and processed again
+        path = config['source']['critic_agg'].replace('*', '20251023')
+        with open(path) as file:
+            lines = file.readlines()
+        with open(path, 'w') as file:
+            file.writelines(line for line in lines if 'New Film' not in line)
+        state = Path(config['incremental']['state'])
+        watermarks = json.loads(state.read_text())
+        state.write_text(json.dumps({**watermarks, 'bronze/critic_agg': '20251022'}))
+
+        refreshed = IncrementalRunner(graph, config).run()
+
+        unified = pd.read_csv(artefact_path(config, 'gold/movies_unified'))
+        assert 'New Film' not in unified['movie_title'].tolist()
+        model = graph.nodes['gold/movie_aggregates'].model
+        rebuilt = model.build([unified])
+        for artefact, attribute in graph.nodes['gold/movie_aggregates'].outputs:
+            pd.testing.assert_frame_equal(
+                refreshed[artefact], getattr(rebuilt, attribute), check_dtype=False
+            )
+        assert 2025 not in refreshed['gold/roi_by_year']['release_year'].tolist()
+
+    def test_rejects_compact_dtypes(self, graph, config):
+        """Test that compact dtypes are rejected rather than ignored"""
+        config['dtypes'] = {'mode': 'compact'}
+
+        with pytest.raises(ValueError, match='incremental'):
+            IncrementalRunner(graph, config)
+
+    def test_no_new_partitions(self, graph, config):
+        """Test that a run without new drops leaves gold untouched"""
+        IncrementalRunner(graph, config).run()
+        assert IncrementalRunner(graph, config).run() == {}
+
+    def test_incomplete_partition_holds_watermark(self, graph, config):
+        """Test that a partition missing one of its files is not processed"""
+        node = graph.nodes['bronze/box_office_metrics']
+        shutil.copyfile(
+            config['source']['box_office']['domestic'].replace('*', '20251022'),
+            config['source']['box_office']['domestic'].replace('*', '20251023'),
+        )
+
+        assert [partition for partition, _ in pending_partitions(node, config)] == [
+            '20251022'
+        ]
+        assert pending_partitions(node, config, '20251022') == []
+
+    def test_new_drop_reads_snapshot_not_history(self, graph, config, tmp_path):
+        """
+        Test that gold is updated from the current-state snapshot and
+        the new partitions only
+        """
+        before = (
+            IncrementalRunner(graph, config)
+            .run()['gold/movies_unified']
+            .set_index('movie_title')
+        )
+        assert current_state_path(config, 'silver/critic_agg').exists()
+        # Older partitions are not read again: removing one leaves gold unchanged
+        (tmp_path / 'silver' / 'critic_agg' / '20251022.csv').unlink()
+        self.add_critic_drop(config, '20251023')
+
+        gold = (
+            IncrementalRunner(graph, config)
+            .run()['gold/movies_unified']
+            .set_index('movie_title')
+        )
+
+        assert (
+            gold.loc['Parasite', 'critic_score_percentage']
+            == before.loc['Parasite', 'critic_score_percentage']
+        )
+        assert gold.loc['Inception', 'critic_score_percentage'] == 88
+
+    def test_updated_gold_keeps_integer_columns(self, graph, config):
+        """
+        Test that gold rows read back from CSV keep their integer columns when merged
+        """
+        IncrementalRunner(graph, config).run()
+        self.add_critic_drop(config, '20251023')
+
+        gold = IncrementalRunner(graph, config).run()['gold/movies_unified']
+
+        assert str(gold['release_year'].dtype) == 'Int64'
+        with open(artefact_path(config, 'gold/movies_unified')) as file:
+            assert '2010.0' not in file.read()
+
+
+class TestCurrentState:
+    def write_partition(self, config, partition, rows):
+        path = Path(config['output']['silver']) / 'critic_agg' / f'{partition}.csv'
+        path.parent.mkdir(exist_ok=True)
+        pd.DataFrame(rows, columns=['movie_title', 'score']).to_csv(path, index=False)
+
+    def test_latest_partition_wins(self, config):
+        """
+        Test that the snapshot holds the latest row of each key,
+        whatever the write order
+        """
+        self.write_partition(config, '20251023', [('Alien', 2)])
+        self.write_partition(config, '20251022', [('Alien', 1), ('Dune', None)])
+
+        state = load_current_state(
+            config, 'silver/critic_agg', 'movie_title', dtypes={'score': 'Int64'}
+        )
+
+        scores = state.set_index('movie_title')['score']
+        assert scores['Alien'] == 2 and pd.isna(scores['Dune'])
+        assert str(state['score'].dtype) == 'Int64'
+
+    def test_rewritten_partition(self, config):
+        """
+        Test that a key dropped from a rewritten partition falls
+        back to its previous row
+        """
+        self.write_partition(config, '20251022', [('Alien', 1), ('Dune', 5)])
+        self.write_partition(config, '20251023', [('Alien', 2)])
+        load_current_state(config, 'silver/critic_agg', 'movie_title')
+        self.write_partition(config, '20251023', [('Heat', 3)])
+
+        state = load_current_state(
+            config, 'silver/critic_agg', 'movie_title', ['20251023']
+        )
+
+        rows = state.set_index('movie_title')
+        assert rows['score'].to_dict() == {'Alien': 1, 'Dune': 5, 'Heat': 3}
+        assert rows.loc['Alien', PARTITION_COLUMN] == '20251022'
@@ -0,0 +1,200 @@
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+import pandas as pd
+from src.movies.pipeline.graph import PipelineGraph
+from src.movies.pipeline.manifest import FAILED, SUCCEEDED, RunManifest
+from src.movies.pipeline.scheduler import Scheduler, TaskResult
+from src.movies.storage.layers import artefact_path
+
+
+class TestRunManifest:
+    @pytest.fixture
+    def config(self, tmp_path):
+        return {'output': {'gold': str(tmp_path / 'target' / 'gold')}}
+
+    @pytest.fixture
+    def saved(self, tmp_path):
+        path = tmp_path / 'critic_agg.csv'
+        path.write_text('movie_title\nDune\n')
+        return [('silver/critic_agg', str(path), 1)]
+
+    def test_default_path(self, config, tmp_path):
+        """Test that the manifest sits next to the output layers unless configured"""
+        assert (
+            RunManifest.path_from_config(config)
+            == tmp_path / 'target' / '.manifest.json'
+        )
+        config['manifest'] = {'path': str(tmp_path / 'run.json')}
+        assert RunManifest.path_from_config(config) == tmp_path / 'run.json'
+
+    def test_resume_keeps_completed_tasks(self, config, saved):
+        """Test that a resumed run sees the tasks recorded with the same fingerprint"""
+        RunManifest.open(config, 'abc').record('silver/critic_agg', saved)
+
+        assert (
+            RunManifest.open(config, 'abc', resume=True).completed('silver/critic_agg')
+            == saved
+        )
+        assert (
+            RunManifest.open(config, 'other', resume=True).completed(
+                'silver/critic_agg'
+            )
+            is None
+        )
+
+    def test_new_run_starts_empty(self, config, saved):
+        """Test that a run without resume starts a new manifest"""
+        RunManifest.open(config, 'abc').record('silver/critic_agg', saved)
+
+        assert RunManifest.open(config, 'abc').tasks == {}
+
+    def test_changed_file_is_not_completed(self, config, saved):
+        """Test that a file whose checksum changed makes its task run again"""
+        RunManifest.open(config, 'abc').record('silver/critic_agg', saved)
+        with open(saved[0][1], 'a') as file:
+            file.write('Alien\n')
+
+        assert (
+            RunManifest.open(config, 'abc', resume=True).completed('silver/critic_agg')
+            is None
+        )
+
+    def test_changed_key_is_not_completed(self, config, saved):
+        """Test that a task recorded with other input keys runs again"""
+        RunManifest.open(config, 'abc').record('silver/critic_agg', saved, 'key')
+        manifest = RunManifest.open(config, 'abc', resume=True)
+
+        assert manifest.completed('silver/critic_agg', 'key') == saved
+        assert manifest.completed('silver/critic_agg', 'other') is None
+
+
+class TestSchedulerResume:
+    @pytest.fixture
+    def graph(self):
+        return PipelineGraph.discover()
+
+    def test_resume_reruns_failed_stage_only(
+        self, graph, config, tmp_path, monkeypatch
+    ):
+        """
+        Test that resuming a run failed in gold reuses bronze and silver and runs gold
+        """
+        gold = graph.nodes['gold/movies_unified'].model
+
+        def failing_build(cls, inputs, registry=None, **options):
+            raise ValueError("mapping error")
+
+        monkeypatch.setattr(gold, 'build', classmethod(failing_build))
+        with pytest.raises(ExceptionGroup):
+            Scheduler(graph, config).run()
+        manifest = json.loads((tmp_path / '.manifest.json').read_text())
+        assert manifest['status'] == FAILED
+        assert 'gold/movies_unified' not in manifest['tasks']
+        silver_written = (
+            Path(artefact_path(config, 'silver/critic_agg')).stat().st_mtime_ns
+        )
+
+        monkeypatch.undo()
+        artefacts = Scheduler(graph, config, resume=True).run()
+
+        assert list(artefacts)[0] == 'gold/movies_unified'
+        assert {artefact.split('/')[0] for artefact in artefacts} == {'gold'}
+        assert (
+            Path(artefact_path(config, 'silver/critic_agg')).stat().st_mtime_ns
+            == silver_written
+        )
+        assert (
+            json.loads((tmp_path / '.manifest.json').read_text())['status'] == SUCCEEDED
+        )
+        # Resumed inputs are read back from disk, so only the values are compared
+        pd.testing.assert_frame_equal(
+            artefacts['gold/movies_unified'],
+            Scheduler(graph, config).run()['gold/movies_unified'],
+            check_dtype=False,
+        )
+
+    def test_resume_reruns_stages_of_edited_source(
+        self, graph, config, tmp_path, monkeypatch
+    ):
+        """
+        Test that a source edited after the failed run reruns its stages
+        and everything downstream
+        """
+        source = tmp_path / 'critic_agg.csv'
+        shutil.copyfile(config['source']['critic_agg'], source)
+        config['source']['critic_agg'] = str(source)
+        gold = graph.nodes['gold/movies_unified'].model
+
+        def failing_build(cls, inputs, registry=None, **options):
+            raise ValueError("mapping error")
+
+        monkeypatch.setattr(gold, 'build', classmethod(failing_build))
+        with pytest.raises(ExceptionGroup):
+            Scheduler(graph, config).run()
+        source.write_text(
+            source.read_text().replace(
+                'my_film_test_1,1998,12,', 'my_film_test_1,1998,87,'
+            )
+        )
+
+        monkeypatch.undo()
+        artefacts = Scheduler(graph, config, resume=True).run()
+
+        rerun = {'bronze/critic_agg', 'silver/critic_agg', 'gold/movies_unified'}
+        assert rerun <= set(artefacts)
+        assert 'silver/audience_pulse' not in artefacts
+        unified = artefacts['gold/movies_unified'].set_index('movie_title')
+        assert unified.loc['my_film_test_1', 'critic_score_percentage'] == 87
+
+    def test_resume_reruns_stage_written_only_as_changeset(
+        self, graph, config, tmp_path, monkeypatch
+    ):
+        """
+        Test that a gold stage that persisted only its changeset is run again on
+        resume, so the stage that failed downstream of it gets its input
+        """
+        config['changeset'] = {'enabled': True, 'snapshot': False}
+        aggregates = graph.nodes['gold/movie_aggregates'].model
+
+        def failing_build(cls, inputs, registry=None, **options):
+            raise ValueError("aggregation error")
+
+        monkeypatch.setattr(aggregates, 'build', classmethod(failing_build))
+        with pytest.raises(ExceptionGroup):
+            Scheduler(graph, config).run()
+
+        monkeypatch.undo()
+        artefacts = Scheduler(graph, config, resume=True).run()
+
+        assert 'gold/roi_by_year' in artefacts
+        assert Path(artefact_path(config, 'gold/roi_by_year')).exists()
+        manifest = json.loads((tmp_path / '.manifest.json').read_text())
+        assert manifest['status'] == SUCCEEDED
+        assert 'gold/movie_aggregates' in manifest['tasks']
+
+    def test_stalled_task_fails_the_run(self, graph, config, tmp_path, monkeypatch):
+        """Test that a task whose inputs never become available fails the run"""
+        Scheduler(graph, config).run()
+        monkeypatch.setattr(
+            Scheduler,
+            '_resume',
+            staticmethod(
+                lambda task, *args: (
+                    TaskResult(resumed=True)
+                    if task.name == 'gold/movies_unified'
+                    else None
+                )
+            ),
+        )
+
+        with pytest.raises(ExceptionGroup) as excinfo:
+            Scheduler(graph, config, resume=True).run()
+
+        assert [error.__notes__ for error in excinfo.value.exceptions] == [
+            ['pipeline node: gold/movie_aggregates']
+        ]
+        manifest = json.loads((tmp_path / '.manifest.json').read_text())
+        assert manifest['status'] == FAILED
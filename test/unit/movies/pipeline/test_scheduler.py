@@ -0,0 +1,145 @@
+import os
+import tempfile
+
+import pytest
+import pandas as pd
+from src.movies.pipeline.graph import PipelineGraph
+from src.movies.pipeline.scheduler import Scheduler
+from src.movies.storage.layers import artefact_path
+
+
+class TestScheduler:
+    @pytest.fixture
+    def graph(self):
+        return PipelineGraph.discover()
+
+    @pytest.mark.parametrize('pool', ['thread', 'process'])
+    def test_run_all(self, graph, config, pool):
+        """Test that a full run produces every artefact with either pool type"""
+        config['execution'] = {'pool': pool, 'workers': 3}
+        artefacts = Scheduler(graph, config).run()
+
+        assert set(artefacts) == {
+            artefact for node in graph.nodes.values() for artefact in node.artefacts
+        }
+        expected_silver = pd.read_csv(
+            'test/data/box_office_metrics/expected_silver_output.csv'
+        )
+        pd.testing.assert_frame_equal(
+            artefacts['silver/box_office_metrics'], expected_silver, check_dtype=False
+        )
+
+    @pytest.mark.parametrize('pool', ['thread', 'process'])
+    def test_arrow_handoff_matches_in_memory_run(self, graph, config, pool, tmp_path):
+        """
+        Test that stages handing off memory-mapped Arrow files write the same tables
+        """
+        expected = Scheduler(graph, config).run()
+        written = {
+            artefact: pd.read_csv(artefact_path(config, artefact))
+            for artefact in expected
+        }
+        config['execution'] = {
+            'pool': pool,
+            'workers': 3,
+            'handoff': 'arrow',
+            'handoff_dir': str(tmp_path / 'handoff'),
+        }
+
+        artefacts = Scheduler(graph, config).run()
+
+        assert set(artefacts) == set(expected)
+        assert (tmp_path / 'handoff' / 'silver' / 'critic_agg.arrow').exists()
+        for artefact, df in written.items():
+            pd.testing.assert_frame_equal(
+                pd.read_csv(artefact_path(config, artefact)), df
+            )
+        pd.testing.assert_frame_equal(
+            artefacts['gold/movies_unified'],
+            expected['gold/movies_unified'],
+            check_dtype=False,
+        )
+
+    def test_default_handoff_dir_is_per_run(self, graph, config, tmp_path, monkeypatch):
+        """
+        Test that without a handoff_dir each run hands off through its own
+        directory, removed at the end
+        """
+        created = []
+        mkdtemp = tempfile.mkdtemp
+
+        def record(**kwargs):
+            created.append(mkdtemp(dir=tmp_path, **kwargs))
+            return created[-1]
+
+        monkeypatch.setattr(tempfile, 'mkdtemp', record)
+        expected = Scheduler(graph, config).run()
+        config['execution'] = {'handoff': 'arrow'}
+
+        first = Scheduler(graph, config).run()
+        second = Scheduler(graph, config).run()
+
+        assert len(created) == 2 and created[0] != created[1]
+        assert not any(os.path.exists(directory) for directory in created)
+        for artefacts in (first, second):
+            pd.testing.assert_frame_equal(
+                artefacts['gold/movies_unified'],
+                expected['gold/movies_unified'],
+                check_dtype=False,
+            )
+
+    def test_only_reads_persisted_inputs(self, graph, config):
+        """Test that a single node runs from the persisted outputs of its inputs"""
+        scheduler = Scheduler(graph, config)
+        full_run = scheduler.run()
+
+        artefacts = scheduler.run(graph.select(only=['gold/movies_unified']))
+        assert list(artefacts) == ['gold/movies_unified']
+        pd.testing.assert_frame_equal(
+            artefacts['gold/movies_unified'],
+            full_run['gold/movies_unified'],
+            check_dtype=False,
+        )
+
+    def test_failures_skip_dependents_only(self, graph, config):
+        """Test that a failing node stops its dependents but not independent nodes"""
+        config['source']['critic_agg'] = 'test/data/missing.csv'
+
+        with pytest.raises(ExceptionGroup) as excinfo:
+            Scheduler(graph, config).run()
+
+        assert [error.__notes__ for error in excinfo.value.exceptions] == [
+            ['pipeline node: bronze/critic_agg']
+        ]
+        silver_dir = config['output']['silver']
+        assert (pd.read_csv(f"{silver_dir}/box_office_metrics.csv")).shape[0] == 2
+        with pytest.raises(FileNotFoundError):
+            pd.read_csv(f"{silver_dir}/critic_agg.csv")
+
+    def test_streaming_plan_fuses_bronze_and_silver(self, graph, config):
+        """Test that chunkable single-file sources stream straight into silver"""
+        config['streaming'] = {'chunksize': 1}
+        tasks = Scheduler(graph, config).plan()
+
+        streaming = [task.name for task in tasks if task.streaming]
+        assert streaming == [
+            'bronze/audience_pulse + silver/audience_pulse',
+            'bronze/critic_agg + silver/critic_agg',
+        ]
+
+    def test_streaming_run_matches_in_memory_run(self, graph, config):
+        """Test that streaming produces the same gold output as an in-memory run"""
+        in_memory = Scheduler(graph, config).run()['gold/movies_unified']
+
+        config['streaming'] = {'chunksize': 1}
+        streamed = Scheduler(graph, config).run()['gold/movies_unified']
+
+        pd.testing.assert_frame_equal(streamed, in_memory, check_dtype=False)
+
+    def test_streaming_rejects_compact_dtypes(self, graph, config):
+        """Test that compact dtypes are rejected rather than ignored when streaming"""
+        config['streaming'] = {'chunksize': 1}
+        config['dtypes'] = {'mode': 'compact'}
+
+        with pytest.raises(ValueError, match='streaming'):
+            Scheduler(graph, config)
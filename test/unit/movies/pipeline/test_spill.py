@@ -0,0 +1,126 @@
+import pytest
+import pandas as pd
+from src.movies.pipeline.graph import PipelineGraph
+from src.movies.pipeline.scheduler import Scheduler
+from src.movies.pipeline.spill import (
+    SpillBuckets,
+    SpillSettings,
+    bucket_count,
+    bucket_of,
+)
+from src.movies.synthetic import generate, source_config
+
+
+class TestSpillBuckets:
+    def test_from_config(self, tmp_path):
+        """Test that spilling is only enabled when configured"""
+        assert SpillSettings.from_config({}) is None
+        assert (
+            SpillSettings.from_config(
+                {'spill': {'enabled': False, 'dir': str(tmp_path)}}
+            )
+            is None
+        )
+        settings = SpillSettings.from_config(
+            {'spill': {'dir': str(tmp_path), 'memory_mb': 64}}
+        )
+        assert (settings.dir, settings.memory_mb, settings.buckets) == (
+            str(tmp_path),
+            64,
+            None,
+        )
+
+    def test_bucket_count_follows_budget(self, tmp_path):
+        """Test that larger inputs or smaller budgets give more buckets"""
+        df = pd.DataFrame({'movie_title': [f"Movie {i}" for i in range(10_000)]})
+        assert bucket_count([df], SpillSettings(str(tmp_path), memory_mb=1024)) == 1
+        assert bucket_count([df, df], SpillSettings(str(tmp_path), memory_mb=1)) > 1
+        assert bucket_count([df], SpillSettings(str(tmp_path), buckets=4)) == 4
+
+    def test_bucket_ignores_key_dtype(self):
+        """Test that equal keys land in the same bucket whatever their dtype"""
+        as_object = pd.Series(['Dune', 'Alien', None], dtype=object)
+        as_string = pd.Series(['Dune', 'Alien', None], dtype='string')
+
+        assert (
+            bucket_of(as_object, 8)[:2].tolist() == bucket_of(as_string, 8)[:2].tolist()
+        )
+
+    def test_round_trip(self, tmp_path):
+        """Test that every row is in the bucket of its key, with its dtypes kept"""
+        df = pd.DataFrame(
+            {
+                'film_name': [f"Movie {i}" for i in range(50)],
+                'year': pd.array(range(50), dtype='Int64'),
+            }
+        )
+        spill = SpillBuckets(tmp_path, 4)
+        spill.add(df.iloc[:20], 'film_name')
+        spill.add(df.iloc[20:], 'film_name')
+
+        buckets = [spill.load(bucket) for bucket in range(4)]
+        assert sum(len(bucket) for bucket in buckets) == 50
+        for index, bucket in enumerate(buckets):
+            assert (bucket_of(bucket['film_name'], 4) == index).all()
+            assert bucket.dtypes.to_dict() == df.dtypes.to_dict()
+
+
+class TestSchedulerSpill:
+    @pytest.fixture
+    def graph(self):
+        return PipelineGraph.discover()
+
+    @pytest.fixture
+    def paths(self, tmp_path):
+        return generate(tmp_path / 'sources', 500, overlap=0.6)
+
+    def make_config(self, tmp_path, name, paths):
+        output = {
+            layer: str(tmp_path / name / layer)
+            for layer in ('bronze', 'silver', 'gold')
+        }
+        for directory in output.values():
+            (tmp_path / directory).mkdir(parents=True)
+        return {'source': source_config(paths), 'output': output}
+
+    def test_spilled_run_matches_in_memory_run(self, graph, paths, tmp_path):
+        """Test that bucketed joins write the same tables as in-memory joins"""
+        Scheduler(graph, self.make_config(tmp_path, 'memory', paths)).run()
+        config = self.make_config(tmp_path, 'spill', paths)
+        config['spill'] = {
+            'dir': str(tmp_path / 'buckets'),
+            'buckets': 5,
+            'chunksize': 100,
+        }
+        Scheduler(graph, config).run()
+
+        pd.testing.assert_frame_equal(
+            pd.read_csv(tmp_path / 'spill/gold/movies_unified.csv'),
+            pd.read_csv(tmp_path / 'memory/gold/movies_unified.csv'),
+        )
+        # Silver rows come out bucket by bucket
+        pd.testing.assert_frame_equal(
+            pd.read_csv(tmp_path / 'spill/silver/box_office_metrics.csv').sort_values(
+                'movie_title', ignore_index=True
+            ),
+            pd.read_csv(tmp_path / 'memory/silver/box_office_metrics.csv').sort_values(
+                'movie_title', ignore_index=True
+            ),
+        )
+        assert list((tmp_path / 'buckets').iterdir()) == []
+
+    def test_consumed_artefacts_are_released(self, graph, paths, tmp_path):
+        """Test that only artefacts nothing consumes stay in memory when spilling"""
+        config = self.make_config(tmp_path, 'spill', paths)
+        config['spill'] = {'dir': str(tmp_path / 'buckets')}
+
+        artefacts = Scheduler(graph, config).run()
+
+        # movies_unified is consumed by the aggregates, whose outputs nothing consumes
+        assert list(artefacts) == [
+            'gold/movie_metrics',
+            'gold/yearly_statistics',
+            'gold/roi_by_year',
+            'gold/score_gross_correlation',
+            'gold/top_budget_efficiency',
+        ]
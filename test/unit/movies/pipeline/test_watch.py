@@ -0,0 +1,197 @@
+import json
+import shutil
+import urllib.error
+import urllib.request
+
+import pytest
+import pandas as pd
+from src.movies.pipeline.graph import PipelineGraph
+from src.movies.pipeline.watch import (
+    FAILED,
+    IDLE,
+    SourceWatcher,
+    WatchDaemon,
+    WatchSettings,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestWatchDaemon:
+    @pytest.fixture
+    def graph(self):
+        return PipelineGraph.discover()
+
+    @pytest.fixture
+    def config(self, partitioned_config, tmp_path):
+        partitioned_config['incremental'] = {
+            'enabled': True,
+            'state': str(tmp_path / 'state' / 'watermarks.json'),
+        }
+        partitioned_config['watch'] = {'debounce': 5, 'skip_existing': True}
+        return partitioned_config
+
+    def add_critic_drop(self, config, date, rows=('Inception,2010,88,8.2,460',)):
+        path = config['source']['critic_agg'].replace('*', date)
+        with open(path, 'w') as file:
+            file.write(
+                'movie_title,release_year,critic_score_percentage,top_critic_score,total_critic_reviews_counted\n'
+            )
+            file.write(''.join(f"{row}\n" for row in rows))
+        return path
+
+    def test_settings_from_config(self):
+        """Test that missing watch settings take their defaults"""
+        assert WatchSettings.from_config({}) == WatchSettings()
+        assert WatchSettings.from_config(
+            {'watch': {'interval': 1, 'port': 8080}}
+        ) == WatchSettings(interval=1, port=8080)
+        assert WatchSettings.from_config(
+            {'watch': {'skip_existing': True}}
+        ).skip_existing
+
+    def test_existing_files_are_reported(self, config):
+        """Test that files present at start are reported once settled, unless skipped"""
+        clock = FakeClock()
+        watcher = SourceWatcher(config, debounce=5, clock=clock)
+        assert watcher.poll() == set()
+        clock.now = 5
+        assert watcher.poll() == {
+            'audience_pulse',
+            'critic_agg',
+            'box_office.domestic',
+            'box_office.financials',
+            'box_office.international',
+        }
+        assert (
+            SourceWatcher(config, debounce=5, clock=clock, skip_existing=True).poll()
+            == set()
+        )
+
+    def test_files_are_debounced(self, config):
+        """
+        Test that a file is reported once it stayed unchanged for the debounce period
+        """
+        clock = FakeClock()
+        watcher = SourceWatcher(config, debounce=5, clock=clock, skip_existing=True)
+        assert watcher.poll() == set()  # files present at start are skipped
+
+        path = self.add_critic_drop(config, '20251023')
+        assert watcher.poll() == set()
+        clock.now = 3
+        with open(path, 'a') as file:
+            file.write('Late Film,2025,50,5.0,3\n')
+        clock.now = 6
+        assert watcher.poll() == set()  # still growing at the previous poll
+        clock.now = 11
+        assert watcher.poll() == {'critic_agg'}
+        assert watcher.poll() == set()
+
+    def test_affected_nodes(self, graph, config):
+        """Test that a source maps to the bronze nodes reading it"""
+        daemon = WatchDaemon(graph, config)
+
+        assert daemon.affected_nodes({'box_office.domestic'}) == [
+            'bronze/box_office_metrics'
+        ]
+        assert daemon.affected_nodes({'critic_agg', 'audience_pulse'}) == [
+            'bronze/audience_pulse',
+            'bronze/critic_agg',
+        ]
+
+    def test_new_drop_runs_affected_stages(self, graph, config):
+        """Test that a settled drop updates gold without restarting the daemon"""
+        clock = FakeClock()
+        daemon = WatchDaemon(graph, config, clock=clock)
+        daemon.run_stages(
+            ['bronze/audience_pulse', 'bronze/critic_agg', 'bronze/box_office_metrics']
+        )
+
+        self.add_critic_drop(config, '20251023')
+        assert daemon.poll_once() is None
+        clock.now = 5
+        assert daemon.poll_once() == ['bronze/critic_agg']
+
+        gold = pd.read_csv(f"{config['output']['gold']}/movies_unified.csv")
+        gold = gold.set_index('movie_title')
+        assert gold.loc['Inception', 'critic_score_percentage'] == 88
+        status = daemon.status()
+        assert (status['state'], status['runs'], status['failures']) == (IDLE, 1, 0)
+        assert status['last_run']['error'] is None
+
+    def test_waits_for_every_file_of_a_partition(self, graph, config, monkeypatch):
+        """
+        Test that outside incremental mode a multi-file source runs once its
+        partition is complete
+        """
+        del config['incremental']
+        clock = FakeClock()
+        daemon = WatchDaemon(graph, config, clock=clock)
+        runs = []
+        monkeypatch.setattr(daemon, 'run_stages', runs.append)
+        box_office = config['source']['box_office']
+
+        def add_drop(name):
+            shutil.copyfile(
+                box_office[name].replace('*', '20251022'),
+                box_office[name].replace('*', '20251023'),
+            )
+
+        add_drop('domestic')
+        daemon.poll_once()
+        clock.now = 5
+        # Financials and international are still at 20251022
+        assert daemon.poll_once() is None
+        assert daemon.status()['waiting_sources'] == ['box_office.domestic']
+
+        add_drop('financials')
+        add_drop('international')
+        clock.now = 6
+        # Domestic settled, but the others are still pending
+        assert daemon.poll_once() is None
+        clock.now = 11
+        assert daemon.poll_once() == ['bronze/box_office_metrics']
+        assert runs == [['bronze/box_office_metrics']]
+        assert daemon.status()['waiting_sources'] == []
+
+    def test_failed_run_keeps_watching(self, graph, config, monkeypatch):
+        """
+        Test that a failing run is recorded in the status instead of stopping the daemon
+        """
+        clock = FakeClock()
+        daemon = WatchDaemon(graph, config, clock=clock)
+        monkeypatch.setattr(daemon, 'run_stages', lambda nodes: 1 / 0)
+
+        self.add_critic_drop(config, '20251023')
+        daemon.poll_once()
+        clock.now = 5
+        daemon.poll_once()
+
+        status = daemon.status()
+        assert (status['state'], status['failures']) == (FAILED, 1)
+        assert 'ZeroDivisionError' in status['last_run']['error']
+
+    def test_status_endpoint(self, graph, config):
+        """Test that the status and health of the daemon are served on localhost"""
+        daemon = WatchDaemon(graph, config, WatchSettings(port=0))
+        server = daemon.start_server()
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            with pytest.raises(urllib.error.HTTPError) as error:
+                urllib.request.urlopen(f"{url}/health")
+            assert error.value.code == 503  # not polled yet
+
+            daemon.poll_once()
+            with urllib.request.urlopen(f"{url}/health") as response:
+                assert json.load(response) == {'healthy': True}
+            with urllib.request.urlopen(f"{url}/status") as response:
+                assert json.load(response)['state'] == IDLE
+        finally:
+            server.shutdown()
+            server.server_close()
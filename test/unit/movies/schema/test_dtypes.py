@@ -0,0 +1,121 @@
+import logging
+
+import numpy as np
+import pytest
+import pandas as pd
+from src.movies.schema.dtypes import (
+    DtypePolicy,
+    compact_frame,
+    compact_series,
+    dtype_policy,
+    memory_bytes,
+)
+from src.movies.schema.schema_registry import SchemaRegistry, SchemaVersion
+
+
+class TestCompactSeries:
+    def test_strings_become_arrow_strings(self):
+        """Test that string columns are stored in Arrow memory, nulls included"""
+        series = pd.Series(['Dune', None, 'Alien'])
+
+        compacted = compact_series(series)
+
+        assert compacted.dtype == 'string[pyarrow]'
+        assert compacted.isna().tolist() == [False, True, False]
+        assert memory_bytes(compacted.to_frame()) < memory_bytes(series.to_frame())
+
+    def test_integers_are_downcast(self):
+        """
+        Test that integers take the narrowest width holding their
+        range, staying nullable
+        """
+        assert compact_series(pd.Series([1, 2, 300])).dtype == 'int16'
+        assert compact_series(pd.Series([1, None], dtype='Int64')).dtype == 'Int8'
+
+    def test_floats_only_downcast_when_hinted_and_exact(self):
+        """Test that floats become float32 only when hinted and no value changes"""
+        exact = pd.Series([1.5, np.nan, 2.25])
+        assert compact_series(exact).dtype == 'float64'
+        assert compact_series(exact, 'downcast').dtype == 'float32'
+        assert compact_series(pd.Series([0.1]), 'downcast').dtype == 'float64'
+
+    def test_hints(self):
+        """Test that hints select categoricals or keep a column as it is"""
+        series = pd.Series(['drama', 'comedy', 'drama'])
+        assert isinstance(compact_series(series, 'category').dtype, pd.CategoricalDtype)
+        assert compact_series(series, 'keep') is series
+
+    def test_mixed_objects_are_kept(self):
+        """Test that object columns not holding only strings are not converted"""
+        series = pd.Series(['1', 2, None])
+        assert compact_series(series) is series
+
+    def test_frame_values_unchanged(self):
+        """Test that compaction keeps every value"""
+        df = pd.DataFrame(
+            {'title': ['A', 'B'], 'year': [2000, 2001], 'score': [7.3, np.nan]}
+        )
+
+        compacted = compact_frame(df)
+
+        pd.testing.assert_frame_equal(compacted, df, check_dtype=False)
+
+
+class TestCompactDataFrame:
+    @pytest.fixture
+    def registry(self):
+        return SchemaRegistry()
+
+    def test_default_mode_does_nothing(self, registry):
+        """Test that frames are returned as they are outside compact mode"""
+        df = pd.DataFrame({'movie_title': ['A']})
+        assert registry.compact_dataframe('bronze/critic_agg', 'v1', df) is df
+
+    def test_compact_mode_reports_memory(self, registry, caplog):
+        """Test that compact mode logs the memory of the table before and after"""
+        df = pd.DataFrame({'movie_title': ['A', 'B'], 'release_year': [2000, 2001]})
+
+        with caplog.at_level(logging.INFO), dtype_policy(DtypePolicy('compact')):
+            compacted = registry.compact_dataframe('bronze/critic_agg', 'v1', df)
+
+        assert compacted.dtypes.astype(str).tolist() == ['string', 'int16']
+        assert 'Memory of bronze/critic_agg' in caplog.text
+
+    def test_string_cast_keeps_arrow_strings(self):
+        """Test that the string transformation stores Arrow strings in compact mode"""
+        schema = SchemaVersion(
+            'v1', 'test', {'title': 'string'}, {}, transformations={'title': 'string'}
+        )
+        df = pd.DataFrame({'title': [1, 2]})
+
+        with dtype_policy(DtypePolicy('compact')):
+            assert schema.apply_transformations(df)['title'].dtype == 'string[pyarrow]'
+        assert schema.apply_transformations(df)['title'].dtype == object
+
+    def test_hints_follow_mapping(self):
+        """Test that hints apply to the source and the renamed column"""
+        schema = SchemaVersion(
+            'v1',
+            'test',
+            {'genre': 'string'},
+            {'genre': 'category'},
+            dtypes={'genre': 'category'},
+        )
+        assert schema.dtype_hints == {'genre': 'category', 'category': 'category'}
+
+    def test_unknown_hint_is_rejected(self):
+        """Test that schema versions only accept known hints"""
+        with pytest.raises(ValueError):
+            SchemaVersion(
+                'v1', 'test', {'genre': 'string'}, {}, dtypes={'genre': 'tiny'}
+            )
+
+
+class TestDtypePolicy:
+    def test_from_config(self):
+        """Test that the policy keeps pandas defaults unless configured"""
+        assert not DtypePolicy.from_config({}).compact
+        assert DtypePolicy.from_config({'dtypes': {}}).mode == 'default'
+        assert DtypePolicy.from_config({'dtypes': {'mode': 'compact'}}).compact
+        with pytest.raises(ValueError):
+            DtypePolicy.from_config({'dtypes': {'mode': 'tiny'}})
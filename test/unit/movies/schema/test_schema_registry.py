@@ -1,6 +1,17 @@
+import json
+import logging
+import os
+
+import numpy as np
 import pytest
 import pandas as pd
-from src.movies.schema.schema_registry import SchemaRegistry, SchemaVersion
+from src.movies.schema.schema_registry import (
+    SchemaRegistry,
+    SchemaVersion,
+    VersionIndex,
+    clear_shared_registries,
+    get_shared_registry,
+)
 
 
 class TestSchemaRegistry:
@@ -134,3 +145,173 @@ class TestSchemaRegistry:
         assert transformed_df['movie_title'].iloc[0] == 'Inception'
         assert transformed_df['release_year'].iloc[0] == 2010
 
+
+    def test_transform_dataframe_projects_schema_columns(self, registry):
+        """Test that columns outside the schema are dropped by the plan"""
+        df = pd.DataFrame({
+            'title': ['Inception'],
+            'year': ['2010'],
+            'internal_id': [42]
+        })
+
+        transformed_df = registry.transform_dataframe('silver/audience_pulse', 'v1', df)
+        assert list(transformed_df.columns) == ['movie_title', 'release_year']
+
+    def test_transform_dataframe_does_not_copy_untouched_columns(self, registry):
+        """Test that columns without a cast share memory with the input"""
+        df = pd.DataFrame({
+            'title': ['Inception'],
+            'year': ['2010'],
+            'audience_average_score': [9.1]
+        })
+
+        transformed_df = registry.transform_dataframe('silver/audience_pulse', 'v1', df)
+        assert np.shares_memory(
+            transformed_df['critic_score_percentage'].to_numpy(),
+            df['audience_average_score'].to_numpy()
+        )
+
+    def test_satisfied_cast_is_skipped(self, registry):
+        """Test that a column already in the target dtype is passed through"""
+        schema = registry.get_schema('silver/audience_pulse', 'v1')
+        df = pd.DataFrame({'year': pd.array([2010], dtype='Int64')})
+
+        transformed_df = schema.apply_transformations(df)
+        assert transformed_df['year'].array is df['year'].array
+
+    def test_schemas_are_parsed_on_demand(self):
+        """Test that version files are only parsed when a version of their provider is needed"""
+        registry = SchemaRegistry()
+        assert registry.get_latest_version('bronze/critic_agg') == 'v1'
+        assert registry._parsed == {}
+
+        registry.get_schema('bronze/critic_agg', 'v1')
+        assert {schema_file.parent.name for schema_file in registry._parsed} == {'critic_agg'}
+
+    def test_plan_is_compiled_once(self, registry):
+        """Test that the compiled plan is reused between calls"""
+        schema = registry.get_schema('silver/audience_pulse', 'v1')
+        plan = schema.plan
+        schema.apply_transformations(pd.DataFrame({'year': ['2010']}))
+        assert schema.plan is plan
+
+
+class TestSharedSchemaRegistry:
+    @pytest.fixture
+    def schema_dir(self, tmp_path):
+        """Create a minimal schema directory with one provider"""
+        provider_dir = tmp_path / 'bronze' / 'provider'
+        provider_dir.mkdir(parents=True)
+        self._write_schema(provider_dir / 'v1.json', {'title': 'string'})
+        yield tmp_path
+        clear_shared_registries()
+
+    @staticmethod
+    def _write_schema(path, schema):
+        path.write_text(json.dumps({
+            'version': path.stem,
+            'description': 'test schema',
+            'schema': schema,
+            'mapping': {},
+        }))
+
+    def test_same_instance_is_returned(self, schema_dir):
+        """Test that the registry is loaded once and shared"""
+        assert get_shared_registry(schema_dir) is get_shared_registry(schema_dir)
+
+    def test_reload_on_content_change(self, schema_dir):
+        """Test that changing a schema file the registry has read reloads the registry"""
+        registry = get_shared_registry(schema_dir)
+        assert registry.get_schema('bronze/provider', 'v1') is not None
+        schema_file = schema_dir / 'bronze' / 'provider' / 'v1.json'
+        self._write_schema(schema_file, {'title': 'string', 'year': 'int64'})
+        stat = schema_file.stat()
+        os.utime(schema_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        reloaded = get_shared_registry(schema_dir)
+        assert reloaded is not registry
+        assert 'year' in reloaded.get_schema('bronze/provider', 'v1').schema
+
+    def test_reload_on_new_version(self, schema_dir):
+        """Test that adding a schema version reloads the registry"""
+        registry = get_shared_registry(schema_dir)
+        self._write_schema(schema_dir / 'bronze' / 'provider' / 'v2.json', {'name': 'string'})
+
+        reloaded = get_shared_registry(schema_dir)
+        assert reloaded is not registry
+        assert reloaded.get_latest_version('bronze/provider') == 'v2'
+
+    def test_unread_file_is_not_hashed(self, schema_dir):
+        """Test that a file is only hashed once read, and an unread file changing keeps the instance"""
+        registry = get_shared_registry(schema_dir)
+        schema_file = schema_dir / 'bronze' / 'provider' / 'v1.json'
+        assert registry._file_hashes == {}
+        self._write_schema(schema_file, {'title': 'string', 'year': 'int64'})
+        stat = schema_file.stat()
+        os.utime(schema_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert get_shared_registry(schema_dir) is registry
+        assert 'year' in registry.get_schema('bronze/provider', 'v1').schema
+
+    def test_unnumbered_files_are_ignored(self, schema_dir):
+        """Test that v*.json files not named after a version number are not versions"""
+        self._write_schema(schema_dir / 'bronze' / 'provider' / 'v2_draft.json', {'name': 'string'})
+        self._write_schema(schema_dir / 'bronze' / 'provider' / 'vnext.json', {'name': 'string'})
+
+        registry = get_shared_registry(schema_dir)
+        assert registry.list_versions('bronze/provider') == ['v1']
+        assert registry.get_latest_version('bronze/provider') == 'v1'
+
+    def test_touch_without_change_keeps_instance(self, schema_dir):
+        """Test that a new mtime with identical content does not reload"""
+        registry = get_shared_registry(schema_dir)
+        registry.get_schema('bronze/provider', 'v1')
+        schema_file = schema_dir / 'bronze' / 'provider' / 'v1.json'
+        stat = schema_file.stat()
+        os.utime(schema_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert get_shared_registry(schema_dir) is registry
+
+
+class TestVersionIndex:
+    @staticmethod
+    def schemas(**columns):
+        return {
+            version: SchemaVersion(version=version, description='', schema=dict.fromkeys(names, 'string'), mapping={})
+            for version, names in columns.items()
+        }
+
+    def test_versions_sorted_numerically(self):
+        """Test that versions are ordered by number, not by name"""
+        index = VersionIndex(self.schemas(v10=['a'], v2=['a'], v1=['a']))
+        assert index.versions == ('v1', 'v2', 'v10')
+
+    def test_newest_contained_version_wins(self):
+        """Test that extra columns still match and the newest contained version is detected"""
+        index = VersionIndex(self.schemas(v1=['a', 'b'], v2=['a', 'b', 'c'], v3=['a', 'd']))
+
+        assert index.match(['b', 'a', 'c', 'extra']) == ('v2', ())
+        assert index.match(['a']) == (None, ())
+
+    def test_ambiguous_matches(self):
+        """Test that versions the detected one does not extend are reported"""
+        index = VersionIndex(self.schemas(v1=['a', 'b'], v2=['a', 'c'], v3=['a', 'c']))
+
+        assert index.match(['a', 'b', 'c']) == ('v3', ('v2', 'v1'))
+        assert index.match(['a', 'c']) == ('v3', ('v2',))
+
+    def test_detect_version_logs_ambiguity_once(self, tmp_path, caplog):
+        """Test that the registry warns about an ambiguous signature once"""
+        provider_dir = tmp_path / 'bronze' / 'provider'
+        provider_dir.mkdir(parents=True)
+        for version in ('v1', 'v2'):
+            (provider_dir / f'{version}.json').write_text(json.dumps({
+                'version': version, 'description': '', 'schema': {'title': 'string'}, 'mapping': {},
+            }))
+        registry = SchemaRegistry(tmp_path)
+        df = pd.DataFrame({'title': ['A']})
+
+        with caplog.at_level(logging.WARNING):
+            assert registry.detect_version('bronze/provider', df) == 'v2'
+            assert registry.detect_version('bronze/provider', df) == 'v2'
+        assert caplog.text.count('Ambiguous schema version') == 1
@@ -0,0 +1,135 @@
+import logging
+
+import pytest
+import pandas as pd
+from src.movies.models.bronze.critic_agg import CriticAgg
+from src.movies.schema.schema_registry import SchemaRegistry, SchemaVersion
+from src.movies.schema.validation import (
+    DataQualityError,
+    ValidationPolicy,
+    validate_values,
+    validation_policy,
+)
+
+
+class TestValidateValues:
+    @pytest.fixture
+    def schema(self):
+        return SchemaVersion(
+            version='v1',
+            description='test',
+            schema={
+                'title': 'string',
+                'year': 'int64',
+                'score': 'float64',
+                'genre': 'string',
+            },
+            mapping={},
+            constraints={
+                'title': {'nullable': False, 'unique': True},
+                'year': {'min': 1900, 'max': 2100},
+                'score': {'min': 0, 'max': 10},
+                'genre': {'enum': ['drama', 'comedy']},
+            },
+        )
+
+    def test_valid_frame(self, schema):
+        """Test that conforming values give no violation"""
+        df = pd.DataFrame(
+            {
+                'title': ['A', 'B'],
+                'year': [2000, 2001],
+                'score': [1.5, 9.0],
+                'genre': ['drama', None],
+            }
+        )
+        assert validate_values(schema, df).ok
+
+    def test_counts_and_samples_per_rule(self, schema):
+        """Test that every broken rule is counted with a bounded sample of bad rows"""
+        df = pd.DataFrame(
+            {
+                'title': ['A', 'A', None, 'B'],
+                'year': ['2000', 'soon', '1850', '2001.5'],
+                'score': [1.0, 11.0, -1.0, 12.0],
+                'genre': ['drama', 'horror', 'comedy', 'drama'],
+            }
+        )
+
+        report = validate_values(schema, df, sample_size=1)
+
+        counts = {
+            (violation.column, violation.rule): violation.count
+            for violation in report.violations
+        }
+        assert counts == {
+            ('title', 'nullable'): 1,
+            ('title', 'unique'): 2,
+            ('year', 'dtype'): 2,
+            ('year', 'min'): 1,
+            ('score', 'max'): 2,
+            ('score', 'min'): 1,
+            ('genre', 'enum'): 1,
+        }
+        assert all(len(violation.sample) == 1 for violation in report.violations)
+        assert report.violations[0].sample == [(2, None)]
+
+    def test_sampling_mode(self, schema):
+        """Test that sampling checks at most the requested number of rows"""
+        df = pd.DataFrame(
+            {
+                'title': [f"T{i}" for i in range(1000)],
+                'year': 1800,
+                'score': 5.0,
+                'genre': 'drama',
+            }
+        )
+
+        report = validate_values(schema, df, sample_rows=100)
+
+        assert report.sampled and report.rows_checked == 100
+        assert [
+            (violation.rule, violation.count) for violation in report.violations
+        ] == [('min', 100)]
+
+
+class TestValidationPolicy:
+    def test_from_config(self):
+        """
+        Test that the policy is off unless configured, and warns by
+        default when configured
+        """
+        assert ValidationPolicy.from_config({}).mode == 'off'
+        assert ValidationPolicy.from_config(
+            {'validation': {'sample_rows': 10}}
+        ) == ValidationPolicy('warn', 10)
+        with pytest.raises(ValueError):
+            ValidationPolicy.from_config({'validation': {'mode': 'loud'}})
+
+    @pytest.fixture
+    def bad_file(self, tmp_path):
+        path = tmp_path / 'critic.csv'
+        path.write_text(
+            "movie_title,release_year,critic_score_percentage,top_critic_score,total_critic_reviews_counted\n"
+            "Film,2020,140,8.0,10\n"
+        )
+        return str(path)
+
+    def test_warn_mode_logs(self, bad_file, caplog):
+        """Test that warn mode ingests the file and logs the violations"""
+        with (
+            caplog.at_level(logging.WARNING),
+            validation_policy(ValidationPolicy('warn')),
+        ):
+            model = CriticAgg(bad_file, registry=SchemaRegistry())
+
+        assert len(model.df) == 1
+        assert 'critic_score_percentage max: 1 rows' in caplog.text
+
+    def test_strict_mode_fails(self, bad_file):
+        """Test that strict mode rejects the file"""
+        with (
+            validation_policy(ValidationPolicy('strict')),
+            pytest.raises(DataQualityError),
+        ):
+            CriticAgg(bad_file, registry=SchemaRegistry())
@@ -0,0 +1,48 @@
+import pytest
+from src.movies.storage.layers import source_path
+from src.movies.storage.partitions import (
+    latest_partition,
+    list_partitions,
+    partition_of,
+)
+
+
+class TestPartitions:
+    @pytest.fixture
+    def drops(self, tmp_path):
+        for date in ('20251023', '20251021', '20251022'):
+            (tmp_path / f'{date}_provider1.csv').write_text('movie_title\n')
+        return tmp_path
+
+    def test_partition_of(self):
+        """Test that partitions come from the date in the file name"""
+        assert partition_of('data/20251022_provider2.json') == '20251022'
+        assert partition_of('data/provider2.json') == 'provider2'
+
+    def test_list_partitions_sorted(self, drops):
+        """Test that a glob lists every dated drop in partition order"""
+        partitions = list_partitions(str(drops / '*_provider1.csv'))
+        assert list(partitions) == ['20251021', '20251022', '20251023']
+
+    def test_duplicate_partition_rejected(self, drops):
+        """Test that two files of the same date are rejected"""
+        (drops / '20251022_provider1_copy.csv').write_text('movie_title\n')
+        with pytest.raises(ValueError):
+            list_partitions(str(drops / '*.csv'))
+
+    def test_source_path_uses_latest_partition(self, drops):
+        """
+        Test that a full run reads the latest drop of a pattern and plain paths as is
+        """
+        config = {
+            'source': {'critic_agg': str(drops / '*_provider1.csv'), 'plain': 'a.csv'}
+        }
+        assert source_path(config, 'critic_agg') == str(
+            drops / '20251023_provider1.csv'
+        )
+        assert source_path(config, 'plain') == 'a.csv'
+
+    def test_latest_partition_without_match(self, tmp_path):
+        """Test that a pattern matching nothing raises FileNotFoundError"""
+        with pytest.raises(FileNotFoundError):
+            latest_partition(str(tmp_path / '*.csv'))
@@ -0,0 +1,219 @@
+import gzip
+import json
+
+import pytest
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from src.movies.storage.readers import (
+    build_frame,
+    iter_csv_chunks,
+    iter_json_chunks,
+    iter_json_records,
+    iter_table_chunks,
+    read_mapped,
+    read_table,
+    table_format,
+)
+from src.movies.storage.writers import ArrowIpcWriter
+
+
+class TestReaders:
+    @pytest.fixture
+    def records(self):
+        return [
+            {'title': f'Movie {i}', 'year': str(2000 + i), 'score': i + 0.5}
+            for i in range(10)
+        ]
+
+    @pytest.fixture
+    def json_path(self, tmp_path, records):
+        path = tmp_path / 'records.json'
+        path.write_text(json.dumps(records, indent=2))
+        return path
+
+    def test_iter_json_records_small_blocks(self, json_path, records):
+        """Test that records spanning block boundaries are decoded correctly"""
+        assert list(iter_json_records(json_path, block_size=7)) == records
+
+    def test_iter_json_records_empty_array(self, tmp_path):
+        """Test that an empty array yields no records"""
+        path = tmp_path / 'empty.json'
+        path.write_text(' [ ] ')
+        assert list(iter_json_records(path)) == []
+
+    def test_iter_json_records_rejects_non_array(self, tmp_path):
+        """Test that a JSON object at the top level is rejected"""
+        path = tmp_path / 'object.json'
+        path.write_text('{"title": "Movie"}')
+        with pytest.raises(ValueError):
+            list(iter_json_records(path))
+
+    def test_iter_json_chunks_sizes(self, json_path):
+        """Test that chunks are bounded by the chunk size"""
+        chunks = list(iter_json_chunks(json_path, chunksize=4))
+        assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+        assert list(chunks[0].columns) == ['title', 'year', 'score']
+
+    def test_iter_json_chunks_match_full_read(self, json_path):
+        """Test that JSON chunks convert numeric strings like a full read does"""
+        chunks = list(iter_json_chunks(json_path, chunksize=3))
+
+        assert all(chunk['year'].dtype == 'int64' for chunk in chunks)
+        pd.testing.assert_frame_equal(
+            pd.concat(chunks, ignore_index=True), read_table(json_path)
+        )
+
+    def test_iter_csv_chunks_matches_full_read(self, tmp_path, records):
+        """Test that concatenated CSV chunks equal a full read"""
+        path = tmp_path / 'records.csv'
+        pd.DataFrame(records).to_csv(path, index=False)
+
+        chunks = list(iter_csv_chunks(path, chunksize=3))
+        assert len(chunks) == 4
+        pd.testing.assert_frame_equal(
+            pd.concat(chunks, ignore_index=True), pd.read_csv(path)
+        )
+
+    @pytest.fixture
+    def ndjson_path(self, tmp_path, records):
+        path = tmp_path / 'records.ndjson'
+        path.write_text('\n'.join(json.dumps(record) for record in records) + '\n\n')
+        return path
+
+    def test_read_ndjson_matches_json_array(self, ndjson_path, json_path):
+        """
+        Test that an NDJSON file reads like the same records in a JSON array,
+        and like pd.read_json
+        """
+        df = read_table(ndjson_path)
+
+        pd.testing.assert_frame_equal(df, read_table(json_path))
+        pd.testing.assert_frame_equal(df, pd.read_json(json_path))
+
+    def test_ndjson_reports_bad_line(self, tmp_path):
+        """Test that an invalid NDJSON line is reported with its number"""
+        path = tmp_path / 'bad.ndjson'
+        path.write_text('{"title": "A"}\n{"title": \n')
+        with pytest.raises(ValueError, match='line 2'):
+            read_table(path)
+
+    def test_iter_ndjson_chunks(self, ndjson_path, records):
+        """
+        Test that NDJSON chunks are bounded by the chunk size and hold every record
+        """
+        chunks = list(iter_table_chunks(ndjson_path, chunksize=4))
+
+        assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+        assert pd.concat(chunks, ignore_index=True)['title'].tolist() == [
+            record['title'] for record in records
+        ]
+
+    @pytest.mark.parametrize('compression', ['gzip', 'zstd'])
+    @pytest.mark.parametrize('suffix', ['.csv', '.json', '.ndjson'])
+    def test_compressed_files_read_like_plain_ones(
+        self, tmp_path, json_path, ndjson_path, records, suffix, compression
+    ):
+        """
+        Test that gzip and zstd files are decompressed on the fly, in full and in chunks
+        """
+        plain = {
+            '.json': json_path,
+            '.ndjson': ndjson_path,
+            '.csv': tmp_path / 'records.csv',
+        }[suffix]
+        if suffix == '.csv':
+            pd.DataFrame(records).to_csv(plain, index=False)
+        content = plain.read_bytes()
+        path = tmp_path / f"records{suffix}{'.gz' if compression == 'gzip' else '.zst'}"
+        if compression == 'gzip':
+            path.write_bytes(gzip.compress(content))
+        else:
+            with pa.output_stream(str(path), compression='zstd') as stream:
+                stream.write(content)
+
+        assert table_format(path) == (suffix, compression)
+        pd.testing.assert_frame_equal(read_table(path), read_table(plain))
+        for chunk, plain_chunk in zip(
+            iter_table_chunks(path, chunksize=3), iter_table_chunks(plain, chunksize=3)
+        ):
+            pd.testing.assert_frame_equal(chunk, plain_chunk)
+
+    def test_compressed_binary_formats_are_rejected(self):
+        """Test that only text formats are read through a decompressing stream"""
+        with pytest.raises(ValueError):
+            table_format('records.parquet.gz')
+
+    def test_build_frame_typed_buffers(self):
+        """
+        Test that declared numeric columns are decoded into typed arrays,
+        missing keys giving NaN
+        """
+        records = [
+            {'title': 'A', 'year': 2000, 'score': 1},
+            {'title': 'B', 'score': 2.5},
+            {'year': 2002},
+        ]
+
+        df = build_frame(iter(records), dtypes={'year': 'int64', 'score': 'float64'})
+
+        assert list(df.columns) == ['title', 'year', 'score']
+        assert df['title'].tolist() == ['A', 'B', None]
+        assert df['year'].dtype == 'float64'
+        np.testing.assert_array_equal(df['year'], [2000, np.nan, 2002])
+        np.testing.assert_array_equal(df['score'], [1.0, 2.5, np.nan])
+
+    def test_build_frame_falls_back_on_undeclared_values(self):
+        """
+        Test that a value not fitting its declared type keeps the column as decoded
+        """
+        records = [{'year': 2000}, {'year': 'unknown'}, {'year': 2**70}]
+
+        df = build_frame(iter(records), dtypes={'year': 'int64'})
+
+        assert df['year'].tolist() == [2000, 'unknown', 2**70]
+
+    def test_build_frame_stops_at_max_rows(self, records):
+        """
+        Test that at most max_rows records are consumed, leaving the
+        rest to the next chunk
+        """
+        source = iter(records)
+
+        first = build_frame(source, max_rows=4, columns=['year'])
+
+        assert list(first.columns) == ['year'] and len(first) == 4
+        assert next(source) == records[4]
+        with pytest.raises(KeyError):
+            build_frame(iter(records), columns=['rating'])
+
+    @pytest.mark.parametrize('suffix', ['.csv', '.json', '.parquet'])
+    def test_read_table_columns(self, tmp_path, records, suffix):
+        """Test that only the requested columns are read, whatever the format"""
+        path = tmp_path / f'records{suffix}'
+        df = pd.DataFrame(records)
+        if suffix == '.csv':
+            df.to_csv(path, index=False)
+        elif suffix == '.json':
+            df.to_json(path, orient='records')
+        else:
+            df.to_parquet(path)
+
+        columns = list(df.columns[:1])
+        assert list(read_table(path, columns=columns).columns) == columns
+
+    def test_read_mapped_shares_file_pages(self, tmp_path, records):
+        """
+        Test that a mapped Arrow file keeps its values, with numbers
+        viewing the mapped pages
+        """
+        path = tmp_path / 'records.arrow'
+        df = pd.DataFrame(records).assign(rank=pd.array([1, None] * 5, dtype='Int64'))
+        ArrowIpcWriter(compression=None).write(df, path)
+
+        mapped = read_mapped(path)
+
+        pd.testing.assert_frame_equal(mapped, df, check_dtype=False)
+        assert mapped['title'].dtype == 'string[pyarrow]'
+        assert mapped['rank'].dtype == 'Int64'
+        assert not mapped['score'].to_numpy().flags.owndata
@@ -0,0 +1,66 @@
+import pytest
+import pandas as pd
+from src.movies.storage.readers import iter_table_chunks, read_table
+from src.movies.storage.writers import (
+    ArrowIpcWriter,
+    CsvWriter,
+    ParquetWriter,
+    get_writer,
+)
+
+
+class TestWriters:
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame(
+            {
+                'movie_title': ['Movie A', 'Movie B', 'Movie C'],
+                'release_year': pd.array([2020, None, 2022], dtype='Int64'),
+                'top_critic_score': [8.5, 7.2, 9.0],
+            }
+        )
+
+    @pytest.mark.parametrize('format_name', ['csv', 'parquet', 'arrow'])
+    def test_round_trip(self, tmp_path, df, format_name):
+        """Test that a written table reads back with the same values"""
+        writer = get_writer(format_name)
+        path = tmp_path / f'table{writer.extension}'
+        writer.write(df, path)
+
+        pd.testing.assert_frame_equal(read_table(path), df, check_dtype=False)
+
+    @pytest.mark.parametrize('writer_class', [ParquetWriter, ArrowIpcWriter])
+    def test_columnar_formats_keep_dtypes(self, tmp_path, df, writer_class):
+        """Test that columnar formats keep nullable integer columns typed"""
+        writer = writer_class()
+        path = tmp_path / f'table{writer.extension}'
+        writer.write(df, path)
+
+        assert str(read_table(path)['release_year'].dtype) == 'Int64'
+
+    @pytest.mark.parametrize('writer_class', [CsvWriter, ParquetWriter, ArrowIpcWriter])
+    def test_sink_appends_chunks(self, tmp_path, df, writer_class):
+        """Test that chunks written through a sink form one table"""
+        writer = writer_class()
+        path = tmp_path / f'table{writer.extension}'
+        with writer.open(path) as sink:
+            sink.write(df.iloc[:2])
+            sink.write(df.iloc[2:])
+
+        assert sink.rows == 3
+        pd.testing.assert_frame_equal(read_table(path), df, check_dtype=False)
+
+    @pytest.mark.parametrize('format_name', ['parquet', 'arrow'])
+    def test_iter_table_chunks(self, tmp_path, df, format_name):
+        """Test that columnar files can be read back in bounded chunks"""
+        writer = get_writer(format_name)
+        path = tmp_path / f'table{writer.extension}'
+        writer.write(df, path)
+
+        chunks = list(iter_table_chunks(path, chunksize=2))
+        assert [len(chunk) for chunk in chunks] == [2, 1]
+
+    def test_unknown_format(self):
+        """Test that an unknown format is rejected"""
+        with pytest.raises(ValueError):
+            get_writer('xlsx')
@@ -0,0 +1,71 @@
+import pytest
+import pandas as pd
+import yaml
+from src.movies.backfill import backfill, date_range, format_summary
+
+
+class TestBackfill:
+    @pytest.fixture
+    def config_path(self, partitioned_config, tmp_path):
+        (tmp_path / 'data' / '20251024_critic_agg.csv').write_text(
+            'movie_title,release_year,critic_score_percentage,top_critic_score,total_critic_reviews_counted\n'
+            'Inception,2010,88,8.2,460\n'
+        )
+        path = tmp_path / 'config.yaml'
+        path.write_text(yaml.safe_dump(partitioned_config))
+        return path
+
+    def test_date_range(self):
+        """Test that both date formats are accepted and both ends are included"""
+        assert date_range('2025-10-30', '20251102') == [
+            '20251030',
+            '20251031',
+            '20251101',
+            '20251102',
+        ]
+        with pytest.raises(ValueError):
+            date_range('20251102', '20251030')
+
+    def test_backfill_partitions(self, config_path, tmp_path):
+        """Test that every date runs in the pool and gold reflects the latest drops"""
+        summaries = backfill(config_path, '20251022', '20251024', workers=2)
+
+        assert [summary.partition for summary in summaries] == [
+            '20251022',
+            '20251023',
+            '20251024',
+        ]
+        assert len(summaries[0].nodes) == 3
+        assert summaries[1].nodes == []
+        assert summaries[2].rows == {'bronze/critic_agg': 1, 'silver/critic_agg': 1}
+        assert format_summary(summaries)[1] == '20251023  no drops'
+
+        gold = pd.read_csv(tmp_path / 'gold' / 'movies_unified.csv')
+        gold = gold.set_index('movie_title')
+        assert list(gold.index) == ['Inception', 'Parasite', 'The Dark Knight']
+        assert gold.loc['Inception', 'critic_score_percentage'] == 88
+        assert gold.loc['Parasite', 'critic_score_percentage'] == 99
+
+    def test_failed_partition_reported(self, config_path, tmp_path):
+        """
+        Test that a failing date is summarised and raised without stopping the others
+        """
+        (tmp_path / 'data' / '20251023_critic_agg.csv').write_text(
+            'not,a,valid\nschema,for,critics\n'
+        )
+
+        with pytest.raises(ExceptionGroup) as excinfo:
+            backfill(config_path, '20251022', '20251023', workers=2)
+
+        assert 'backfill partition: 20251023' in excinfo.value.exceptions[0].__notes__
+        assert (tmp_path / 'gold' / 'movies_unified.csv').exists()
+
+    def test_rejects_compact_dtypes(self, config_path, tmp_path):
+        """Test that compact dtypes are rejected before any partition is processed"""
+        config = yaml.safe_load(config_path.read_text())
+        config['dtypes'] = {'mode': 'compact'}
+        config_path.write_text(yaml.safe_dump(config))
+
+        with pytest.raises(ValueError, match='dtypes'):
+            backfill(config_path, '20251022', '20251024')
+        assert not (tmp_path / 'silver' / 'critic_agg').exists()
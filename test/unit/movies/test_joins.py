@@ -0,0 +1,108 @@
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+from src.movies.joins import chained_outer_merge, multiway_outer_join, semi_join
+from src.movies.schema.dtypes import compact_frame
+
+
+class TestMultiwayOuterJoin:
+    @pytest.fixture
+    def frames(self):
+        audience = pd.DataFrame(
+            {
+                'movie_title': ['Dune', 'Alien', 'Heat'],
+                'rating': [8.1, 8.5, 8.3],
+                'year': pd.array([2021, 1979, 1995], dtype='Int64'),
+            }
+        )
+        critic = pd.DataFrame(
+            {
+                'rating': [7.9, 8.8],
+                'movie_title': ['Alien', 'Brazil'],
+                'fresh': [True, False],
+            }
+        )
+        box_office = pd.DataFrame(
+            {
+                'movie_title': ['Heat', 'Brazil', 'Coma'],
+                'year': [1995, 1985, 1978],
+                'gross_usd': [187, 9, 28],
+            }
+        )
+        return [audience, critic, box_office]
+
+    def test_matches_chained_merge(self, frames):
+        """
+        Test that columns, suffixes, dtypes and row order match the chain of merges
+        """
+        suffixes = [('_audience', '_critic')]
+        expected = chained_outer_merge(frames, on='movie_title', suffixes=suffixes)
+        result = multiway_outer_join(frames, on='movie_title', suffixes=suffixes)
+
+        assert_frame_equal(result, expected)
+        assert list(result.columns) == [
+            'movie_title',
+            'rating_audience',
+            'year_x',
+            'rating_critic',
+            'fresh',
+            'year_y',
+            'gross_usd',
+        ]
+        assert result['movie_title'].tolist() == [
+            'Alien',
+            'Brazil',
+            'Coma',
+            'Dune',
+            'Heat',
+        ]
+
+    def test_matches_chained_merge_on_compact_dtypes(self, frames):
+        """
+        Test that Arrow string keys and downcast columns are joined
+        like the chain of merges
+        """
+        frames = [compact_frame(frame) for frame in frames]
+        expected = chained_outer_merge(frames, on='movie_title')
+        result = multiway_outer_join(frames, on='movie_title')
+
+        assert_frame_equal(result, expected)
+        assert result['movie_title'].dtype == 'string[pyarrow]'
+
+    def test_missing_rows_are_filled(self, frames):
+        """Test that keys absent from a frame get NaN, or NA for nullable columns"""
+        result = multiway_outer_join(frames, on='movie_title')
+
+        assert result['gross_usd'].dtype == 'float64'
+        assert result['year_x'].dtype == 'Int64'
+        assert result.loc[result['movie_title'] == 'Coma', 'year_x'].isna().all()
+
+    @pytest.mark.parametrize('keys', [['Alien', 'Alien'], ['Alien', None]])
+    def test_falls_back_on_unencodable_keys(self, frames, keys):
+        """Test that duplicate or null keys use the chained merge"""
+        frames[1] = pd.DataFrame(
+            {'movie_title': keys, 'rating': [7.9, 8.8], 'fresh': [True, False]}
+        )
+
+        result = multiway_outer_join(frames, on='movie_title')
+
+        assert_frame_equal(result, chained_outer_merge(frames, on='movie_title'))
+
+
+class TestSemiJoin:
+    def test_keeps_shared_keys_in_order(self):
+        """Test that only keys present in every frame are kept, in each frame's order"""
+        first = pd.DataFrame(
+            {'film_name': ['Heat', 'Alien', 'Dune', None], 'gross': [1, 2, 3, 4]}
+        )
+        second = pd.DataFrame({'film_name': ['Dune', 'Heat', None]})
+        third = pd.DataFrame({'film_name': ['Heat', 'Coma', 'Dune', 'Heat']})
+
+        kept = semi_join([first, second, third], 'film_name')
+
+        assert [frame['film_name'].tolist() for frame in kept] == [
+            ['Heat', 'Dune'],
+            ['Dune', 'Heat'],
+            ['Heat', 'Dune', 'Heat'],
+        ]
+        assert kept[0]['gross'].tolist() == [1, 3]
@@ -0,0 +1,71 @@
+import logging
+
+import pytest
+import yaml
+from src.movies.main import main
+
+
+class TestMain:
+    @pytest.fixture
+    def config_path(self, config, tmp_path):
+        path = tmp_path / 'config.yaml'
+        path.write_text(yaml.safe_dump(config))
+        return path
+
+    def write(self, config_path, **sections):
+        config = yaml.safe_load(config_path.read_text())
+        config.update(sections)
+        config_path.write_text(yaml.safe_dump(config))
+
+    @pytest.mark.parametrize('pool', ['thread', 'process'])
+    def test_saved_files_logged_in_fixed_order(self, config_path, pool, caplog):
+        """Test that saved files are logged in topological order for every pool type"""
+        self.write(config_path, execution={'pool': pool, 'workers': 3})
+
+        with caplog.at_level(logging.INFO):
+            main(str(config_path))
+
+        saved = [
+            '/'.join(record.getMessage().split(' ')[3].split('/')[-2:])
+            for record in caplog.records
+            if record.getMessage().startswith('✓ Saved file')
+        ]
+        assert saved == [
+            'bronze/audience_pulse.csv',
+            'bronze/box_office_domestic.csv',
+            'bronze/box_office_financials.csv',
+            'bronze/box_office_international.csv',
+            'bronze/critic_agg.csv',
+            'silver/audience_pulse.csv',
+            'silver/box_office_metrics.csv',
+            'silver/critic_agg.csv',
+            'gold/movies_unified.csv',
+            'gold/movie_metrics.csv',
+            'gold/yearly_statistics.csv',
+            'gold/roi_by_year.csv',
+            'gold/score_gross_correlation.csv',
+            'gold/top_budget_efficiency.csv',
+        ]
+
+    def test_errors_are_collected_per_source(self, config_path):
+        """Test that every failing source is reported, not only the first"""
+        config = yaml.safe_load(config_path.read_text())
+        config['source']['audience_pulse'] = 'test/data/missing.json'
+        config['source']['critic_agg'] = 'test/data/missing.csv'
+        config_path.write_text(yaml.safe_dump(config))
+
+        with pytest.raises(ExceptionGroup) as excinfo:
+            main(str(config_path))
+
+        notes = sorted(error.__notes__ for error in excinfo.value.exceptions)
+        assert notes == [
+            ['pipeline node: bronze/audience_pulse'],
+            ['pipeline node: bronze/critic_agg'],
+        ]
+
+    def test_unknown_pool(self, config_path):
+        """Test that an unknown pool type is rejected"""
+        self.write(config_path, execution={'pool': 'fiber'})
+
+        with pytest.raises(ValueError):
+            main(str(config_path))
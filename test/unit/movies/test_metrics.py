@@ -0,0 +1,85 @@
+import json
+import threading
+
+import pytest
+from src.movies.metrics import TOTAL, MetricsRecorder, export_metrics, recording, stage
+from src.movies.pipeline.graph import PipelineGraph
+from src.movies.pipeline.scheduler import Scheduler
+
+
+class TestMetrics:
+    def test_stage_without_recorder(self):
+        """Test that stages outside a recording context are not recorded"""
+        recorder = MetricsRecorder()
+        with stage('read') as metrics:
+            metrics.rows_out = 3
+        assert recorder.stages == []
+
+    def test_nested_steps_inherit_node(self):
+        """Test that steps are attributed to the node of the enclosing stage"""
+        with recording() as recorder:
+            with stage(TOTAL, node='silver/critic_agg', rows_in=3) as total:
+                with stage('transform', rows_in=3) as transform:
+                    transform.rows_out = 2
+                total.rows_out = 2
+
+        assert [(metrics.node, metrics.step) for metrics in recorder.stages] == [
+            ('silver/critic_agg', 'transform'),
+            ('silver/critic_agg', TOTAL),
+        ]
+        assert recorder.stages[1].wall_seconds >= recorder.stages[0].wall_seconds
+        assert recorder.stages[0].rows_out == 2
+
+    def test_recording_is_per_context(self):
+        """Test that a thread without its own recording context records nothing"""
+        with recording() as recorder:
+            thread = threading.Thread(target=lambda: stage('read').__enter__())
+            thread.start()
+            thread.join()
+        assert recorder.stages == []
+
+    def test_exports(self, tmp_path):
+        """Test the JSON report and the Prometheus textfile, summing repeated steps"""
+        with recording() as recorder:
+            for rows in (2, 3):
+                with stage('read', node='bronze/box_office_metrics') as metrics:
+                    metrics.rows_out = rows
+
+        config = {
+            'metrics': {
+                'report': str(tmp_path / 'report.json'),
+                'prometheus': str(tmp_path / 'run.prom'),
+            }
+        }
+        export_metrics(recorder, config)
+
+        report = json.loads((tmp_path / 'report.json').read_text())
+        assert [stage_metrics['rows_out'] for stage_metrics in report['stages']] == [
+            2,
+            3,
+        ]
+        prometheus = (tmp_path / 'run.prom').read_text()
+        assert (
+            'movies_pipeline_stage_rows_out{node="bronze/box_office_metrics",step="read"} 5'
+            in prometheus
+        )
+        assert '# TYPE movies_pipeline_stage_wall_seconds gauge' in prometheus
+
+
+class TestSchedulerMetrics:
+    @pytest.mark.parametrize('pool', ['thread', 'process'])
+    def test_every_node_recorded(self, config, pool):
+        """Test that worker metrics reach the run recorder with either pool type"""
+        config['execution'] = {'pool': pool, 'workers': 2}
+        graph = PipelineGraph.discover()
+        with recording() as recorder:
+            Scheduler(graph, config).run()
+
+        steps = {(metrics.node, metrics.step): metrics for metrics in recorder.stages}
+        assert {node for node, step in steps if step == TOTAL} == set(graph.order)
+        assert (
+            steps[('gold/movies_unified', TOTAL)].rows_out
+            == steps[('gold/movies_unified', 'merge')].rows_out
+        )
+        assert ('silver/box_office_metrics', 'merge') in steps
+        assert ('bronze/critic_agg', 'validate') in steps
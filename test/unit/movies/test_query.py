@@ -0,0 +1,142 @@
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+import numpy as np
+import pandas as pd
+from src.movies.query import GoldIndex, QueryService, QuerySettings
+
+
+class TestQueryService:
+    @pytest.fixture
+    def gold(self):
+        return pd.DataFrame(
+            {
+                'movie_title': ['Alien', 'Dune', 'Heat', 'Up', 'Jaws'],
+                'release_year': [1979.0, 2021.0, 1995.0, 2009.0, np.nan],
+                'total_box_office_gross_usd': [1.8e8, 4.0e8, np.nan, 7.3e8, 4.7e8],
+                'critic_score_percentage': [98.0, 83.0, 87.0, np.nan, 97.0],
+            }
+        )
+
+    @pytest.fixture
+    def config(self, config, gold, tmp_path):
+        gold.to_csv(tmp_path / 'gold' / 'movies_unified.csv', index=False)
+        config['query'] = {'reload_interval': 0, 'port': 0}
+        return config
+
+    @pytest.fixture
+    def service(self, config):
+        return QueryService(config)
+
+    def test_settings_from_config(self, config):
+        """Test that the query section overrides the defaults"""
+        settings = QuerySettings.from_config(config)
+        assert settings.port == 0 and settings.reload_interval == 0
+        assert settings.hash_columns == ('movie_title',)
+        assert QuerySettings.from_config({}).port == 8766
+
+    def test_get(self, service):
+        """
+        Test that a title returns its row with missing values as None and
+        whole numbers as ints
+        """
+        assert service.get('Up') == {
+            'movie_title': 'Up',
+            'release_year': 2009,
+            'total_box_office_gross_usd': 7.3e8,
+            'critic_score_percentage': None,
+        }
+        assert service.get('Jaws')['release_year'] is None
+        assert service.get('Missing') is None
+
+    def test_range(self, service):
+        """
+        Test that both bounds are included, missing values skipped and the limit applied
+        """
+        titles = lambda rows: [row['movie_title'] for row in rows]
+        assert titles(service.range('release_year', 1990, 2010)) == ['Heat', 'Up']
+        assert titles(service.range('release_year', low=1995)) == ['Heat', 'Up', 'Dune']
+        assert titles(service.range('release_year', high=2009, limit=2)) == [
+            'Alien',
+            'Heat',
+        ]
+        assert service.range('release_year', 2030) == []
+
+    def test_top(self, service):
+        """
+        Test that top returns the largest values first, or the smallest when ascending
+        """
+        gross = 'total_box_office_gross_usd'
+        assert [row['movie_title'] for row in service.top(gross, 2)] == ['Up', 'Jaws']
+        assert [
+            row['movie_title'] for row in service.top(gross, 10, ascending=True)
+        ] == ['Alien', 'Dune', 'Jaws', 'Up']
+
+    def test_unindexed_column(self, service):
+        """Test that querying a column without an index is rejected"""
+        with pytest.raises(ValueError):
+            service.range('critic_score_percentage', 90)
+        with pytest.raises(ValueError):
+            service.index.get(2009.0, 'release_year')
+
+    def test_duplicate_hash_key(self, gold):
+        """Test that a hash index needs unique values"""
+        with pytest.raises(ValueError):
+            GoldIndex(pd.concat([gold, gold.head(1)]))
+
+    def test_refresh_swaps_settled_file(self, service, config, gold, tmp_path):
+        """
+        Test that a rewritten gold file is loaded once it settled, and a
+        broken one is ignored
+        """
+        path = tmp_path / 'gold' / 'movies_unified.csv'
+        before = service.index
+        gold.assign(release_year=gold['release_year'] + 1).to_csv(path, index=False)
+        os.utime(path, ns=(1, 1))
+
+        assert not service.refresh()  # changed since the previous check
+        assert service.index is before
+        assert service.refresh()
+        assert service.get('Up')['release_year'] == 2010
+        assert not service.refresh()
+
+        path.write_text('movie_title\nAlien\nAlien\n')
+        os.utime(path, ns=(2, 2))
+        assert not service.refresh()
+        assert not service.refresh()  # duplicate titles: the current index stays
+        assert service.get('Up')['release_year'] == 2010
+
+    def test_http_endpoints(self, service):
+        """Test the JSON endpoints, including missing movies and bad queries"""
+        server = service.serve()
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f'http://127.0.0.1:{server.server_address[1]}'
+
+        def fetch(path):
+            try:
+                with urllib.request.urlopen(url + path) as response:
+                    return response.status, json.loads(response.read())
+            except urllib.error.HTTPError as e:
+                return e.code, json.loads(e.read())
+
+        try:
+            assert fetch('/movies/Alien')[1]['release_year'] == 1979
+            assert fetch('/movies/No%20Such%20Film')[0] == 404
+            status, rows = fetch('/range/release_year?low=1990&high=2010')
+            assert status == 200 and [row['movie_title'] for row in rows] == [
+                'Heat',
+                'Up',
+            ]
+            assert [
+                row['movie_title']
+                for row in fetch('/top/total_box_office_gross_usd?n=1')[1]
+            ] == ['Up']
+            assert fetch('/top/critic_score_percentage')[0] == 400
+            assert fetch('/health')[1]['rows'] == 5
+        finally:
+            server.shutdown()
+            server.server_close()
@@ -0,0 +1,69 @@
+import hashlib
+
+import pytest
+import pandas as pd
+from src.movies.models.bronze.audience_pulse import AudiencePulse
+from src.movies.models.bronze.critic_agg import CriticAgg
+from src.movies.synthetic import generate, source_config
+
+
+def digest(paths):
+    return {
+        key: hashlib.sha256(open(path, 'rb').read()).hexdigest()
+        for key, path in paths.items()
+    }
+
+
+class TestSyntheticGenerator:
+    def test_deterministic(self, tmp_path):
+        """Test that the same arguments produce identical files"""
+        first = generate(tmp_path / 'first', 1000, seed=7)
+        second = generate(tmp_path / 'second', 1000, seed=7)
+        other_seed = generate(tmp_path / 'third', 1000, seed=8)
+
+        assert digest(first) == digest(second)
+        assert digest(first) != digest(other_seed)
+
+    def test_schema_conformant(self, tmp_path):
+        """Test that generated files validate against the bronze v1 schemas"""
+        paths = generate(tmp_path, 100)
+
+        assert AudiencePulse(paths['audience_pulse']).version == 'v1'
+        assert CriticAgg(paths['critic_agg']).version == 'v1'
+        financials = pd.read_csv(paths['box_office.financials'])
+        assert list(financials.columns) == [
+            'film_name',
+            'year_of_release',
+            'production_budget_usd',
+            'marketing_spend_usd',
+        ]
+
+    @pytest.mark.parametrize('overlap', [0.0, 0.25, 1.0])
+    def test_key_overlap(self, tmp_path, overlap):
+        """Test that the requested fraction of titles is shared by every provider"""
+        paths = generate(tmp_path, 400, overlap=overlap)
+
+        audience = set(pd.read_json(paths['audience_pulse'])['title'])
+        critic = set(pd.read_csv(paths['critic_agg'])['movie_title'])
+        domestic = set(pd.read_csv(paths['box_office.domestic'])['film_name'])
+        international = set(pd.read_csv(paths['box_office.international'])['film_name'])
+
+        assert len(audience & critic & domestic) == int(400 * overlap)
+        assert domestic == international
+
+    def test_multi_chunk_json(self, tmp_path, monkeypatch):
+        """Test that JSON written in several chunks is one valid array"""
+        monkeypatch.setattr('src.movies.synthetic.CHUNK_ROWS', 30)
+        paths = generate(tmp_path, 100)
+
+        assert len(pd.read_json(paths['audience_pulse'])) == 100
+        assert len(pd.read_csv(paths['critic_agg'])) == 100
+
+    def test_source_config(self):
+        """Test that dotted source keys are nested as in the config"""
+        assert source_config(
+            {'critic_agg': 'a.csv', 'box_office.domestic': 'b.csv'}
+        ) == {
+            'critic_agg': 'a.csv',
+            'box_office': {'domestic': 'b.csv'},
+        }